@@ -0,0 +1,76 @@
+"""Tokens sent per round: stateless single-message prompts vs multi-turn chat sessions
+
+Plays the same seeded rounds against a scripted LLM with no sessions, with
+sessions at the doctor-question site only (the default of
+MedicalConfig.CHAT_SESSION_SITES) and with sessions at the question and patient
+sites, and reports per round how many prompt tokens were sent and how many of
+them a prefix cache could not serve.
+
+    python benchmarks/bench_chat_sessions.py --edition EN --rounds 20
+"""
+
+import argparse
+import random
+
+from common import add_edition_argument, install_scripted_llm, load_edition, quiet
+
+
+MODES = {
+    "stateless": (),
+    "question": ("question",),
+    "all": ("question", "patient"),
+}
+
+
+def run_mode(module, edition: str, sites: tuple, rounds: int, seed: int) -> dict:
+    """Play rounds with sessions at the given call sites and return usage per call site"""
+    module.MedicalConfig.CHAT_SESSION_SITES = sites
+    fake = install_scripted_llm(module, edition)
+    random.seed(seed)
+    with quiet():
+        program = module.MedicalDiagnosisprogram(auto_mode=True)
+        for _ in range(rounds):
+            program.play_round()
+    return {
+        "requests": len(fake.requests),
+        "sites": program.api_client.get_cache_report()
+    }
+
+
+def totals(result: dict) -> tuple:
+    sites = result["sites"].values()
+    prompt = sum(s["prompt_tokens"] for s in sites)
+    missed = sum(s["cache_miss_tokens"] for s in sites)
+    return prompt, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prompt tokens per round with and without chat sessions")
+    add_edition_argument(parser)
+    parser.add_argument("--rounds", type=int, default=20, help="Rounds per mode")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed shared by both modes")
+    args = parser.parse_args()
+
+    module = load_edition(args.edition)
+    results = {mode: run_mode(module, args.edition, sites, args.rounds, args.seed) for mode, sites in MODES.items()}
+
+    print(f"Edition {args.edition}, {args.rounds} rounds, seed {args.seed}\n")
+    print(f"{'mode':<10} {'calls/round':>12} {'prompt tok/round':>17} {'uncached tok/round':>19}")
+    for mode, result in results.items():
+        prompt, missed = totals(result)
+        print(f"{mode:<10} {result['requests'] / args.rounds:>12.1f} "
+              f"{prompt / args.rounds:>17.1f} {missed / args.rounds:>19.1f}")
+
+    print(f"\n{'site':<18} {'mode':<10} {'calls':>6} {'prompt tok':>11} {'uncached':>9} {'hit rate':>9}")
+    sites = sorted(set().union(*(result["sites"] for result in results.values())))
+    for site in sites:
+        for mode, result in results.items():
+            stats = result["sites"].get(site)
+            if not stats:
+                continue
+            print(f"{site:<18} {mode:<10} {stats['calls']:>6} {stats['prompt_tokens']:>11} "
+                  f"{stats['cache_miss_tokens']:>9} {stats['cache_hit_rate']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
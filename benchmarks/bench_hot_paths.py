@@ -0,0 +1,220 @@
+"""Micro-benchmarks for the non-LLM hot paths, checked against stored baselines
+
+Times the code that runs between LLM calls: test execution, test-name extraction,
+symptom extraction, misunderstanding draws, prompt construction for test selection
+and diagnosis (with the LLM replaced by a fixed reply), state export and the
+record/memory writers. Fixtures come from a seeded offline consultation, so runs
+are comparable across commits.
+
+Each benchmark reports the median per-call time over several repeats. With a
+baseline file present, a benchmark slower than baseline × (1 + threshold) is
+re-timed once and, if still slower, reported as a regression; the script then
+exits with status 1. Baselines are machine-specific: record them on the machine
+that runs the comparison.
+
+    python benchmarks/bench_hot_paths.py --edition EN                  # compare with baseline
+    python benchmarks/bench_hot_paths.py --edition EN --save-baseline  # record a new baseline
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import timeit
+
+from common import ROOT, add_edition_argument, load_edition, quiet
+
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+
+
+class FixedReplyClient:
+    """Stands in for DeepSeekClient so only prompt construction and parsing are timed"""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+
+    def chat(self, system_prompt, user_message, temperature=0.7, site="default"):
+        return self.reply
+
+    def chat_messages(self, messages, temperature=0.7, site="default"):
+        return self.reply
+
+
+def build_fixtures(module, seed: int) -> dict:
+    """Play a seeded offline consultation and keep its state, dialogue and test results"""
+    config = module.MedicalConfig
+    rng = random.Random(seed)
+    random.seed(seed)
+    disease = rng.choice(config.DISEASE_LIBRARY)
+    generator = module.OfflineCaseGenerator(None)
+    case_info = {
+        "true_disease": disease,
+        "symptoms_description": generator._generate_symptoms_description(disease),
+        "personality": rng.choice(list(config.PERSONALITY_TYPES)),
+        "ideal_cost": 300
+    }
+    patient = module.OfflinePatientAgent(None, case_info)
+    patient.rng = rng
+    medical_system = module.MedicalSystem()
+    state = module.programState()
+    state.dialogue_history.append({"role": "patient", "content": case_info["symptoms_description"]})
+
+    questions = module.OfflineDoctorAgent.QUESTIONS
+    tests = list(config.TEST_COSTS)
+    for i in range(6):
+        question = questions[i % len(questions)]
+        with quiet():
+            response = patient.respond_to_question(question)
+        state.add_question()
+        state.record_action("Question", {"question": question, "response": response})
+        state.dialogue_history.extend([
+            {"role": "doctor", "content": question},
+            {"role": "patient", "content": response}
+        ])
+        if i % 3 == 2:
+            test = tests[rng.randrange(len(tests))]
+            result = medical_system.perform_test(test, disease)
+            state.add_test(result["cost"])
+            state.record_action("Test", {"test_type": test, **result})
+            state.test_results.append(f"{test}: {result['result']}")
+            state.dialogue_history.append({"role": "system", "content": f"{test}: {result['result']}"})
+
+    symptom_extractor = module.SymptomExtractor(config.SYMPTOM_SYNONYMS)
+    state.add_symptoms(symptom_extractor.extract(case_info["symptoms_description"]))
+    return {
+        "case_info": case_info,
+        "patient": patient,
+        "medical_system": medical_system,
+        "state": state,
+        "symptom_extractor": symptom_extractor,
+        "questions": questions,
+        "tests": tests,
+    }
+
+
+def build_benchmarks(module, fixtures: dict) -> dict:
+    """Name -> zero-argument callable for every hot path"""
+    config = module.MedicalConfig
+    state = fixtures["state"]
+    case_info = fixtures["case_info"]
+    tests = fixtures["tests"]
+    questions = fixtures["questions"]
+    disease = case_info["true_disease"]
+    dialogue = list(state.dialogue_history)
+
+    program = module.MedicalDiagnosisprogram(auto_mode=True, offline=True)
+    patient = fixtures["patient"]
+    medical_system = fixtures["medical_system"]
+
+    doctor = module.DoctorAgent(FixedReplyClient(tests[-1]), fixtures["symptom_extractor"])
+    diagnosis_doctor = module.DoctorAgent(FixedReplyClient(config.DISEASE_LIBRARY[0]), fixtures["symptom_extractor"])
+    hit_response = f"I would order {tests[-1]}."
+    miss_response = "I would rather not order anything expensive today."
+
+    os.makedirs(config.RECORDS_DIRC, exist_ok=True)
+    os.makedirs(config.ROUND_LOGS_DIR, exist_ok=True)
+    record_manager = module.RecordManager()
+    memory_manager = module.MemoryManager()
+    experience = {"success_rate": 1, "avg_questions": 6, "avg_tests": 2, "cost_efficiency": 1.0,
+                  "key_learning": "benchmark", "strategy_used": "q6_t2"}
+    for i in range(config.MAX_HISTORY):  # Steady state: memory file already at its size limit
+        memory_manager.save_learning_experience(experience, f"baseline_{i}")
+    round_data = {"case_info": case_info, "program_state": state.export_to_dict()}
+    program_data = {"program_results": [dict(case_info, success=True)] * 20,
+                    "doctor_final_learning": program.doctor.export_learning_data()}
+
+    def perform_tests():
+        for test in tests:
+            medical_system.perform_test(test, disease)
+
+    def misunderstand():
+        for question in questions:
+            patient._should_misunderstand(question)
+
+    return {
+        "perform_test (all tests)": perform_tests,
+        "_extract_test_from_response (hit)": lambda: doctor._extract_test_from_response(hit_response, tests, 10_000),
+        "_extract_test_from_response (miss)": lambda: doctor._extract_test_from_response(miss_response, tests, 10_000),
+        "extract_symptoms_from_complaint": lambda: program.extract_symptoms_from_complaint(case_info["symptoms_description"]),
+        "_should_misunderstand (all questions)": misunderstand,
+        "select_test_type prompt": lambda: doctor.select_test_type(state, state.patient_symptoms, state.dialogue_history),
+        "make_diagnosis prompt (cold dialogue)": lambda: diagnosis_doctor.make_diagnosis(list(dialogue), state.test_results),
+        "programState.export_to_dict": state.export_to_dict,
+        "RecordManager.save_round_log": lambda: record_manager.save_round_log(round_data, 1),
+        "RecordManager.save_program_record": lambda: record_manager.save_program_record(program_data),
+        "MemoryManager.save_learning_experience": lambda: memory_manager.save_learning_experience(experience, "bench"),
+    }
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median seconds per call over `repeat` runs of an auto-ranged loop"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def baseline_path(edition: str) -> str:
+    return os.path.join(BASELINE_DIR, f"hot_paths_{edition}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the non-LLM hot paths and compare with a stored baseline")
+    add_edition_argument(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark (median is kept)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown versus baseline before flagging a regression (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the fixture consultation")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    module = load_edition(args.edition)
+    with quiet():
+        benchmarks = build_benchmarks(module, build_fixtures(module, args.seed))
+
+    path = baseline_path(args.edition)
+    baseline = {}
+    if os.path.exists(path) and not args.save_baseline:
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results, regressions = {}, []
+    print(f"Edition {args.edition}, median of {args.repeat}\n")
+    print(f"{'benchmark':<42} {'µs/call':>10} {'baseline':>10} {'change':>8}")
+    for name, fn in benchmarks.items():
+        if args.filter not in name:
+            continue
+        random.seed(args.seed)
+        with quiet():
+            seconds = time_call(fn, args.repeat)
+            if name in baseline and seconds / baseline[name] - 1 > args.threshold:
+                # Confirm before flagging: a single noisy repeat should not fail the run
+                seconds = min(seconds, time_call(fn, args.repeat * 2))
+        results[name] = seconds
+        line = f"{name:<42} {seconds * 1e6:>10.2f}"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            flag = ""
+            if change > args.threshold:
+                regressions.append(name)
+                flag = "  REGRESSION"
+            line += f" {baseline[name] * 1e6:>10.2f} {change:>+8.1%}{flag}"
+        print(line)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"edition": args.edition, "python": sys.version.split()[0], "unit": "seconds/call",
+                       "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline saved: {os.path.relpath(path, ROOT)}")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+    elif baseline:
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Knowledge base scaling: test execution and test selection with thousands of diseases
+
+Generates a synthetic catalog (the edition's own diseases and tests plus
+generated ones, with a sparse random relevance matrix), loads it into an
+edition's engine through MedicalConfig.use_knowledge_base and times the paths
+that touch the catalog on every test: perform_test, every test selector and
+the posterior update and top-k query. Each path must stay under --limit-us
+per call; the script exits with status 1 when one does not.
+
+    python benchmarks/bench_knowledge_scale.py --edition EN --diseases 5000 --tests 500 --per-test 200
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_hot_paths import FixedReplyClient, time_call
+from common import add_edition_argument, load_edition, quiet
+from medical_engine.knowledge import forget_loaded, load_knowledge_base
+
+
+def write_catalog(module, path: str, diseases: int, tests: int, per_test: int, seed: int):
+    """Write a synthetic knowledge base that extends the edition's own catalog"""
+    config = module.MedicalConfig
+    rng = random.Random(seed)
+    disease_names = list(config.DISEASE_LIBRARY)
+    disease_names += [f"Condition {i:05d}" for i in range(max(0, diseases - len(disease_names)))]
+    test_rows = [{"name": name, "cost": cost, "accuracy": config.TEST_ACCURACY[name]}
+                 for name, cost in config.TEST_COSTS.items()]
+    test_rows += [{"name": f"Assay {i:04d}", "cost": rng.randint(30, 600), "accuracy": round(rng.uniform(0.6, 0.97), 2)}
+                  for i in range(max(0, tests - len(test_rows)))]
+    relevance = {
+        row["name"]: {disease: round(rng.uniform(0.05, 0.95), 2)
+                      for disease in rng.sample(disease_names, min(per_test, len(disease_names)))}
+        for row in test_rows
+    }
+    personalities = {name: dict(traits, ideal_cost_range=list(traits["ideal_cost_range"]))
+                     for name, traits in config.PERSONALITY_TYPES.items()}
+    catalog = {"tests": test_rows, "diseases": disease_names, "personalities": personalities,
+               "relevance": relevance}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False)
+
+
+def build_benchmarks(module, seed: int) -> dict:
+    """Name -> zero-argument callable for every path that scales with the catalog"""
+    config = module.MedicalConfig
+    kb = config.KNOWLEDGE
+    rng = random.Random(seed)
+    pairs = [(rng.choice(kb.tests), rng.choice(kb.diseases)) for _ in range(256)]
+    medical_system = module.MedicalSystem()
+
+    def perform_tests():
+        for test, disease in pairs[:16]:
+            medical_system.perform_test(test, disease)
+
+    # Offline doctor: leading candidate from the dialogue, then the most relevant affordable test
+    disease = config.DISEASE_LIBRARY[0]
+    state = module.programState()
+    state.remaining_budget = 10_000
+    facts = config.DISEASE_SYMPTOM_FACTS.get(disease, [])
+    state.dialogue_history.append({"role": "patient", "content": ", ".join(facts)})
+    offline_doctor = module.OfflineDoctorAgent(None)
+    llm_doctor = module.DoctorAgent(FixedReplyClient(kb.tests[-1]))
+    hit_response = f"I would order {kb.tests[-1]}."
+    miss_response = "I would rather not order anything expensive today."
+
+    observations = [(rng.choice(kb.tests), rng.random() < 0.3) for _ in range(8)]
+
+    def posterior_round():
+        posterior = module.DiseasePosterior(kb, module.MedicalSystem.DEFAULT_RELEVANCE)
+        for test, positive in observations:
+            posterior.observe(test, positive)
+        return posterior.top(config.DIFFERENTIAL_SIZE)
+
+    posterior = module.DiseasePosterior(kb, module.MedicalSystem.DEFAULT_RELEVANCE)
+    for test, positive in observations:
+        posterior.observe(test, positive)
+
+    return {
+        "perform_test (per call)": (perform_tests, 16),
+        "relevance_of lookup": (lambda: kb.relevance_of(*pairs[0], 0.1), 1),
+        "OfflineDoctorAgent.select_test_type": (
+            lambda: offline_doctor.select_test_type(state, [], state.dialogue_history), 1),
+        "DoctorAgent._select_basic_test": (lambda: llm_doctor._select_basic_test(250), 1),
+        "DoctorAgent._extract_test_from_response (hit)": (
+            lambda: llm_doctor._extract_test_from_response(hit_response, kb.tests, 10_000), 1),
+        "DoctorAgent._extract_test_from_response (miss)": (
+            lambda: llm_doctor._extract_test_from_response(miss_response, kb.tests, 10_000), 1),
+        "DiseasePosterior.observe (fresh posterior)": (
+            lambda: module.DiseasePosterior(kb).observe(*observations[0]), 1),
+        "DiseasePosterior.top(3)": (lambda: posterior.top(config.DIFFERENTIAL_SIZE), 1),
+        "posterior: 8 tests + top(3)": (posterior_round, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time catalog-dependent paths on a large synthetic knowledge base")
+    add_edition_argument(parser)
+    parser.add_argument("--diseases", type=int, default=5000)
+    parser.add_argument("--tests", type=int, default=500)
+    parser.add_argument("--per-test", type=int, default=200, help="Relevance entries per test (row non-zeros)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per benchmark (median is kept)")
+    parser.add_argument("--limit-us", type=float, default=1000.0, help="Per-call limit every path must meet")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    module = load_edition(args.edition)
+    workdir = tempfile.mkdtemp(prefix="bench_kb_")
+    path = os.path.join(workdir, "catalog.json")
+    try:
+        write_catalog(module, path, args.diseases, args.tests, args.per_test, args.seed)
+        start = time.perf_counter()
+        load_knowledge_base(path)  # Parses, validates, compiles and writes the cache
+        cold = time.perf_counter() - start
+        forget_loaded()
+        start = time.perf_counter()
+        kb = module.MedicalConfig.use_knowledge_base(path)  # Served from the compiled cache
+        cached = time.perf_counter() - start
+
+        print(f"Edition {args.edition}: {kb}, file {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"Load: parse + validate + compile {cold * 1000:.1f} ms, from compiled cache {cached * 1000:.1f} ms\n")
+        print(f"{'benchmark':<48} {'µs/call':>10}")
+        over = []
+        with quiet():
+            benchmarks = build_benchmarks(module, args.seed)
+        for name, (fn, calls) in benchmarks.items():
+            random.seed(args.seed)
+            with quiet():
+                seconds = time_call(fn, args.repeat) / calls
+            flag = ""
+            if seconds * 1e6 > args.limit_us:
+                over.append(name)
+                flag = "  OVER LIMIT"
+            print(f"{name:<48} {seconds * 1e6:>10.2f}{flag}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if over:
+        print(f"\n{len(over)} path(s) slower than {args.limit_us:.0f} µs per call")
+        sys.exit(1)
+    print(f"\nAll paths under {args.limit_us:.0f} µs per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""The same seeded scenario in both locales, side by side
+
+Loads the EN and CN locale packs into the shared engine in one process and plays
+the same seeded auto-mode rounds in each, either fully offline (rule-based doctor
+and patient) or against the scripted LLM from common.py. Because both locales
+drive the same engine, offline random draws line up: the cases come out as the
+same diseases and personalities, so differences in speed or outcome come from the
+locale pack (text matching) rather than from the scenario.
+
+    python benchmarks/bench_locales.py --rounds 30 --seed 7
+    python benchmarks/bench_locales.py --mode llm --rounds 8
+"""
+
+import argparse
+import json
+import random
+import time
+
+from common import EDITIONS, install_scripted_llm, load_edition, quiet
+
+
+def run_locale(edition: str, mode: str, rounds: int, seed: int) -> dict:
+    """Play `rounds` seeded rounds in one locale and summarize them"""
+    start = time.perf_counter()
+    module = load_edition(edition)
+    load_seconds = time.perf_counter() - start
+    fake = install_scripted_llm(module, edition) if mode == "llm" else None
+
+    random.seed(seed)
+    with quiet():
+        program = module.MedicalDiagnosisprogram(auto_mode=True, offline=mode == "offline")
+        results = []
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(rounds):
+            results.append(program.play_round())
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    diseases = module.MedicalConfig.DISEASE_LIBRARY
+    return {
+        "edition": edition,
+        "load_ms": load_seconds * 1000,
+        "rounds": len(results),
+        "wall_seconds": wall,
+        "rounds_per_second": len(results) / wall if wall else 0.0,
+        "cpu_ms_per_round": cpu / len(results) * 1000 if results else 0.0,
+        "success_rate": sum(r["success"] for r in results) / len(results) if results else 0.0,
+        "diagnosis_accuracy": sum(r["diagnosis_correct"] for r in results) / len(results) if results else 0.0,
+        "avg_questions": sum(r["questions_asked"] for r in results) / len(results) if results else 0.0,
+        "avg_tests": sum(r["tests_ordered"] for r in results) / len(results) if results else 0.0,
+        "avg_cost": sum(r["total_cost"] for r in results) / len(results) if results else 0.0,
+        "calls_per_round": len(fake.requests) / len(results) if fake and results else 0.0,
+        # Disease index per round, to check that both locales played the same cases
+        "case_sequence": [diseases.index(r["true_disease"]) for r in results],
+    }
+
+
+ROWS = [
+    ("load ms", "load_ms", "{:.1f}"),
+    ("rounds/s", "rounds_per_second", "{:.2f}"),
+    ("CPU ms/round", "cpu_ms_per_round", "{:.1f}"),
+    ("success rate", "success_rate", "{:.0%}"),
+    ("diagnosis accuracy", "diagnosis_accuracy", "{:.0%}"),
+    ("avg questions", "avg_questions", "{:.2f}"),
+    ("avg tests", "avg_tests", "{:.2f}"),
+    ("avg cost", "avg_cost", "{:.0f}"),
+    ("LLM calls/round", "calls_per_round", "{:.1f}"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one seeded scenario in every locale and compare")
+    parser.add_argument("--mode", choices=["offline", "llm"], default="offline",
+                        help="Rule-based offline rounds, or rounds against the scripted LLM")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--locales", default=",".join(EDITIONS), help="Comma-separated editions to compare")
+    parser.add_argument("--json", default="", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    editions = [e.strip().upper() for e in args.locales.split(",") if e.strip()]
+    results = [run_locale(edition, args.mode, args.rounds, args.seed) for edition in editions]
+
+    print(f"Mode {args.mode}, {args.rounds} rounds, seed {args.seed}\n")
+    print(f"{'':<20}" + "".join(f"{r['edition']:>10}" for r in results))
+    for label, key, fmt in ROWS:
+        print(f"{label:<20}" + "".join(f"{fmt.format(r[key]):>10}" for r in results))
+    if args.mode == "offline":
+        # Scripted LLM replies differ per locale and consume different draws, so only offline runs line up
+        same = all(r["case_sequence"] == results[0]["case_sequence"] for r in results)
+        print(f"\nSame case sequence in every locale: {'yes' if same else 'NO'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"mode": args.mode, "seed": args.seed, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Consultation service under concurrent clients
+
+Starts the asyncio consultation service (--serve) in-process on a free port,
+against the latency-injecting scripted LLM from bench_throughput.py (or fully
+offline), and drives it over real HTTP connections from many client threads.
+Each client plays whole consultations: start, a few AI doctor turns, one test
+chosen by the AI doctor, then the AI diagnosis. Reports consultations per
+second and per-endpoint request latency, so the cost of the HTTP/event-loop
+layer shows up next to the LLM latency it has to hide.
+
+    python benchmarks/bench_service.py --edition EN --clients 1,8,32 --consultations 64 --latency-ms 100
+    python benchmarks/bench_service.py --mode offline --clients 16 --consultations 400
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import threading
+import time
+
+from bench_throughput import LatencyModel, LatencyOpenAI, percentile
+from common import ScriptedResponder, add_edition_argument, load_edition, quiet
+
+
+def start_service(module, mode: str, seed: int):
+    """Run a ConsultationService on its own event loop thread; returns (service, port)"""
+    service = module.ConsultationService(offline=mode == "offline", seed=seed)
+    ready = threading.Event()
+    bound = {}
+
+    def serve():
+        async def main():
+            server = await service.serve("127.0.0.1", 0)
+            bound["port"] = server.sockets[0].getsockname()[1]
+            ready.set()
+            async with server:
+                await server.serve_forever()
+        asyncio.run(main())
+
+    threading.Thread(target=serve, name="consultation-service", daemon=True).start()
+    ready.wait()
+    return service, bound["port"]
+
+
+def run_clients(port: int, clients: int, consultations: int, turns: int) -> dict:
+    """Play `consultations` consultations from `clients` keep-alive HTTP clients"""
+    lock = threading.Lock()
+    remaining = [consultations]
+    latencies = {}  # endpoint -> [seconds]
+    errors = []
+    finished = []
+
+    def take() -> bool:
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def call(conn, endpoint: str, method: str, path: str, body=None) -> dict:
+        start = time.perf_counter()
+        conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        with lock:
+            latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path}: {response.status} {payload.get('error')}")
+        return payload
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        while take():
+            try:
+                consultation = call(conn, "start", "POST", "/consultations")
+                path = f"/consultations/{consultation['id']}"
+                for _ in range(turns):
+                    reply = call(conn, "doctor turn", "POST", f"{path}/turns", {"role": "doctor"})
+                    if reply["consultation"]["status"] != "open":
+                        break
+                else:
+                    call(conn, "test", "POST", f"{path}/tests", {})
+                result = call(conn, "diagnosis", "POST", f"{path}/diagnosis", {})["result"]
+                call(conn, "delete", "DELETE", path)
+                with lock:
+                    finished.append(result)
+            except Exception as e:  # Keep the other clients going; reported below
+                errors.append(repr(e))
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        conn.close()
+
+    threads = [threading.Thread(target=client, name=f"client-{i}") for i in range(clients)]
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "clients": clients,
+        "consultations": len(finished),
+        "errors": errors,
+        "wall_seconds": wall,
+        "consultations_per_second": len(finished) / wall if wall else 0.0,
+        "cpu_ms_per_consultation": cpu / len(finished) * 1000 if finished else 0.0,
+        "success_rate": sum(r["success"] for r in finished) / len(finished) if finished else 0.0,
+        "latency_ms": {endpoint: {"p50": percentile(values, 50) * 1000, "p95": percentile(values, 95) * 1000}
+                       for endpoint, values in latencies.items()},
+    }
+
+
+def parse_int_list(text: str):
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the consultation service with concurrent HTTP clients")
+    add_edition_argument(parser)
+    parser.add_argument("--mode", choices=["llm", "offline"], default="llm",
+                        help="Scripted LLM with injected latency, or the rule-based offline engine")
+    parser.add_argument("--clients", type=parse_int_list, default=[1, 8, 32],
+                        help="Comma-separated numbers of concurrent clients")
+    parser.add_argument("--consultations", type=int, default=64, help="Consultations per client count")
+    parser.add_argument("--turns", type=int, default=3, help="AI doctor turns before the test")
+    parser.add_argument("--workers", type=int, default=0, help="Service worker threads (default: MedicalConfig)")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Median API latency per call")
+    parser.add_argument("--latency-dist", choices=LatencyModel.DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default="", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    module = load_edition(args.edition)
+    if args.workers:
+        module.MedicalConfig.SERVICE_WORKERS = args.workers
+    latency = LatencyModel(args.latency_dist, args.latency_ms, args.spread, args.seed)
+    if args.mode == "llm":
+        fake = LatencyOpenAI(module, ScriptedResponder(module, args.edition), latency)
+        module.OpenAI = lambda **kwargs: fake
+    with quiet():
+        service, port = start_service(module, args.mode, args.seed)
+
+    print(f"Edition {args.edition}, mode {args.mode}"
+          f"{f', latency {latency.describe()}' if args.mode == 'llm' else ''}, "
+          f"{module.MedicalConfig.SERVICE_WORKERS} service workers\n")
+    print(f"{'clients':>7} {'done':>5} {'cons/s':>8} {'CPU ms/cons':>11}  request p50 / p95 ms")
+    results = []
+    for clients in args.clients:
+        with quiet():
+            result = run_clients(port, clients, args.consultations, args.turns)
+        results.append(result)
+        latencies = "  ".join(f"{endpoint} {stats['p50']:.0f}/{stats['p95']:.0f}"
+                              for endpoint, stats in result["latency_ms"].items())
+        print(f"{clients:>7} {result['consultations']:>5} {result['consultations_per_second']:>8.2f} "
+              f"{result['cpu_ms_per_consultation']:>11.1f}  {latencies}")
+        for error in result["errors"][:5]:
+            print(f"        failed: {error}")
+
+    print(f"\nService: {json.dumps(service.health()['consultations'])}, "
+          f"{service.health()['rounds_finished']} rounds finished")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"edition": args.edition, "mode": args.mode, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
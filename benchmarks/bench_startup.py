@@ -0,0 +1,86 @@
+"""CLI startup time and the imports behind it
+
+Times fresh interpreter runs of an edition (``--help``, a bare ``import main`` and a
+one-round offline simulation) and lists the heaviest imports reported by
+``python -X importtime``, so import-time regressions show up next to the number
+they cost.
+
+    python benchmarks/bench_startup.py --edition EN --runs 7
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import EDITIONS, ROOT, add_edition_argument
+
+COMMANDS = {
+    "--help": ["main.py", "--help"],
+    "import main": ["-c", "import main"],
+    "offline, 1 round": ["main.py", "--offline", "--auto", "--rounds", "1"],
+}
+
+
+def time_command(args, cwd: str, runs: int) -> list:
+    """Wall seconds of each run of `python <args>`"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def import_times(cwd: str) -> list:
+    """(cumulative µs, module) for modules imported directly by main, from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1 or name.strip() == "main":
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup time and heaviest imports")
+    add_edition_argument(parser)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs per command")
+    parser.add_argument("--top", type=int, default=10, help="Imports to list")
+    args = parser.parse_args()
+
+    # Run a copy (launcher plus shared engine) in a scratch directory so the offline round's
+    # records stay out of the tree
+    scratch = tempfile.mkdtemp(prefix=f"startup_{args.edition.lower()}_")
+    cwd = os.path.join(scratch, os.path.basename(os.path.dirname(EDITIONS[args.edition])))
+    os.makedirs(cwd)
+    shutil.copy(EDITIONS[args.edition], cwd)
+    shutil.copytree(os.path.join(ROOT, "medical_engine"), os.path.join(scratch, "medical_engine"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    print(f"Edition {args.edition}, {args.runs} runs per command, {sys.executable}\n")
+    print(f"{'command':<20} {'median ms':>10} {'min ms':>8}")
+    baseline = time_command(["-c", "pass"], cwd, args.runs)
+    print(f"{'(empty interpreter)':<20} {statistics.median(baseline) * 1000:>10.0f} {min(baseline) * 1000:>8.0f}")
+    for label, command in COMMANDS.items():
+        timings = time_command(command, cwd, args.runs)
+        print(f"{label:<20} {statistics.median(timings) * 1000:>10.0f} {min(timings) * 1000:>8.0f}")
+
+    print("\nHeaviest imports of `import main` (cumulative, -X importtime):")
+    for cumulative, name in sorted(import_times(cwd), reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
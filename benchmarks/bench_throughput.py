@@ -0,0 +1,183 @@
+"""End-to-end consultation throughput against a fake LLM with injected latency
+
+Runs whole rounds of MedicalDiagnosisprogram (auto mode) against the scripted
+LLM from common.py, with every call delayed by a sampled API latency. Each
+concurrency level runs that many independent programs on threads that pull
+rounds from a shared counter, so the sweep shows how many consultations per
+hour the orchestration sustains once LLM latency dominates, and how much CPU
+it spends per round on its own. Programs are seeded and play rounds by their
+number in the run, so every concurrency level simulates the same cases and
+test results (only the scripted LLM replies depend on call order).
+
+    python benchmarks/bench_throughput.py --edition EN --latency-ms 100 --concurrency 1,4,8 --rounds 8,16
+    python benchmarks/bench_throughput.py --latency-dist lognormal --spread 0.5 --speculate
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+
+from common import ScriptedOpenAI, ScriptedResponder, add_edition_argument, load_edition, quiet
+
+
+class LatencyModel:
+    """Samples per-call API latency (seconds) from a fixed, uniform or lognormal distribution"""
+
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(self, dist: str, median_ms: float, spread: float, seed: int):
+        self.dist = dist
+        self.median = median_ms / 1000
+        self.spread = spread  # Relative half-width (uniform) or log-space sigma (lognormal)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.dist == "uniform":
+                return max(0.0, self.median * (1 + self.rng.uniform(-self.spread, self.spread)))
+            if self.dist == "lognormal":
+                return self.median * math.exp(self.rng.gauss(0, self.spread))
+            return self.median
+
+    def describe(self) -> str:
+        if self.dist == "fixed":
+            return f"fixed {self.median * 1000:.0f} ms"
+        return f"{self.dist} median {self.median * 1000:.0f} ms, spread {self.spread}"
+
+
+class LatencyOpenAI(ScriptedOpenAI):
+    """Scripted client that sleeps for a sampled latency before answering; safe to share across threads"""
+
+    def __init__(self, module, responder, latency: LatencyModel):
+        super().__init__(module, responder)
+        self.latency = latency
+        self.lock = threading.Lock()
+
+    def _create(self, model, messages, temperature=None, max_tokens=None, **kwargs):
+        time.sleep(self.latency.sample())  # Releases the GIL like a real network wait
+        with self.lock:
+            return super()._create(model, messages, temperature, max_tokens, **kwargs)
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_config(module, edition: str, concurrency: int, rounds: int, latency: LatencyModel, seed: int) -> dict:
+    """Play `rounds` rounds on `concurrency` parallel programs and measure them"""
+    fake = LatencyOpenAI(module, ScriptedResponder(module, edition), latency)
+    module.OpenAI = lambda **kwargs: fake
+
+    lock = threading.Lock()
+    next_round = [0]
+    round_times = []
+    errors = []
+
+    def take_round() -> int:
+        """Number of the next round to play, 0 once all are taken"""
+        with lock:
+            if next_round[0] >= rounds:
+                return 0
+            next_round[0] += 1
+            return next_round[0]
+
+    def worker(program):
+        while True:
+            round_number = take_round()
+            if not round_number:
+                break
+            start = time.perf_counter()
+            try:
+                program.play_round(round_number)
+            except Exception as e:  # Keep the other workers going; reported below
+                errors.append(repr(e))
+                continue
+            with lock:
+                round_times.append(time.perf_counter() - start)
+
+    with quiet():
+        programs = [module.MedicalDiagnosisprogram(auto_mode=True, seed=seed) for _ in range(concurrency)]
+        threads = [threading.Thread(target=worker, args=(p,), name=f"consultation-{i}")
+                   for i, p in enumerate(programs)]
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+    completed = len(round_times)
+    return {
+        "concurrency": concurrency,
+        "rounds": completed,
+        "errors": errors,
+        "wall_seconds": wall,
+        "rounds_per_second": completed / wall if wall else 0.0,
+        "rounds_per_hour": completed / wall * 3600 if wall else 0.0,
+        "calls_per_round": len(fake.requests) / completed if completed else 0.0,
+        "round_p50": percentile(round_times, 50),
+        "round_p95": percentile(round_times, 95),
+        "round_p99": percentile(round_times, 99),
+        "cpu_ms_per_round": cpu / completed * 1000 if completed else 0.0,
+    }
+
+
+def parse_int_list(text: str):
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep concurrency and round counts against a latency-injecting fake LLM")
+    add_edition_argument(parser)
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 4, 8],
+                        help="Comma-separated numbers of concurrent consultations")
+    parser.add_argument("--rounds", type=parse_int_list, default=[8],
+                        help="Comma-separated total rounds per configuration")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Median API latency per call")
+    parser.add_argument("--latency-dist", choices=LatencyModel.DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.3,
+                        help="Uniform: relative half-width; lognormal: sigma of log latency")
+    parser.add_argument("--speculate", action="store_true", help="Enable speculative questions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default="", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    module = load_edition(args.edition)
+    module.MedicalConfig.ENABLE_SPECULATIVE_QUESTIONS = args.speculate
+    latency = LatencyModel(args.latency_dist, args.latency_ms, args.spread, args.seed)
+
+    print(f"Edition {args.edition}, latency {latency.describe()}"
+          f"{', speculative questions' if args.speculate else ''}\n")
+    print(f"{'conc':>4} {'rounds':>6} {'rounds/s':>9} {'rounds/h':>9} {'calls/rnd':>9} "
+          f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'CPU ms/rnd':>10}")
+    results = []
+    for rounds in args.rounds:
+        for concurrency in args.concurrency:
+            result = run_config(module, args.edition, concurrency, rounds, latency, args.seed)
+            results.append(result)
+            print(f"{concurrency:>4} {result['rounds']:>6} {result['rounds_per_second']:>9.3f} "
+                  f"{result['rounds_per_hour']:>9.0f} {result['calls_per_round']:>9.1f} "
+                  f"{result['round_p50']:>7.2f} {result['round_p95']:>7.2f} {result['round_p99']:>7.2f} "
+                  f"{result['cpu_ms_per_round']:>10.1f}")
+            for error in result["errors"]:
+                print(f"     round failed: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"edition": args.edition, "latency": latency.describe(), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Shared helpers for the benchmark scripts
+
+Benchmarks load one edition's engine under a unique module name, redirect its
+record/memory directories into a temporary folder and replace the OpenAI client
+with a scripted one, so no network access or API key is needed.
+"""
+
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EDITIONS = {
+    "EN": os.path.join(ROOT, "AI_doctor-patient_diagnostic_system-EN", "main.py"),
+    "CN": os.path.join(ROOT, "AI_doctor-patient_diagnostic_system-CN", "main.py"),
+}
+
+sys.path.insert(0, ROOT)
+from medical_engine import load_engine  # noqa: E402
+
+
+def load_edition(edition: str):
+    """Load an edition's engine with records and memory redirected to a temp dir"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = load_engine(edition, module_name=f"medical_main_{edition.lower()}")
+
+    workdir = tempfile.mkdtemp(prefix=f"bench_{edition.lower()}_")
+    config = module.MedicalConfig
+    config.RECORDS_DIRC = os.path.join(workdir, "medical_records")
+    config.DOCTOR_MEMORY_DIR = os.path.join(workdir, "doctor_memory")
+    config.ROUND_LOGS_DIR = os.path.join(workdir, "round_logs")
+    config.SAVE_RECORDS = False
+    config.ENABLE_LONG_TERM_MEMORY = False
+    config.DEEPSEEK_API_KEY = config.DEEPSEEK_API_KEY or "benchmark"
+    return module
+
+
+def estimate_message_tokens(module, messages) -> int:
+    """Estimated prompt tokens of a message list (content plus a small per-message overhead)"""
+    return sum(module.DialogueBuffer.estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+class PrefixCache:
+    """Simulated provider-side prompt cache, matched at whole-message granularity"""
+
+    def __init__(self):
+        self.prefixes = set()
+
+    def lookup(self, module, messages) -> int:
+        """Return cached tokens for this request and remember its prefixes"""
+        digest = hashlib.sha1()
+        hit_tokens, hitting = 0, True
+        for message in messages:
+            digest.update(message["role"].encode("utf-8") + b"\0" + message["content"].encode("utf-8") + b"\0")
+            key = digest.hexdigest()
+            if hitting and key in self.prefixes:
+                hit_tokens += estimate_message_tokens(module, [message])
+            else:
+                hitting = False
+                self.prefixes.add(key)
+        return hit_tokens
+
+
+class ScriptedResponder:
+    """Canned replies chosen by matching the system prompt against the edition's prompt templates"""
+
+    PATIENT_REPLIES = {
+        "EN": ["Sort of, it has been like this for a few days.",
+               "I think it gets worse in the evening, not sure why.",
+               "A bit, maybe. It's hard to say."],
+        "CN": ["好像有几天了，一直这样。", "晚上好像更严重一点，说不清为什么。", "有点吧，我也说不太清。"],
+    }
+    EVIDENCE_REPLY = {"EN": "No, more information needed", "CN": "不，需要更多信息"}
+    CONTINUE_REPLY = {"EN": "Stop consultation", "CN": "停止问诊"}
+
+    def __init__(self, module, edition: str):
+        self.module = module
+        self.edition = edition
+        self.counter = 0
+        self.offline_cases = module.OfflineCaseGenerator(None)
+
+    def __call__(self, messages) -> str:
+        module, system_prompt = self.module, messages[0]["content"]
+        self.counter += 1
+        if system_prompt.startswith(module.DoctorAgent.EVIDENCE_PROMPT.role):
+            return self.EVIDENCE_REPLY[self.edition]
+        if system_prompt.startswith(module.DoctorAgent.QUESTION_PROMPT.role):
+            questions = module.OfflineDoctorAgent.QUESTIONS
+            return questions[self.counter % len(questions)]
+        if system_prompt.startswith(module.DoctorAgent.TEST_SELECTION_PROMPT.role):
+            return next(iter(module.MedicalConfig.TEST_COSTS))
+        if system_prompt.startswith(module.DoctorAgent.DIAGNOSIS_PROMPT.role):
+            return module.MedicalConfig.DISEASE_LIBRARY[0]
+        if system_prompt.startswith(module.CaseGenerator.SYMPTOMS_PROMPT.role):
+            disease = messages[-1]["content"].split(": ", 1)[-1]
+            return self.offline_cases._generate_symptoms_description(disease)
+        if system_prompt.startswith(module.MedicalDiagnosisprogram.CONTINUE_PROMPT.role):
+            return self.CONTINUE_REPLY[self.edition]
+        replies = self.PATIENT_REPLIES[self.edition]
+        return replies[self.counter % len(replies)]
+
+
+class ScriptedOpenAI:
+    """Drop-in for openai.OpenAI that answers from a responder and reports simulated cache usage"""
+
+    def __init__(self, module, responder, **kwargs):
+        self.module = module
+        self.responder = responder
+        self.cache = PrefixCache()
+        self.requests = []  # Message lists sent, in order
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature=None, max_tokens=None, **kwargs):
+        self.requests.append(messages)
+        prompt_tokens = estimate_message_tokens(self.module, messages)
+        hit_tokens = self.cache.lookup(self.module, messages)
+        content = self.responder(messages)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=self.module.DialogueBuffer.estimate_tokens(content),
+            prompt_cache_hit_tokens=hit_tokens,
+            prompt_cache_miss_tokens=prompt_tokens - hit_tokens
+        )
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def install_scripted_llm(module, edition: str, responder=None) -> "ScriptedOpenAI":
+    """Make every DeepSeekClient created afterwards talk to one shared scripted client"""
+    fake = ScriptedOpenAI(module, responder or ScriptedResponder(module, edition))
+    module.OpenAI = lambda **kwargs: fake
+    return fake
+
+
+def quiet():
+    """Context manager that swallows the program's console output"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def add_edition_argument(parser):
+    parser.add_argument("--edition", choices=sorted(EDITIONS), default="EN", help="Program edition to benchmark")
+
+
+if __name__ == "__main__":
+    sys.exit("common.py holds shared helpers; run one of the bench_*.py scripts instead")
@@ -0,0 +1,173 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint
+
+Serves POST /v1/chat/completions with the scripted replies from common.py, so the
+program can run end to end without network access or an API key. Responses carry
+usage with simulated DeepSeek prompt cache fields, an optional fixed latency and
+optional random stalls (to exercise request hedging). Requests with "stream": true
+get server-sent chunks followed by a usage chunk, as hedged calls ask for.
+
+    python benchmarks/mock_llm_server.py --edition EN --port 8765 --latency-ms 40 --stall-rate 0.05 --stall-ms 3000
+    python AI_doctor-patient_diagnostic_system-EN/main.py --auto --rounds 3 --llm-backend all=local
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import PrefixCache, ScriptedResponder, add_edition_argument, estimate_message_tokens, load_edition
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the scripted responder and simulated prompt cache"""
+
+    daemon_threads = True
+
+    def __init__(self, address, module, edition: str, latency: float = 0.0,
+                 stall_rate: float = 0.0, stall: float = 0.0, seed: int = 0):
+        super().__init__(address, MockLLMHandler)
+        self.module = module
+        self.responder = ScriptedResponder(module, edition)
+        self.cache = PrefixCache()
+        self.latency = latency
+        self.stall_rate = stall_rate  # Probability that a request stalls
+        self.stall = stall            # Extra delay of a stalled request (seconds)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def delay(self) -> float:
+        """Latency for the next request, including an occasional stall"""
+        with self.lock:
+            stalled = self.stall_rate and self.rng.random() < self.stall_rate
+        return self.latency + (self.stall if stalled else 0.0)
+
+    def complete(self, body: dict) -> dict:
+        """Build a chat.completion response for a request body"""
+        messages = body.get("messages") or []
+        with self.lock:
+            self.request_count += 1
+            content = self.responder(messages)
+            hit_tokens = self.cache.lookup(self.module, messages)
+        prompt_tokens = estimate_message_tokens(self.module, messages)
+        completion_tokens = self.module.DialogueBuffer.estimate_tokens(content)
+        return {
+            "id": f"mock-{self.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_cache_hit_tokens": hit_tokens,
+                "prompt_cache_miss_tokens": prompt_tokens - hit_tokens
+            }
+        }
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    """Request handler for /v1/chat/completions and /v1/models"""
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        delay = self.server.delay()
+        if body.get("stream"):
+            self._send_stream(body, delay)
+            return
+        if delay:
+            time.sleep(delay)
+        self._send_json(200, self.server.complete(body))
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock-chat", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, body: dict, delay: float):
+        """Send a completion as chat.completion.chunk events, a few characters per chunk
+
+        Headers go out at once and the delay is spent before the first chunk, as with a
+        streaming API; a client that closes the stream early just ends the response.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        if delay:
+            time.sleep(delay)
+        completion = self.server.complete(body)
+        content = completion["choices"][0]["message"]["content"]
+        base = {key: completion[key] for key in ("id", "created", "model")}
+        try:
+            for start in range(0, len(content), 16):
+                delta = {"content": content[start:start + 16]}
+                self._send_event(dict(base, object="chat.completion.chunk",
+                                      choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+            self._send_event(dict(base, object="chat.completion.chunk", choices=[], usage=completion["usage"]))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Closed by the client, e.g. the loser of a hedge race
+
+    def _send_event(self, payload: dict):
+        self.wfile.write(b"data: " + json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n\n")
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_server(edition: str = "EN", host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 stall_rate: float = 0.0, stall: float = 0.0, module=None) -> MockLLMServer:
+    """Start a mock server in a background thread; port 0 picks a free port"""
+    server = MockLLMServer((host, port), module or load_edition(edition), edition, latency, stall_rate, stall)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock OpenAI-compatible LLM server")
+    add_edition_argument(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every completion")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Probability that a completion stalls")
+    parser.add_argument("--stall-ms", type=float, default=0.0, help="Extra delay of a stalled completion")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for stall draws")
+    args = parser.parse_args()
+
+    server = MockLLMServer((args.host, args.port), load_edition(args.edition), args.edition,
+                           args.latency_ms / 1000, args.stall_rate, args.stall_ms / 1000, args.seed)
+    print(f"Mock LLM server ({args.edition}) on http://{args.host}:{server.server_port}/v1 — Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
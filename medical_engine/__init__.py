@@ -0,0 +1,54 @@
+"""Shared engine of the English and Chinese editions
+
+engine.py holds the whole consultation engine once; each edition's main.py runs
+it with its locale pack:
+
+    from medical_engine import load_engine
+    engine = load_engine("EN", data_dir)
+    engine.main()
+
+Every edition gets its own module (own MedicalConfig, tracer, metrics), so both
+can be loaded side by side in one process, e.g. by benchmarks/bench_locales.py.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+
+from .locales import LOCALES, load_locale
+
+ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine.py")
+EDITION_DIRS = {  # Default data directory (records, doctor memory, .env) of each edition
+    edition: os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          f"AI_doctor-patient_diagnostic_system-{edition}")
+    for edition in LOCALES
+}
+
+_lock = threading.Lock()
+
+
+def load_engine(edition: str, data_dir: str = None, module_name: str = None):
+    """Load the engine for an edition ("EN" or "CN") as its own module
+
+    The module is cached in sys.modules under module_name (default
+    medical_engine.engine_<edition>); pass a new name to get a fresh copy.
+    """
+    edition = edition.upper()
+    module_name = module_name or f"{__name__}.engine_{edition.lower()}"
+    with _lock:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        locale = load_locale(edition)
+        spec = importlib.util.spec_from_file_location(module_name, ENGINE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        module.L = locale
+        module.DATA_DIR = os.path.abspath(data_dir or EDITION_DIRS[edition])
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        return module
@@ -0,0 +1,4199 @@
+"""
+AI Doctor-Patient Diagnostic System - Complete Records and Long-Term Learning Mechanism
+
+Shared engine of the English and Chinese editions. Everything language-specific
+(misunderstanding triggers, prompts, messages) comes from a locale pack and the
+tests, diseases and personalities from its knowledge base file;
+medical_engine.load_engine() runs this file once per edition.
+"""
+
+import random
+import time
+import hashlib
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import zlib
+from bisect import bisect_right
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from datetime import datetime
+from functools import partial, wraps
+from types import SimpleNamespace
+from typing import List, Dict, Optional, Tuple
+from colorama import Fore, Style
+
+from medical_engine.knowledge import DiseasePosterior, KnowledgeBase, load_knowledge_base
+
+# Set by medical_engine.load_engine() before this file runs:
+#   L         the edition's LocalePack (text matching, prompts, messages)
+#   DATA_DIR  the edition folder that holds .env, records and doctor memory
+if "L" not in globals():
+    raise ImportError("medical_engine.engine is loaded per edition: use medical_engine.load_engine()")
+
+# Importing the OpenAI SDK takes most of the startup time, so it is loaded on first use;
+# console setup and .env loading are deferred too (init_console, MedicalConfig.load_environment)
+OpenAI = None
+
+
+def openai_client_class():
+    """openai.OpenAI, importing the SDK on first use"""
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI
+    return OpenAI
+
+
+_console_ready = False
+
+
+def init_console():
+    """Initialize colorama once"""
+    global _console_ready
+    if not _console_ready:
+        from colorama import init
+        init(autoreset=True)
+        _console_ready = True
+
+
+# ==================== Configuration Class ====================
+
+class MedicalConfig:
+    """Medical configuration class"""
+    
+    # ==================== API Configuration ====================
+    DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
+    DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+    MODEL_NAME = "deepseek-chat"
+
+    # ==================== LLM Backend Configuration ====================
+    # Named OpenAI-compatible backends; missing fields fall back to the DeepSeek settings above
+    LLM_BACKENDS = {
+        "deepseek": {},
+        "local": {  # benchmarks/mock_llm_server.py or any local OpenAI-compatible server
+            "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8765/v1"),
+            "model": os.getenv("LOCAL_LLM_MODEL", "mock-chat"),
+            "api_key": os.getenv("LOCAL_LLM_API_KEY", "local")
+        }
+    }
+    DEFAULT_LLM_BACKEND = "deepseek"
+    SITE_BACKENDS = {}  # Call site -> backend name, e.g. {"patient": "local"}; other sites use the default
+
+    # ==================== Basic Configuration ====================
+    MAX_QUESTIONS_PER_ROUND = 12  # Maximum questions per round
+    INITIAL_BUDGET = 500  # Initial budget
+    SUSPICION_THRESHOLD = 0.8  # Suspicion threshold
+    
+    # ==================== Display Configuration ====================
+    SHOW_AI_THINKING = True  # Show AI thinking process
+    SHOW_DETAILED_LOGS = True  # Show detailed logs
+    
+    # ==================== Record Configuration ====================
+    BASE_DIR = DATA_DIR
+    SAVE_RECORDS = True  # Save records
+    RECORDS_DIRC = os.path.join(BASE_DIR, "medical_records")
+    DOCTOR_MEMORY_DIR = os.path.join(BASE_DIR, "doctor_memory") 
+    ROUND_LOGS_DIR = os.path.join(BASE_DIR, "round_logs")
+    ENABLE_LONG_TERM_MEMORY = True  # Enable long-term memory
+    ENABLE_CHECKPOINTS = True  # Journal every finished round so an interrupted run can be resumed
+    MAX_HISTORY = 10  # Save last 10 session records
+    
+    # ==================== Knowledge Base ====================
+    # Tests, diseases, personalities and test-disease relevance come from a JSON/YAML file, compiled
+    # once and cached by content hash (medical_engine.knowledge); --knowledge-base swaps it
+    KNOWLEDGE_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge", L.KNOWLEDGE_BASE)
+    KNOWLEDGE = load_knowledge_base(KNOWLEDGE_BASE)
+    DIFFERENTIAL_SIZE = 3  # Most likely diseases given the test results, kept in each round record
+
+    # ==================== Cost Configuration ====================
+    QUESTION_COST = 0  # Questions are free
+    TEST_COSTS = KNOWLEDGE.test_costs
+    
+    TEST_ACCURACY = KNOWLEDGE.test_accuracy
+
+
+    # ==================== AI Parameters Configuration ====================
+    # Temperature parameters - different temperatures for different scenarios
+    TEMPERATURE_PATIENT_RESPONSE = 0.9    # Patient response - high temperature for diversity
+    TEMPERATURE_DOCTOR_QUESTION = 0.7     # Doctor questions - medium temperature for balance
+    TEMPERATURE_DOCTOR_DIAGNOSIS = 0.3    # Doctor diagnosis - low temperature for accuracy
+    TEMPERATURE_CASE_GENERATION = 0.6     # Case generation - medium temperature for realism
+    
+    MAX_TOKENS = 800
+
+    # ==================== Context Budget Configuration ====================
+    DIAGNOSIS_CONTEXT_TOKEN_BUDGET = 1200  # Token budget for dialogue, tests and experience in make_diagnosis
+    DIAGNOSIS_RECENT_TURNS = 6  # Most recent dialogue entries always kept verbatim
+
+    # ==================== Chat Session Configuration ====================
+    # Call sites whose prompts are growing multi-turn sessions ("question", "patient"). Sessions send more
+    # tokens and only save when the provider's prefix cache hits. bench_chat_sessions.py, EN, per round vs
+    # stateless: "question" +4% prompt / -2% uncached tokens; "question" + "patient" +22% / +2%
+    CHAT_SESSION_SITES = ("question",)
+    CHAT_SESSION_MAX_MESSAGES = 16  # Sliding window of user/assistant messages kept per session
+
+    # ==================== Request Hedging Configuration ====================
+    ENABLE_HEDGING = False  # Fire a duplicate request when a call outlives its site's latency percentile
+    HEDGE_PERCENTILE = 0.95  # Latency percentile (per call site) after which a hedge is fired
+    HEDGE_MIN_SAMPLES = 20  # Latency samples a site needs before it is hedged
+    HEDGE_MIN_DELAY = 0.2  # Never hedge sooner than this (seconds)
+    HEDGE_MAX_EXTRA_FRACTION = 0.1  # Cap on extra spend: hedges may be at most this fraction of calls
+    HEDGE_BACKEND = ""  # Backend for hedges (empty = same backend as the original request)
+    HEDGE_CANCEL_LOSERS = True  # Stream hedged calls so the losing request is closed mid-generation
+    HEDGE_WORKERS = 0  # Threads running hedged calls (0 = enough for every concurrent caller of the client)
+
+    # ==================== Request Coalescing Configuration ====================
+    ENABLE_REQUEST_COALESCING = True  # Concurrent identical requests share one in-flight call
+    COALESCE_MAX_TEMPERATURE = 0.6  # Only coalesce requests at or below this temperature
+
+    # ==================== Speculative Execution Configuration ====================
+    ENABLE_SPECULATIVE_QUESTIONS = False  # Generate the next question while evidence is being assessed
+
+    # ==================== Tracing Configuration ====================
+    ENABLE_TRACING = False  # Record timed spans of each round and export them as a Chrome trace
+    TRACE_OPENTELEMETRY = False  # Also emit spans through OpenTelemetry (if installed)
+
+    # ==================== Metrics Configuration ====================
+    ENABLE_METRICS = False  # Serve live Prometheus metrics over HTTP while the program runs
+    METRICS_HOST = "127.0.0.1"
+    METRICS_PORT = 9108
+
+    # ==================== Profiling Configuration ====================
+    PROFILE_MODE = ""  # "cprofile", "sample" (low-overhead stack sampling) or "" for off
+    PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples in "sample" mode
+    PROFILE_TOP_FUNCTIONS = 15  # Functions listed in the final report
+
+    # ==================== Service Configuration ====================
+    SERVICE_HOST = "127.0.0.1"  # --serve listens here (local only)
+    SERVICE_PORT = 8780
+    SERVICE_WORKERS = 16  # Threads running consultation steps (LLM calls) for the event loop
+    SERVICE_MAX_SESSIONS = 1000  # Open consultations kept at once
+    SERVICE_SESSION_TTL = 1800  # Seconds an idle consultation is kept before it is dropped
+    SERVICE_MAX_BODY = 64 * 1024  # Largest accepted request body (bytes)
+
+    # ==================== Batch Evaluation Configuration ====================
+    BATCH_WORKERS = 4  # Consultations run at once by --batch
+    BATCH_MAX_ATTEMPTS = 3  # Attempts per consultation before it is marked failed (retried on restart)
+    SCHEDULER_CONFIDENCE_Z = 1.96  # z of the success-rate intervals the adaptive scheduler narrows (95%)
+    SCHEDULER_WAVE_SIZE = 16  # Consultations planned at once; fixed so the plan does not depend on --workers
+    SCHEDULER_MAX_ROUNDS = 2000  # Default cap on consultations of an adaptive batch
+
+    # ==================== Disease Library ====================
+    DISEASE_LIBRARY = KNOWLEDGE.diseases
+
+    # ==================== Patient Personality Types ====================
+    PERSONALITY_TYPES = KNOWLEDGE.personality_types
+
+    # ==================== Misunderstanding Triggers ====================
+    MISUNDERSTANDING_TRIGGERS = L.MISUNDERSTANDING_TRIGGERS
+
+    # ==================== Symptom Synonyms ====================
+    # Canonical symptom -> phrases patients use for it (matched after L.fold, on word boundaries
+    # where the locale has them)
+    SYMPTOM_SYNONYMS = L.SYMPTOM_SYNONYMS
+
+    # ==================== Offline Simulation Configuration ====================
+    # Symptom facts per disease used by the rule-based offline patient (no API calls)
+    DISEASE_SYMPTOM_FACTS = L.DISEASE_SYMPTOM_FACTS
+
+    # Probability that the offline patient gives a vague answer, per personality
+    PERSONALITY_VAGUENESS = L.PERSONALITY_VAGUENESS
+
+    _environment_loaded = False
+
+    @classmethod
+    def load_environment(cls):
+        """Load .env once and pick up the settings it provides (skipped by --help and offline runs)"""
+        if cls._environment_loaded:
+            return
+        cls._environment_loaded = True
+        from dotenv import load_dotenv
+        load_dotenv(os.path.join(cls.BASE_DIR, ".env"))
+        cls.DEEPSEEK_API_KEY = cls.DEEPSEEK_API_KEY or os.getenv("DEEPSEEK_API_KEY", "")
+        local = cls.LLM_BACKENDS.get("local", {})
+        for key, variable in (("base_url", "LOCAL_LLM_BASE_URL"), ("model", "LOCAL_LLM_MODEL"),
+                              ("api_key", "LOCAL_LLM_API_KEY")):
+            if variable in os.environ:
+                local[key] = os.environ[variable]
+
+    @classmethod
+    def use_knowledge_base(cls, path: str) -> KnowledgeBase:
+        """Switch to another knowledge base file and rebuild everything derived from it"""
+        kb = load_knowledge_base(path)
+        cls.KNOWLEDGE_BASE, cls.KNOWLEDGE = path, kb
+        cls.TEST_COSTS = kb.test_costs
+        cls.TEST_ACCURACY = kb.test_accuracy
+        cls.DISEASE_LIBRARY = kb.diseases
+        cls.PERSONALITY_TYPES = kb.personality_types
+        DoctorAgent.index_tests()
+        return kb
+
+    @classmethod
+    def validate(cls, require_api_key: bool = True):
+        """Validate configuration effectiveness"""
+        if require_api_key and not cls.DEEPSEEK_API_KEY:
+            raise ValueError(L.t("error_deepseek_api_key"))
+        
+        # Create record directories
+        if cls.SAVE_RECORDS:
+            os.makedirs(cls.RECORDS_DIRC, exist_ok=True)
+            os.makedirs(cls.DOCTOR_MEMORY_DIR, exist_ok=True)
+            os.makedirs(cls.ROUND_LOGS_DIR, exist_ok=True)
+            
+        print(L.t("medical_configuration_validation_successful"))
+        return True
+
+
+# ==================== Tracing ====================
+
+class _NullSpan:
+    """Span returned while tracing is disabled; does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed span, recorded as a Chrome trace complete event when it closes"""
+
+    __slots__ = ("tracer", "name", "category", "args", "start", "otel_span")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.otel_span = None
+
+    def set(self, **args):
+        """Attach extra arguments to the span"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.tracer._push(self)
+        if self.tracer.otel:
+            self.otel_span = self.tracer.otel.start_as_current_span(self.name)
+            self.otel_span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type:
+            self.args["error"] = exc_type.__name__
+        self.tracer._pop(self, end)
+        if self.otel_span:
+            from opentelemetry import trace as otel_trace
+            current = otel_trace.get_current_span()
+            for key, value in self.args.items():
+                current.set_attribute(key, value)
+            self.otel_span.__exit__(exc_type, exc, tb)
+        return False
+
+
+class Tracer:
+    """Tracer - Collects timed spans of a run and exports them in Chrome trace (Perfetto) format"""
+
+    def __init__(self):
+        self.enabled = False
+        self.otel = None  # OpenTelemetry tracer when enabled with otel=True
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.thread_names = {}
+        self._local = threading.local()  # Open spans of the calling thread
+
+    def enable(self, otel: bool = False):
+        """Start recording spans"""
+        self.enabled = True
+        if otel and not self.otel:
+            try:
+                from opentelemetry import trace as otel_trace
+                self.otel = otel_trace.get_tracer("ai-doctor-patient")
+            except ImportError:
+                print(L.t("opentelemetry_not_installed_exporting"))
+
+    def span(self, name: str, category: str = "program", **args):
+        """Context manager timing a block; a shared no-op span while tracing is disabled"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def annotate(self, **args):
+        """Attach arguments to the innermost open span of the calling thread"""
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].args.update(args)
+
+    def _push(self, span: Span):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+
+    def _pop(self, span: Span, end: float):
+        self._local.stack.pop()
+        thread = threading.current_thread()
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start - self.origin) * 1e6,
+            "dur": (end - span.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": span.args
+        }
+        with self.lock:
+            self.events.append(event)
+            self.thread_names.setdefault(thread.ident, thread.name)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Call count and total milliseconds per span name"""
+        totals = {}
+        with self.lock:
+            events = list(self.events)
+        for event in events:
+            stats = totals.setdefault(event["name"], {"count": 0, "total_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += event["dur"] / 1000
+        return totals
+
+    def export_chrome(self, filepath: str) -> str:
+        """Write recorded spans as a Chrome trace JSON file (chrome://tracing, ui.perfetto.dev)"""
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return filepath
+
+
+tracer = Tracer()
+
+
+def traced(name: str, category: str = "program"):
+    """Decorator wrapping a function in a tracing span"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ==================== Metrics ====================
+
+class MetricsRegistry:
+    """Metrics Registry - Counters and histograms rendered in the Prometheus text format"""
+
+    ROUND_SECONDS_BUCKETS = (1, 5, 10, 30, 60, 120, 300)
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    COST_BUCKETS = (50, 100, 200, 300, 500, 800, 1200)
+
+    # name -> (type, help, histogram buckets)
+    METRICS = {
+        "doctor_rounds_total": ("counter", "Rounds completed by disease, personality and outcome", None),
+        "doctor_round_duration_seconds": ("histogram", "Wall time of a round", ROUND_SECONDS_BUCKETS),
+        "doctor_round_cost_yuan": ("histogram", "Test spend of a round", COST_BUCKETS),
+        "doctor_budget_spent_yuan_total": ("counter", "Test spend by disease", None),
+        "doctor_questions_total": ("counter", "Questions asked", None),
+        "doctor_tests_total": ("counter", "Tests ordered", None),
+        "doctor_llm_calls_total": ("counter", "LLM calls by call site and backend", None),
+        "doctor_llm_errors_total": ("counter", "Failed LLM calls by call site", None),
+        "doctor_llm_latency_seconds": ("histogram", "LLM call latency by call site", LATENCY_BUCKETS),
+        "doctor_llm_tokens_total": ("counter", "LLM tokens by call site and kind", None),
+        "doctor_llm_hedged_requests_total": ("counter", "Duplicate requests fired by request hedging", None),
+        "doctor_llm_coalesced_requests_total": ("counter", "Calls served by an identical in-flight request", None),
+    }
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one histogram sample"""
+        if not self.enabled:
+            return
+        buckets = self.METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @staticmethod
+    def _labels(labels, extra: Tuple = ()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: list(series) for key, series in self.histograms.items()}
+        lines = []
+        for name, (kind, help_text, buckets) in self.METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self._labels(labels)} {value}")
+                continue
+            for (metric, labels), series in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(buckets, series):
+                    lines.append(f"{name}_bucket{self._labels(labels, (('le', bound),))} {count}")
+                lines.append(f"{name}_bucket{self._labels(labels, (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{name}_sum{self._labels(labels)} {series[-2]}")
+                lines.append(f"{name}_count{self._labels(labels)} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def start_metrics_server(host: str, port: int):
+    """Enable metrics and serve them from a background thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serves GET /metrics from the module's metrics registry"""
+
+        def do_GET(self):
+            if self.path.split("?")[0].rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the consultation output
+
+    metrics.enabled = True
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# ==================== Profiling ====================
+
+class RunProfiler:
+    """Run Profiler - Wraps a run in cProfile or a stack sampler and writes .pstats and collapsed stacks
+
+    cProfile only sees the thread that started it; sampling mode walks every thread's stack
+    (speculative questions, hedged requests) at a fixed interval with much lower overhead.
+    """
+
+    MAX_DEPTH = 64
+
+    def __init__(self, mode: str = "cprofile", interval: float = 0.005):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(L.t("unknown_profile_mode", mode=mode))
+        self.mode = mode
+        self.interval = interval
+        self.profiler = None
+        self.samples = Counter()  # Collapsed stack -> sample count
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.mode == "cprofile":
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self.profiler:
+            self.profiler.disable()
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+
+    @staticmethod
+    def _frame_label(filename: str, line: int, name: str) -> str:
+        if filename == "~":  # Built-in functions
+            return name
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def _sample_loop(self):
+        """Record the stack of every other thread once per interval"""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(self._frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def _stats(self):
+        import pstats
+        return pstats.Stats(self.profiler).stats
+
+    def collapsed_stacks(self) -> Dict[str, int]:
+        """Collapsed stacks for flamegraph tools; weights are samples or microseconds"""
+        if self.mode == "sample":
+            return dict(self.samples)
+
+        # cProfile keeps caller edges, not full stacks: spread each function's time over
+        # its callers in proportion to the cumulative time of each edge
+        stats = self._stats()
+        callees = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((func, edge[3]))
+        collapsed = Counter()
+
+        def walk(func, path, share, visiting):
+            total_time, cumulative = stats[func][2], stats[func][3]
+            path = path + [self._frame_label(*func)]
+            self_us = int(total_time * share * 1e6)
+            if self_us:
+                collapsed[";".join(path)] += self_us
+            if len(path) >= self.MAX_DEPTH:
+                return
+            for callee, edge_time in callees.get(func, ()):
+                callee_time = stats[callee][3]
+                if callee in visiting or callee_time <= 0 or edge_time * share < 1e-5:
+                    continue
+                walk(callee, path, share * edge_time / callee_time, visiting | {callee})
+
+        for func, (_, _, _, _, callers) in stats.items():
+            if not callers:
+                walk(func, [], 1.0, {func})
+        return dict(collapsed)
+
+    def top_functions(self, limit: int) -> List[Dict]:
+        """Functions with the largest cumulative (inclusive) time"""
+        if self.mode == "sample":
+            inclusive = Counter()
+            for stack, count in self.samples.items():
+                for frame in set(stack.split(";")[1:]):
+                    inclusive[frame] += count
+            return [{"function": frame, "cumulative": count * self.interval, "samples": count}
+                    for frame, count in inclusive.most_common(limit)]
+        stats = self._stats()
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [{"function": self._frame_label(*func), "cumulative": ct, "self": tt, "calls": nc}
+                for func, (_, nc, tt, ct, _) in ranked]
+
+    def save(self, basepath: str) -> List[str]:
+        """Write <basepath>.pstats (cProfile mode) and <basepath>.collapsed"""
+        os.makedirs(os.path.dirname(basepath) or ".", exist_ok=True)
+        files = []
+        if self.profiler:
+            self.profiler.dump_stats(basepath + ".pstats")
+            files.append(basepath + ".pstats")
+        with open(basepath + ".collapsed", 'w', encoding='utf-8') as f:
+            for stack, weight in sorted(self.collapsed_stacks().items()):
+                f.write(f"{stack} {weight}\n")
+        files.append(basepath + ".collapsed")
+        return files
+
+
+# ==================== Memory Management System ====================
+
+class MemoryManager:
+    """Memory Manager - Handles doctor's long-term learning memory"""
+
+    # Memory file path -> (modification time, memories), shared by every doctor in the process
+    # so a service creating a doctor per consultation reads the file only when it changed
+    _cache = {}
+    _lock = threading.Lock()  # Serializes read-modify-write of the memory file across threads
+    
+    def __init__(self):
+        self.memory_dir = MedicalConfig.DOCTOR_MEMORY_DIR
+        self.memory_file = os.path.join(self.memory_dir, "doctor_memory.json")
+        os.makedirs(self.memory_dir, exist_ok=True)
+    
+    @traced("memory_write")
+    def save_learning_experience(self, experience: Dict, run_id: str):
+        """Save learning experience to long-term memory"""
+        with self._lock:
+            memories = list(self._load_memory())
+            
+            memories.append({
+                "run_id": run_id,
+                "timestamp": datetime.now().isoformat(),
+                "experience": experience
+            })
+            
+            # Limit memory count
+            if len(memories) > MedicalConfig.MAX_HISTORY:
+                memories = memories[-MedicalConfig.MAX_HISTORY:]
+                
+            with open(self.memory_file, 'w', encoding='utf-8') as f:
+                json.dump(memories, f, ensure_ascii=False, indent=2)
+            self._cache[self.memory_file] = (os.stat(self.memory_file).st_mtime_ns, memories)
+    
+    def load_learning_experience(self) -> str:
+        """Load long-term learning experience"""
+        memories = self._load_memory()
+        
+        if not memories:
+            return L.t("no_historical_learning_experience")
+        
+        experience_parts = []
+        experience_parts.append(L.t("doctor_s_historical_learning"))
+        experience_parts.append(L.t("based_recent_session_summaries", count_memories=len(memories)))
+        
+        for i, memory in enumerate(memories[-5:], 1):  # Show last 5 sessions
+            exp = memory['experience']
+            exp_summary = L.t("diagnosis_success_rate_average", i=i, success_rate=exp.get("success_rate", 0),
+                              avg_questions=exp.get("avg_questions", 0),
+                              key_learning=exp.get("key_learning", ""))
+            experience_parts.append(exp_summary)
+        
+        return "\n".join(experience_parts)
+    
+    def _load_memory(self) -> list:
+        """Load memory file (cached until the file changes; treat the list as read-only)"""
+        try:
+            mtime = os.stat(self.memory_file).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._cache.get(self.memory_file)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        try:
+            with open(self.memory_file, 'r', encoding='utf-8') as f:
+                memories = json.load(f)
+        except Exception:
+            return []
+        self._cache[self.memory_file] = (mtime, memories)
+        return memories
+
+
+# ==================== Record System ====================
+
+class RecordManager:
+    """Record Manager - Handles records and round logs"""
+    
+    def __init__(self):
+        self.RECORDS_DIRC = MedicalConfig.RECORDS_DIRC
+        self.round_logs_dir = MedicalConfig.ROUND_LOGS_DIR
+    
+    @traced("record_write")
+    def save_program_record(self, program_data: Dict, run_id: Optional[str] = None) -> str:
+        """Save complete record"""
+        timestamp = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        filename = f"program_{timestamp}.json"
+        filepath = os.path.join(self.RECORDS_DIRC, filename)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(program_data, f, ensure_ascii=False, indent=2)
+        
+        return timestamp
+    
+    @traced("round_log_write")
+    def save_round_log(self, round_data: Dict, round_number: int) -> str:
+        """Save single round detailed log"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"round_{round_number}_{timestamp}.json"
+        filepath = os.path.join(self.round_logs_dir, filename)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(round_data, f, ensure_ascii=False, indent=2)
+        
+        return filepath
+
+
+class CheckpointJournal:
+    """Checkpoint Journal - One JSON line per finished round, so an interrupted run can resume
+
+    The first line holds the run settings and the starting random state; each later line a
+    round result with the random state and doctor learning after it. Lines are only appended,
+    so a checkpoint costs one short write however long the run gets, and a line torn by a
+    crash is simply ignored on resume. Seeded runs draw from per-round streams (RoundStreams),
+    so they leave the global random state out.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.path = os.path.join(MedicalConfig.RECORDS_DIRC, f"checkpoint_{run_id}.jsonl")
+        self.settings = {}
+        self.entries = []
+
+    def start(self, settings: Dict):
+        """Create the journal with the run settings and the current random state"""
+        self.settings = dict(settings, rng_state=self._global_state(settings))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.settings, ensure_ascii=False) + "\n")
+
+    @traced("checkpoint_write")
+    def append(self, round_result: Dict, doctor: "DoctorAgent", speculation_stats: Dict):
+        """Record a finished round and the state needed to continue after it"""
+        entry = {
+            "result": round_result,
+            "rng_state": self._global_state(self.settings),
+            "successful_strategies": doctor.successful_strategies,
+            "speculation_stats": speculation_stats
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.entries.append(entry)
+
+    def load(self) -> "CheckpointJournal":
+        """Read the settings and every complete round line (raises FileNotFoundError)"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.settings = json.loads(lines[0])
+        self.entries = []
+        for line in lines[1:]:
+            try:
+                self.entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # Torn last line of an interrupted write
+        return self
+
+    @staticmethod
+    def _global_state(settings: Dict) -> Optional[tuple]:
+        """Global random state, unless the run is seeded"""
+        return random.getstate() if settings.get("seed") is None else None
+
+    def rng_state(self) -> Optional[tuple]:
+        """Random state after the last recorded round, as random.setstate expects it (None if seeded)"""
+        saved = (self.entries[-1] if self.entries else self.settings)["rng_state"]
+        if saved is None:
+            return None
+        version, state, gauss = saved
+        return version, tuple(state), gauss
+
+    def remove(self):
+        """Delete the journal once the complete record is saved"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ==================== API Client ====================
+
+class LLMBackend:
+    """LLM Backend - One OpenAI-compatible endpoint and model"""
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str = ""):
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        """OpenAI client for this backend, created on first use"""
+        if self._client is None:
+            self._client = openai_client_class()(api_key=self.api_key or "none", base_url=self.base_url)
+        return self._client
+
+
+class BackendRegistry:
+    """Backend Registry - Routes each LLM call site to a named backend"""
+
+    SITES = ["patient", "question", "evidence", "test_selection", "diagnosis",
+             "case_generation", "continue_decision"]
+
+    def __init__(self, default_backend: str = "deepseek"):
+        self.backends = {}
+        self.routes = {}  # call site -> backend name
+        self.default_backend = default_backend
+
+    @classmethod
+    def from_config(cls, routes: Optional[Dict[str, str]] = None) -> "BackendRegistry":
+        """Build the registry from MedicalConfig, with optional per-site overrides"""
+        registry = cls()
+        for name, spec in MedicalConfig.LLM_BACKENDS.items():
+            registry.register(
+                name,
+                spec.get("base_url", MedicalConfig.DEEPSEEK_BASE_URL),
+                spec.get("model", MedicalConfig.MODEL_NAME),
+                spec.get("api_key", MedicalConfig.DEEPSEEK_API_KEY)
+            )
+        registry.route("all", MedicalConfig.DEFAULT_LLM_BACKEND)
+        for site, name in {**MedicalConfig.SITE_BACKENDS, **(routes or {})}.items():
+            registry.route(site, name)
+        return registry
+
+    def register(self, name: str, base_url: str, model: str, api_key: str = ""):
+        """Register (or replace) a backend"""
+        self.backends[name] = LLMBackend(name, base_url, model, api_key)
+
+    def route(self, site: str, name: str):
+        """Send a call site ("all" for the default) to a registered backend"""
+        if name not in self.backends:
+            raise ValueError(L.t("unknown_llm_backend_available", name=name,
+                                 backends=", ".join(self.backends)))
+        if site == "all":
+            self.default_backend = name
+        elif site in self.SITES:
+            self.routes[site] = name
+        else:
+            raise ValueError(L.t("unknown_call_site_available", site=site, sites=", ".join(self.SITES)))
+
+    def resolve(self, site: str) -> LLMBackend:
+        """Backend serving a call site"""
+        return self.backends[self.routes.get(site, self.default_backend)]
+
+    def uses(self, name: str) -> bool:
+        """Whether any call site is routed to the named backend"""
+        return any(self.resolve(site).name == name for site in self.SITES)
+
+    def describe(self) -> Dict[str, str]:
+        """Backend name per call site"""
+        return {site: self.resolve(site).name for site in self.SITES}
+
+
+class HedgeCancellation:
+    """Cancellation handle for one request of a hedge race
+
+    A request that holds something closeable (a streaming response) registers it with
+    on_cancel(); cancel() then closes it so the backend stops generating.
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._close = None
+        self._lock = threading.Lock()
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def on_cancel(self, close):
+        """Register how to abort the request; runs at once if the race is already lost"""
+        with self._lock:
+            self._close = close
+            cancelled = self._cancelled
+        if cancelled:
+            close()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            close = self._close
+        if close:
+            close()
+
+
+class RequestHedger:
+    """Request Hedger - Fires a duplicate request when a call outlives its site's p95 latency
+
+    Whichever request returns first wins. The loser is cancelled: it is dropped if it has
+    not started, and closed mid-generation if the client streams it. Otherwise it runs to
+    completion in the background. Its tokens count as wasted spend; drain() waits until
+    every loser has been counted.
+    """
+
+    WINDOW = 200  # Recent latency samples kept per call site
+
+    def __init__(self, percentile: float, min_samples: int, min_delay: float,
+                 max_extra_fraction: float, max_workers: int = 8):
+        """max_workers should cover two requests per concurrent caller; a call waiting for a
+        thread is not timed and is not hedged until it starts"""
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_extra_fraction = max_extra_fraction
+        self.max_workers = max_workers
+        self.latencies = {}  # site -> deque of recent latencies (seconds)
+        self.stats = {}      # site -> hedging counters
+        self.total_calls = 0
+        self.total_hedges = 0
+        self.lock = threading.Lock()
+        self._settled = threading.Condition(self.lock)
+        self._losers = set()  # Losing requests whose tokens are not counted yet
+        self._pool = None
+
+    def _site_stats(self, site: str) -> Dict:
+        return self.stats.setdefault(site, {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "budget_skips": 0,
+            "cancelled": 0,
+            "wasted_tokens": 0
+        })
+
+    def hedge_delay(self, site: str) -> Optional[float]:
+        """Latency percentile after which this site's calls are hedged, None while warming up"""
+        with self.lock:
+            samples = sorted(self.latencies.get(site, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return max(samples[int(self.percentile * (len(samples) - 1))], self.min_delay)
+
+    def record_latency(self, site: str, seconds: float):
+        with self.lock:
+            self.latencies.setdefault(site, deque(maxlen=self.WINDOW)).append(seconds)
+
+    def record_wasted(self, site: str, tokens: int, cancelled: bool = False):
+        with self.lock:
+            stats = self._site_stats(site)
+            stats["wasted_tokens"] += tokens
+            stats["cancelled"] += cancelled
+
+    def _reserve_hedge(self, site: str) -> bool:
+        """Take a hedge from the extra-spend budget"""
+        with self.lock:
+            stats = self._site_stats(site)
+            if self.total_hedges + 1 > self.max_extra_fraction * self.total_calls:
+                stats["budget_skips"] += 1
+                return False
+            self.total_hedges += 1
+            stats["hedged"] += 1
+        metrics.inc("doctor_llm_hedged_requests_total", site=site)
+        return True
+
+    def run(self, site: str, primary, hedge, on_discard):
+        """Run primary(); if it is slower than the site's percentile, race it against hedge()
+
+        Both are called with the HedgeCancellation that aborts them should they lose
+        (primary gets None when no race is possible).
+        """
+        with self.lock:
+            self.total_calls += 1
+            self._site_stats(site)["calls"] += 1
+        delay = self.hedge_delay(site)
+        if delay is None:
+            start_time = time.time()
+            result = primary(None)
+            self.record_latency(site, time.time() - start_time)
+            return result
+
+        with self.lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-hedge")
+        cancels = [HedgeCancellation(), HedgeCancellation()]
+        started = threading.Event()
+        start_times = []
+
+        def timed_primary(cancel):
+            start_times.append(time.time())
+            started.set()
+            return primary(cancel)
+
+        first = self._pool.submit(timed_primary, cancels[0])
+        # The clock starts when the request does: time spent queued for a thread is neither
+        # latency nor a reason to hedge
+        started.wait()
+        start_time = start_times[0]
+        try:
+            result = first.result(timeout=max(0.0, start_time + delay - time.time()))
+            self.record_latency(site, time.time() - start_time)
+            return result
+        except FutureTimeoutError:
+            pass
+        if not self._reserve_hedge(site):
+            result = first.result()
+            self.record_latency(site, time.time() - start_time)
+            return result
+
+        second = self._pool.submit(hedge, cancels[1])
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                result = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            loser = second if future is first else first
+            with self.lock:
+                self._site_stats(site)["hedge_wins" if future is second else "primary_wins"] += 1
+                self._losers.add(loser)
+            loser.cancel()
+            cancels[future is first].cancel()
+            loser.add_done_callback(partial(self._settle, on_discard))
+            self.record_latency(site, time.time() - start_time)
+            return result
+        raise error
+
+    def _settle(self, on_discard, loser: Future):
+        """Count a finished loser's tokens"""
+        try:
+            if not loser.cancelled() and loser.exception() is None:
+                on_discard(loser.result())
+        finally:
+            with self.lock:
+                self._losers.discard(loser)
+                self._settled.notify_all()
+
+    def drain(self):
+        """Wait until every losing request has finished and been counted"""
+        with self.lock:
+            self._settled.wait_for(lambda: not self._losers)
+
+    def get_report(self) -> Dict[str, Dict]:
+        """Hedging counters per call site with the share of hedges that won"""
+        with self.lock:
+            return {
+                site: dict(stats, hedge_win_rate=stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0)
+                for site, stats in self.stats.items()
+            }
+
+
+class SingleFlight:
+    """Single Flight - Concurrent identical requests share one in-flight call
+
+    The first caller for a key runs the request; callers arriving while it is in flight
+    wait for the same result instead of paying for their own. Nothing is kept after the
+    call returns, so this complements rather than replaces a response cache.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}  # key -> Future of the leader's result
+        self.stats = {}      # site -> {"calls", "coalesced"}
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Stable key for a request from its backend, parameters and messages"""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def do(self, site: str, key: str, fn) -> Tuple[object, bool]:
+        """Return (result, shared); shared is True when another caller's request was reused"""
+        with self.lock:
+            stats = self.stats.setdefault(site, {"calls": 0, "coalesced": 0})
+            stats["calls"] += 1
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+            else:
+                stats["coalesced"] += 1
+        if not leader:
+            metrics.inc("doctor_llm_coalesced_requests_total", site=site)
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def get_report(self) -> Dict[str, Dict]:
+        """Coalescing counters per call site"""
+        with self.lock:
+            return {site: dict(stats) for site, stats in self.stats.items()}
+
+
+class DeepSeekClient:
+    """DeepSeek API Client Class"""
+
+    def __init__(self, registry: Optional[BackendRegistry] = None, concurrency: int = 1):
+        """Initialize client; each call site is served by the backend the registry routes it to
+
+        concurrency is how many consultations share the client at once (service or batch workers).
+        """
+        self.registry = registry or BackendRegistry.from_config()
+        self.max_tokens = MedicalConfig.MAX_TOKENS
+        self.hedger = None
+        if MedicalConfig.ENABLE_HEDGING:
+            if MedicalConfig.HEDGE_BACKEND and MedicalConfig.HEDGE_BACKEND not in self.registry.backends:
+                raise ValueError(L.t("unknown_hedge_backend", hedge_backend=MedicalConfig.HEDGE_BACKEND))
+            self.hedger = RequestHedger(
+                MedicalConfig.HEDGE_PERCENTILE,
+                MedicalConfig.HEDGE_MIN_SAMPLES,
+                MedicalConfig.HEDGE_MIN_DELAY,
+                MedicalConfig.HEDGE_MAX_EXTRA_FRACTION,
+                # Each consultation may have a step and a speculative question in flight, each raced by a hedge
+                MedicalConfig.HEDGE_WORKERS or 4 * concurrency
+            )
+        self.single_flight = SingleFlight() if MedicalConfig.ENABLE_REQUEST_COALESCING else None
+        self.lock = threading.Lock()  # Guards usage_stats when rounds run concurrently
+        self._local = threading.local()  # Tokens of the calling thread's last request
+        self.usage_stats = {}  # Token usage and prompt cache hits per call site
+
+    def chat(self, system_prompt: str, user_message: str, temperature: float = 0.7,
+             site: str = "default") -> str:
+        """Send chat request to DeepSeek API"""
+        return self.chat_messages([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ], temperature, site)
+
+    def chat_messages(self, messages: List[Dict], temperature: float = 0.7,
+                      site: str = "default") -> str:
+        """Send a multi-turn message list to DeepSeek API"""
+        with tracer.span(f"llm:{site}", "llm", site=site) as span:
+            return self._chat_messages(messages, temperature, site, span)
+
+    def _chat_messages(self, messages: List[Dict], temperature: float, site: str, span) -> str:
+        """Send the request inside the call's tracing span"""
+        try:
+            start_time = time.time()
+            backend = self.registry.resolve(site)
+            send = partial(self._send, site, backend, messages, temperature)
+
+            if self.single_flight and temperature <= MedicalConfig.COALESCE_MAX_TEMPERATURE:
+                key = SingleFlight.make_key(backend.name, backend.model, temperature, self.max_tokens, messages)
+                (backend, response), shared = self.single_flight.do(site, key, send)
+            else:
+                (backend, response), shared = send(), False
+
+            elapsed_time = time.time() - start_time
+            reply = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+            self._local.last_tokens = 0 if shared else \
+                (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+            span.set(backend=backend.name, shared=shared, tokens=self._local.last_tokens)
+            metrics.inc("doctor_llm_calls_total", site=site, backend=backend.name)
+            metrics.observe("doctor_llm_latency_seconds", elapsed_time, site=site)
+            if not shared:  # A coalesced caller did not pay for the request
+                self._record_usage(site, backend.name, getattr(response, "usage", None))
+
+            if MedicalConfig.SHOW_AI_THINKING:
+                print(L.t("api_response_time_s", elapsed_time=elapsed_time))
+            return reply
+
+        except Exception as e:
+            metrics.inc("doctor_llm_errors_total", site=site)
+            self.add_failed_calls(1)
+            error_msg = L.t("deepseek_api_call_failed", e=str(e))
+            print(error_msg)
+            # Return degraded response
+            return L.t("i_need_more_information")
+
+    def last_call_tokens(self) -> int:
+        """Prompt plus completion tokens paid for by the calling thread's last request"""
+        return getattr(self._local, "last_tokens", 0)
+
+    def failed_calls(self) -> int:
+        """Calls of the calling thread that failed and got the degraded reply instead of an answer"""
+        return getattr(self._local, "failed_calls", 0)
+
+    def add_failed_calls(self, count: int):
+        """Charge failed calls to the calling thread (e.g. made for it on another thread)"""
+        self._local.failed_calls = self.failed_calls() + count
+
+    def _send(self, site: str, backend: LLMBackend, messages: List[Dict],
+              temperature: float) -> Tuple[LLMBackend, object]:
+        """Issue the request, hedged when hedging is enabled"""
+        if not self.hedger:
+            return self._create(backend, messages, temperature)
+        hedge_backend = self.registry.backends.get(MedicalConfig.HEDGE_BACKEND, backend)
+        return self.hedger.run(
+            site,
+            partial(self._create, backend, messages, temperature),
+            partial(self._create, hedge_backend, messages, temperature),
+            partial(self._record_discarded, site)
+        )
+
+    def _create(self, backend: LLMBackend, messages: List[Dict], temperature: float,
+                cancel: Optional[HedgeCancellation] = None) -> Tuple[LLMBackend, object]:
+        """Issue one completion request to a backend, streamed if a hedge race may cancel it"""
+        with tracer.span("request", "llm", backend=backend.name):
+            if cancel and MedicalConfig.HEDGE_CANCEL_LOSERS:
+                response = self._create_streamed(backend, messages, temperature, cancel)
+            else:
+                response = backend.client.chat.completions.create(
+                    model=backend.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self.max_tokens
+                )
+        return backend, response
+
+    def _create_streamed(self, backend: LLMBackend, messages: List[Dict], temperature: float,
+                         cancel: HedgeCancellation):
+        """Stream a completion that cancel can close early; returns a response-shaped object"""
+        stream = backend.client.chat.completions.create(
+            model=backend.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        cancel.on_cancel(partial(self._abort_stream, stream))
+        parts, usage = [], None
+        try:
+            for chunk in stream:
+                if cancel.cancelled():
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                usage = getattr(chunk, "usage", None) or usage
+        except Exception:
+            if not cancel.cancelled():  # Closing the stream aborts the read
+                raise
+        finally:
+            stream.close()
+        cancelled = usage is None and cancel.cancelled()
+        if cancelled:  # Cut short before the usage chunk: estimate what was spent
+            usage = SimpleNamespace(
+                prompt_tokens=sum(DialogueBuffer.estimate_tokens(message["content"]) for message in messages),
+                completion_tokens=len(parts)
+            )
+        message = SimpleNamespace(role="assistant", content="".join(parts))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage, cancelled=cancelled)
+
+    @staticmethod
+    def _abort_stream(stream):
+        """Abort a streaming response from another thread
+
+        Shutting the socket down wakes the read blocked on it, and the reading thread then
+        closes the stream itself; without a reachable socket the stream is closed directly.
+        """
+        network_stream = getattr(getattr(stream, "response", None), "extensions", {}).get("network_stream")
+        sock = network_stream.get_extra_info("socket") if network_stream else None
+        if sock is None:
+            stream.close()
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already closed
+
+    def _record_discarded(self, site: str, result: Tuple[LLMBackend, object]):
+        """Count the tokens of a request whose response lost a hedge race"""
+        usage = getattr(result[1], "usage", None)
+        tokens = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+        self.hedger.record_wasted(site, tokens, getattr(result[1], "cancelled", False))
+
+    def _record_usage(self, site: str, backend_name: str, usage):
+        """Accumulate token usage and DeepSeek prompt cache hits for a call site"""
+        with self.lock:
+            stats = self.usage_stats.setdefault(site, {
+                "backend": backend_name,
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cache_hit_tokens": 0,
+                "cache_miss_tokens": 0
+            })
+            stats["calls"] += 1
+            if usage is None:
+                return
+            tokens = {
+                "prompt": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion": getattr(usage, "completion_tokens", 0) or 0,
+                "cache_hit": getattr(usage, "prompt_cache_hit_tokens", 0) or 0,
+                "cache_miss": getattr(usage, "prompt_cache_miss_tokens", 0) or 0
+            }
+            stats["prompt_tokens"] += tokens["prompt"]
+            stats["completion_tokens"] += tokens["completion"]
+            stats["cache_hit_tokens"] += tokens["cache_hit"]
+            stats["cache_miss_tokens"] += tokens["cache_miss"]
+        for kind, count in tokens.items():
+            metrics.inc("doctor_llm_tokens_total", count, site=site, kind=kind)
+
+    def get_cache_report(self) -> Dict[str, Dict]:
+        """Per call site usage with prompt cache hit rate"""
+        report = {}
+        with self.lock:
+            usage_stats = {site: dict(stats) for site, stats in self.usage_stats.items()}
+        for site, stats in usage_stats.items():
+            cached = stats["cache_hit_tokens"] + stats["cache_miss_tokens"]
+            report[site] = dict(stats, cache_hit_rate=stats["cache_hit_tokens"] / cached if cached else 0.0)
+        return report
+
+
+# ==================== Prompt Templates ====================
+
+class PromptTemplate:
+    """Prompt Template - Static instructions and session memory first, variable content last
+
+    DeepSeek caches prompt prefixes, so everything that stays the same across calls
+    (role, instructions, per-session memory) goes into a byte-identical system prompt,
+    and only the per-call content is sent as the user message.
+    """
+
+    def __init__(self, site: str, role: str, instructions: str):
+        self.site = site
+        self.role = role
+        self.instructions = instructions
+        self._prefixes = {}  # memory -> rendered system prompt
+
+    def system_prompt(self, memory: str = "") -> str:
+        """Return the stable prefix for the given per-session memory"""
+        prefix = self._prefixes.get(memory)
+        if prefix is None:
+            parts = [self.role, self.instructions]
+            if memory:
+                parts.append(memory)
+            prefix = "\n\n".join(parts)
+            if len(self._prefixes) >= 64:  # Memories change per patient; keep the cache bounded
+                self._prefixes.clear()
+            self._prefixes[memory] = prefix
+        return prefix
+
+    def render(self, variable: str, memory: str = "") -> Tuple[str, str]:
+        """Return (system_prompt, user_message)"""
+        return self.system_prompt(memory), variable
+
+
+# ==================== Chat Sessions ====================
+
+class ChatSession:
+    """Chat Session - One agent's message list, grown by appending only new turns
+
+    The system prompt and earlier turns are sent unchanged on every call, so each
+    request shares its prefix with the previous one and hits the prompt cache.
+    """
+
+    def __init__(self, system_prompt: str, max_messages: int = 16):
+        self.system_prompt = system_prompt
+        self.max_messages = max_messages
+        self.turns = []          # user/assistant messages after the system prompt
+        self.synced_entries = 0  # Dialogue entries already forwarded to this session
+        self.dropped_turns = 0   # Turns removed by the sliding window
+
+    def add(self, role: str, content: str):
+        """Append one user or assistant turn"""
+        self.turns.append({"role": role, "content": content})
+        self._truncate()
+
+    def _truncate(self):
+        """Slide the window in one chunk (down to half) so the prefix stays stable between truncations"""
+        if len(self.turns) <= self.max_messages:
+            return
+        drop = len(self.turns) - self.max_messages // 2
+        # The window must start with a user turn
+        while drop < len(self.turns) and self.turns[drop]["role"] != "user":
+            drop += 1
+        del self.turns[:drop]
+        self.dropped_turns += drop
+
+    def sync(self, dialogue_history: List[Dict], own_role: str) -> str:
+        """Render dialogue entries added since the last sync, skipping this agent's own turns"""
+        if len(dialogue_history) < self.synced_entries:  # Dialogue was reset
+            self.synced_entries = 0
+        new_entries = dialogue_history[self.synced_entries:]
+        self.synced_entries = len(dialogue_history)
+        return "\n".join(
+            f"{msg['role']}: {msg['content']}" for msg in new_entries if msg["role"] != own_role
+        )
+
+    def messages(self) -> List[Dict]:
+        """Full message list to send: system prompt followed by the turn window"""
+        return [{"role": "system", "content": self.system_prompt}] + self.turns
+
+    def copy(self) -> "ChatSession":
+        """Independent copy, for a turn that may be thrown away (speculative questions)"""
+        session = ChatSession(self.system_prompt, self.max_messages)
+        session.turns = list(self.turns)
+        session.synced_entries = self.synced_entries
+        session.dropped_turns = self.dropped_turns
+        return session
+
+
+# ==================== Random Streams ====================
+
+class RoundStreams:
+    """Round Streams - Independent random sources for one round's case, test results and patient
+
+    With a seed, each source is derived from (seed, round number, purpose) alone, so a round plays
+    out the same in whichever program, thread or order it runs, and a source that draws more often
+    (a patient answering more questions) never shifts another (the test results). Without a seed
+    every source is None and the consumers fall back to the global random module.
+    """
+
+    def __init__(self, seed: Optional[int], round_number: int):
+        self.case = self.derive(seed, round_number, "case")
+        self.tests = self.derive(seed, round_number, "tests")
+        self.patient = self.derive(seed, round_number, "patient")
+
+    @staticmethod
+    def derive(seed: Optional[int], round_number: int, purpose: str) -> Optional[random.Random]:
+        """Random source for one purpose of one round (seeded from the SHA-512 of the path)"""
+        if seed is None:
+            return None
+        return random.Random(f"{seed}/{round_number}/{purpose}")
+
+
+# ==================== Medical System ====================
+
+class MedicalSystem:
+    """Medical System - Handles test execution and cost calculation"""
+    DEFAULT_RELEVANCE = 0.1  # Relevance of a test to a disease it has no knowledge base entry for
+
+    def __init__(self):
+        self.test_costs = MedicalConfig.TEST_COSTS
+        self.test_accuracy = MedicalConfig.TEST_ACCURACY
+        self.result_texts = {}  # (kind, test, disease) -> formatted result text
+
+    def perform_test(self, test_name: str, true_condition: str, rng: Optional[random.Random] = None) -> Dict:
+        """Execute test and return results (drawing from rng, or the global random module)"""
+        cost = self.test_costs[test_name]
+        base_accuracy = self.test_accuracy[test_name]
+        
+        # Get test relevance to the disease
+        relevance = MedicalConfig.KNOWLEDGE.relevance_of(test_name, true_condition, self.DEFAULT_RELEVANCE)
+        
+        # Final accuracy = base accuracy × relevance
+        final_accuracy = base_accuracy * relevance
+        
+        # Determine test result
+        if (rng or random).random() < final_accuracy:
+            # ✅ True positive: Test correctly detected disease
+            return {
+                "result": self._get_positive_result(test_name, true_condition),
+                "cost": cost,
+                "accurate": True,
+                "relevance": relevance,  # New: record relevance
+                "result_type": "true_positive"
+            }
+        else:
+            # False negative or normal result
+            if relevance < 0.3:
+                # 🔍 Low relevance test: Return normal result (unlikely positive anyway)
+                return {
+                    "result": self._get_normal_result(test_name),
+                    "cost": cost,
+                    "accurate": True,  # This is actually "true negative"
+                    "relevance": relevance,
+                    "result_type": "true_negative"  # True negative
+                }
+            else:
+                # ❌ False negative: Relevant test but missed diagnosis
+                return {
+                    "result": self._get_false_negative_result(test_name, true_condition),
+                    "cost": cost,
+                    "accurate": False,
+                    "relevance": relevance,
+                    "result_type": "false_negative"  # False negative
+                }
+    
+    def _get_positive_result(self, test_name: str, disease: str) -> str:
+        """Generate positive result description"""
+        key = ("positive", test_name, disease)
+        if key not in self.result_texts:
+            template = L.POSITIVE_RESULTS.get(test_name)
+            self.result_texts[key] = (
+                L.t("shows_abnormalities_related", test_name=test_name, disease=disease) if template is None
+                else template.format(disease=disease)
+            )
+        return self.result_texts[key]
+    
+    def _get_false_negative_result(self, test_name: str, disease: str) -> str:
+        """Generate false negative result description"""
+        key = ("false_negative", test_name, disease)
+        if key not in self.result_texts:
+            self.result_texts[key] = L.FALSE_NEGATIVE_RESULTS.get(disease, {}).get(test_name) \
+                or L.t("results_within_normal_range", test_name=test_name)
+        return self.result_texts[key]
+    
+    def _get_normal_result(self, test_name: str) -> str:
+        """Generate normal result description (for low-relevance tests)"""
+        key = ("normal", test_name, None)
+        if key not in self.result_texts:
+            self.result_texts[key] = L.NORMAL_RESULTS.get(test_name) \
+                or L.t("shows_no_abnormalities", test_name=test_name)
+        return self.result_texts[key]
+
+    def get_available_tests(self) -> List[str]:
+        """Get available test items"""
+        return list(self.test_costs.keys())
+
+
+# ==================== Symptom Extraction ====================
+
+class SymptomExtractor:
+    """Symptom Extractor - Maps synonyms to canonical symptoms in a single regex pass"""
+
+    # A negation shortly before a symptom ("no fever", "don't have a cough") suppresses it
+    NEGATION_PATTERN = L.SYMPTOM_NEGATION_PATTERN
+    NEGATION_WINDOW = L.SYMPTOM_NEGATION_WINDOW
+
+    def __init__(self, synonyms: Dict[str, List[str]]):
+        # Synonym -> canonical symptom index, compiled once into a single trie-shaped pattern
+        self.synonym_index = {}
+        for canonical, phrases in synonyms.items():
+            for phrase in [canonical] + phrases:
+                self.synonym_index[L.fold(phrase)] = canonical
+        # Phrases that open with a negation ("not hungry", 没胃口) name the symptom, so a
+        # negation before them is not checked
+        self.negation_led = {phrase for phrase in self.synonym_index if self._opens_with_negation(phrase)}
+        self.pattern = re.compile(
+            L.WORD_BOUNDARY + "(" + self._trie_pattern(list(self.synonym_index)) + ")" + L.WORD_BOUNDARY
+        )
+
+    @classmethod
+    def _opens_with_negation(cls, phrase: str) -> bool:
+        """Whether the phrase starts with a negation word"""
+        for end in range(1, len(phrase) + 1):
+            match = cls.NEGATION_PATTERN.search(phrase[:end])
+            if match and match.start() == 0:
+                return True
+        return False
+
+    @staticmethod
+    def _trie_pattern(phrases: List[str]) -> str:
+        """Build a regex from a character trie of phrases (shared prefixes are matched once)"""
+        trie = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}  # End of phrase
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # Greedy optional group: longer phrases are preferred over their prefixes
+            return f"(?:{body})?" if "" in node else body
+
+        return build(trie)
+
+    def extract(self, text: str) -> List[str]:
+        """Extract canonical symptoms mentioned in text, in order of appearance"""
+        text = L.fold(text).replace("\u2019", "'")
+        found = []
+        for match in self.pattern.finditer(text):
+            canonical = self.synonym_index[match.group(1)]
+            if canonical in found:
+                continue
+            window = text[max(0, match.start() - self.NEGATION_WINDOW):match.start()]
+            if match.group(1) not in self.negation_led and self.NEGATION_PATTERN.search(window):
+                continue
+            found.append(canonical)
+        return found
+
+
+# ==================== Dialogue Buffer ====================
+
+class DialogueBuffer(list):
+    """Dialogue Buffer - Append-only dialogue history that keeps rendered lines and token estimates current"""
+
+    # Approximate DeepSeek tokenizer ratios: ~0.6 token per CJK character, ~0.3 per other character
+    CJK_PATTERN = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+    def __init__(self, messages: Optional[List[Dict]] = None):
+        super().__init__()
+        # Rendered "role: content" line and token estimate per turn, computed once on append
+        self.lines = []
+        self.token_counts = []
+        self.total_tokens = 0
+        self._transcript = ""
+        self._transcript_turns = 0
+        self._windows = {}
+        self.summary_cache = {}  # Prefix length -> summary of those turns (see ContextBudgetManager)
+        self.extend(messages or [])
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Estimate token count of text"""
+        cjk_chars = len(cls.CJK_PATTERN.findall(text))
+        return int(cjk_chars * 0.6 + (len(text) - cjk_chars) * 0.3) + 1
+
+    @classmethod
+    def wrap(cls, dialogue_history: List[Dict]) -> "DialogueBuffer":
+        """Return history as a DialogueBuffer, wrapping plain lists"""
+        if isinstance(dialogue_history, DialogueBuffer):
+            return dialogue_history
+        return cls(dialogue_history)
+
+    def append(self, message: Dict):
+        """Append a turn and render it once"""
+        super().append(message)
+        line = f"{message['role']}: {message['content']}"
+        tokens = self.estimate_tokens(line)
+        self.lines.append(line)
+        self.token_counts.append(tokens)
+        self.total_tokens += tokens
+
+    def extend(self, messages: List[Dict]):
+        """Append several turns"""
+        for message in messages:
+            self.append(message)
+
+    def render(self, last: Optional[int] = None) -> str:
+        """Render the last N turns (or the whole transcript) as "role: content" lines"""
+        if last is None:
+            # Whole transcript grows by the new lines only
+            if self._transcript_turns < len(self.lines):
+                new_text = "\n".join(self.lines[self._transcript_turns:])
+                self._transcript = f"{self._transcript}\n{new_text}" if self._transcript else new_text
+                self._transcript_turns = len(self.lines)
+            return self._transcript
+
+        cached = self._windows.get(last)
+        if cached and cached[0] == len(self.lines):
+            return cached[1]
+        text = "\n".join(self.lines[-last:])
+        self._windows[last] = (len(self.lines), text)
+        return text
+
+    def tokens(self, last: Optional[int] = None) -> int:
+        """Estimated tokens of the last N turns (or the whole transcript)"""
+        if last is None:
+            return self.total_tokens
+        return sum(self.token_counts[-last:])
+
+
+# ==================== Context Budget ====================
+
+class ContextBudgetManager:
+    """Context Budget Manager - Keeps diagnosis prompts under a token budget"""
+
+    MIN_RECENT_TURNS = 2
+
+    def __init__(self, token_budget: int, recent_turns: int, symptom_extractor: SymptomExtractor):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.symptom_extractor = symptom_extractor
+
+    def summarize_prefix(self, dialogue: DialogueBuffer, turns: int) -> str:
+        """Summarize the first N dialogue entries, cached per dialogue prefix"""
+        if turns not in dialogue.summary_cache:
+            questions = 0
+            symptoms = []
+            for message in dialogue[:turns]:
+                if message["role"] == "doctor":
+                    questions += 1
+                elif message["role"] == "patient":
+                    for symptom in self.symptom_extractor.extract(message["content"]):
+                        if symptom not in symptoms:
+                            symptoms.append(symptom)
+            dialogue.summary_cache[turns] = (
+                L.t("summary_first_dialogue_entries", turns=turns, questions=questions,
+                    symptoms=L.join(symptoms) if symptoms else L.t("no_specific_symptoms"))
+            )
+        return dialogue.summary_cache[turns]
+
+    def _count_tokens(self, dialogue_text: str, test_lines: List[str], experience_lines: List[str]) -> int:
+        """Total estimated tokens of the compressed sections"""
+        return (DialogueBuffer.estimate_tokens(dialogue_text) +
+                sum(DialogueBuffer.estimate_tokens(line) for line in test_lines) +
+                sum(DialogueBuffer.estimate_tokens(line) for line in experience_lines))
+
+    def compress(self, dialogue: List, test_results: List[str], experience: str,
+                 test_priorities: Optional[Dict[str, float]] = None) -> Dict:
+        """Compress dialogue, test results and experience to fit the token budget"""
+        dialogue = DialogueBuffer.wrap(dialogue)
+        experience_lines = experience.split("\n") if experience else []
+        original_tokens = self._count_tokens(dialogue.render(), test_results, experience_lines)
+
+        # Deduplicate test lines, keeping their order
+        test_lines = list(dict.fromkeys(test_results))
+        duplicate_lines = len(test_results) - len(test_lines)
+
+        dialogue_text = dialogue.render()
+        summarized_turns = 0
+        # 1. Summarize older turns, shrinking the verbatim window if needed
+        recent = min(self.recent_turns, len(dialogue))
+        while (self._count_tokens(dialogue_text, test_lines, experience_lines) > self.token_budget
+               and recent >= self.MIN_RECENT_TURNS):
+            if len(dialogue) > recent:
+                summarized_turns = len(dialogue) - recent
+                dialogue_text = self.summarize_prefix(dialogue, summarized_turns) + "\n" + dialogue.render(last=recent)
+            recent -= 1
+
+        # 2. Keep only the most recent experience entries (header line is kept)
+        while (self._count_tokens(dialogue_text, test_lines, experience_lines) > self.token_budget
+               and len(experience_lines) > 1):
+            experience_lines.pop(1)
+
+        # 3. Drop the least relevant test findings, always keeping the top one
+        dropped_lines = 0
+        if self._count_tokens(dialogue_text, test_lines, experience_lines) > self.token_budget:
+            priorities = test_priorities or {}
+            test_lines.sort(key=lambda line: -priorities.get(line, 0.0))  # Stable: ties keep their order
+        while (self._count_tokens(dialogue_text, test_lines, experience_lines) > self.token_budget
+               and len(test_lines) > 1):
+            test_lines.pop()
+            dropped_lines += 1
+
+        compressed_tokens = self._count_tokens(dialogue_text, test_lines, experience_lines)
+        return {
+            "dialogue_text": dialogue_text,
+            "test_text": "\n".join(test_lines),
+            "experience": "\n".join(experience_lines),
+            "report": {
+                "original_tokens": original_tokens,
+                "compressed_tokens": compressed_tokens,
+                "saved_tokens": original_tokens - compressed_tokens,
+                "summarized_turns": summarized_turns,
+                "duplicate_test_lines": duplicate_lines,
+                "dropped_test_lines": dropped_lines
+            }
+        }
+
+
+# ==================== State Management ====================
+
+class programState:
+    """State Management Class"""
+
+    def __init__(self):
+        self.current_round = 0
+        self.total_cost = 0
+        self.remaining_budget = MedicalConfig.INITIAL_BUDGET
+        self.questions_asked = 0
+        self.tests_ordered = 0
+        self.patient_suspicion = 0.0
+        self.actions_history = []
+        self.dialogue_history = DialogueBuffer()
+        self.test_results = []
+        self.start_time = datetime.now()
+        self.patient_symptoms = []
+        self.evidence_sufficient = False
+        self.console = True  # Print progress notes; off in programs with the console off (batch, service)
+        # Belief over the knowledge base's diseases, updated by each test result (sparse, O(nnz) per test)
+        self.posterior = DiseasePosterior(MedicalConfig.KNOWLEDGE, MedicalSystem.DEFAULT_RELEVANCE)
+
+    def record_action(self, action_type: str, details: Dict):
+        """Record action history"""
+        action = {
+            "round": self.current_round,
+            "type": action_type,
+            "details": details,
+            "timestamp": datetime.now().isoformat()
+        }
+        self.actions_history.append(action)
+
+    def add_question(self):
+        """Increase question count"""
+        self.questions_asked += 1
+        self.patient_suspicion += 0.1  # Each question increases suspicion
+
+    def add_symptoms(self, symptoms: List[str]):
+        """Add newly mentioned symptoms"""
+        for symptom in symptoms:
+            if symptom not in self.patient_symptoms:
+                self.patient_symptoms.append(symptom)
+
+    def add_test(self, cost: int):
+        """Increase test count and cost"""
+        self.tests_ordered += 1
+        self.total_cost += cost
+        self.remaining_budget -= cost
+        self.patient_suspicion += 0.15 
+    
+    def is_round_over(self, doctor_agent=None) -> bool:
+        """Check if round is over"""
+        # Basic end conditions
+        basic_over = (self.patient_suspicion >= MedicalConfig.SUSPICION_THRESHOLD or
+                     self.remaining_budget <= 0 or
+                     self.questions_asked >= MedicalConfig.MAX_QUESTIONS_PER_ROUND)
+        
+        # If basic conditions are met, return directly
+        if basic_over:
+            return True
+        
+        # If there's a doctor agent, ask if evidence is sufficient
+        if doctor_agent and self.questions_asked >= 3:  # At least 3 questions before evidence could be sufficient
+            # Update evidence sufficient flag
+            self.evidence_sufficient = doctor_agent.is_evidence_sufficient(
+                self.dialogue_history, 
+                self.test_results,
+                self.current_round,
+                self.patient_suspicion
+            )
+            
+            # If doctor thinks evidence is sufficient, round ends
+            if self.evidence_sufficient:
+                if self.console:
+                    print(L.t("doctor_thinks_evidence_sufficient"))
+                return True
+        
+        return False
+
+    def get_status_summary(self) -> str:
+        """Get status summary"""
+        evidence_status = L.t("sufficient_evidence") if self.evidence_sufficient else L.t("collecting")
+        return (L.t("current_round_questions_tests", current_round=self.current_round,
+                    questions_asked=self.questions_asked, tests_ordered=self.tests_ordered,
+                    total_cost=self.total_cost, remaining_budget=self.remaining_budget,
+                    patient_suspicion=self.patient_suspicion, evidence_status=evidence_status))
+    
+    def export_to_dict(self) -> Dict:
+        """Export state to dictionary"""
+        return {
+            "current_round": self.current_round,
+            "total_cost": self.total_cost,
+            "remaining_budget": self.remaining_budget,
+            "questions_asked": self.questions_asked,
+            "tests_ordered": self.tests_ordered,
+            "patient_suspicion": self.patient_suspicion,
+            "actions_history": self.actions_history,
+            "dialogue_history": self.dialogue_history,
+            "test_results": self.test_results,
+            "patient_symptoms": self.patient_symptoms,
+            "start_time": self.start_time.isoformat(),
+            "end_time": datetime.now().isoformat()
+        }
+
+
+# ==================== Agent Classes ====================
+
+class PatientAgent:
+    """Patient Agent"""
+
+    # All misunderstanding triggers compiled once into a single pattern matched against the
+    # lowercased question, as whole words where the locale has word boundaries (so in English
+    # "Pain" matches "pain", "painful" and "Spain" don't; neither does "sleepy" match "sleep")
+    TRIGGER_PATTERN = re.compile(
+        L.WORD_BOUNDARY + "(" + "|".join(
+            re.escape(trigger) for trigger in
+            sorted(MedicalConfig.MISUNDERSTANDING_TRIGGERS, key=len, reverse=True)
+        ) + ")" + L.WORD_BOUNDARY
+    )
+
+    # Prompt templates; the patient's condition is the per-session part of the cached prefix
+    TRUTHFUL_PROMPT = PromptTemplate(
+        "patient",
+        L.t("truthful_prompt_role"),
+        L.t("truthful_prompt_instructions")
+    )
+    MISUNDERSTANDING_PROMPT = PromptTemplate(
+        "patient",
+        L.t("misunderstanding_prompt_role"),
+        L.t("misunderstanding_prompt_instructions")
+    )
+    COMPLAINT_PROMPT = PromptTemplate(
+        "patient",
+        L.t("complaint_prompt_role"),
+        L.t("complaint_prompt_instructions")
+    )
+
+    def __init__(self, api_client: DeepSeekClient, case_info: Dict, rng: Optional[random.Random] = None):
+        self.api_client = api_client
+        self.true_condition = case_info["true_disease"]
+        self.symptoms_description = case_info["symptoms_description"]
+        self.personality = case_info["personality"]
+        self.ideal_cost = case_info["ideal_cost"]
+        self.suspicion_level = 0.0
+        self.dialogue_history = []
+        self.rng = rng or random  # Random source for misunderstanding draws
+        self.session = None  # Multi-turn answer session, created on first use
+
+    def respond_to_question(self, question: str) -> str:
+        """Answer doctor's question (may be inaccurate)"""
+        # Increase suspicion value
+        suspicion_gain = MedicalConfig.PERSONALITY_TYPES[self.personality]["suspicion_gain"]
+        self.suspicion_level += suspicion_gain
+
+        # Check if misunderstanding occurs
+        trigger = self._should_misunderstand(question)
+        if trigger:
+            return self._generate_misunderstanding_response(question, trigger)
+        else:
+            return self._generate_truthful_response(question)
+
+    def match_triggers(self, question: str) -> List[str]:
+        """Return all misunderstanding triggers in the question, in order of appearance"""
+        matched = []
+        for trigger in self.TRIGGER_PATTERN.findall(question.lower()):
+            if trigger not in matched:
+                matched.append(trigger)
+        return matched
+
+    def _should_misunderstand(self, question: str) -> Optional[str]:
+        """Determine if misunderstanding of question occurs, return the chosen trigger or None"""
+        for trigger in self.match_triggers(question):
+            if self.rng.random() < MedicalConfig.MISUNDERSTANDING_TRIGGERS[trigger]["threshold"]:
+                return trigger
+        return None
+
+    def _condition_memory(self) -> str:
+        """Per-patient part of the cached prompt prefix"""
+        return L.t("patient_condition_memory", symptoms_description=self.symptoms_description)
+
+    def _get_session(self) -> ChatSession:
+        """Answer session whose system prompt holds the patient's condition"""
+        if self.session is None:
+            self.session = ChatSession(self.TRUTHFUL_PROMPT.system_prompt(self._condition_memory()),
+                                       MedicalConfig.CHAT_SESSION_MAX_MESSAGES)
+        return self.session
+
+    def _answer_in_session(self, user_message: str) -> str:
+        """Append the doctor's question to the session and the answer after it"""
+        session = self._get_session()
+        session.add("user", user_message)
+        response = self.api_client.chat_messages(
+            session.messages(),
+            temperature=MedicalConfig.TEMPERATURE_PATIENT_RESPONSE,
+            site=self.TRUTHFUL_PROMPT.site
+        )
+        session.add("assistant", response)
+        return response
+
+    def _generate_misunderstanding_response(self, question: str, trigger: str) -> str:
+        """Generate misunderstanding response"""
+        misunderstanding = MedicalConfig.MISUNDERSTANDING_TRIGGERS[trigger]["misunderstanding"]
+        if self.TRUTHFUL_PROMPT.site in MedicalConfig.CHAT_SESSION_SITES:
+            return self._answer_in_session(L.t("misunderstanding_session_input", question=question,
+                                               misunderstanding=misunderstanding))
+
+        system_prompt, prompt = self.MISUNDERSTANDING_PROMPT.render(
+            L.t("misunderstanding_prompt_input", question=question, misunderstanding=misunderstanding),
+            self._condition_memory()
+        )
+
+        response = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_PATIENT_RESPONSE,
+            site=self.MISUNDERSTANDING_PROMPT.site
+        )
+        return response
+
+    def _generate_truthful_response(self, question: str) -> str:
+        """Generate truthful response"""
+        if self.TRUTHFUL_PROMPT.site in MedicalConfig.CHAT_SESSION_SITES:
+            return self._answer_in_session(L.t("patient_question_input", question=question))
+
+        system_prompt, prompt = self.TRUTHFUL_PROMPT.render(
+            L.t("patient_question_input", question=question),
+            self._condition_memory()
+        )
+
+        response = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_PATIENT_RESPONSE,
+            site=self.TRUTHFUL_PROMPT.site
+        )
+        return response
+
+    def get_initial_complaint(self) -> str:
+        """Get initial complaint"""
+        system_prompt, prompt = self.COMPLAINT_PROMPT.render(
+            L.t("complaint_prompt_input"),
+            self._condition_memory()
+        )
+
+        response = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_PATIENT_RESPONSE,
+            site=self.COMPLAINT_PROMPT.site
+        )
+        if self.TRUTHFUL_PROMPT.site in MedicalConfig.CHAT_SESSION_SITES:
+            # Seed the answer session so later answers stay consistent with the complaint
+            session = self._get_session()
+            session.add("user", prompt)
+            session.add("assistant", response)
+
+        self.dialogue_history.append({
+            "role": "patient",
+            "content": response
+        })
+
+        return response
+    
+    def export_to_dict(self) -> Dict:
+        """Export patient information to dictionary"""
+        return {
+            "true_condition": self.true_condition,
+            "symptoms_description": self.symptoms_description,
+            "personality": self.personality,
+            "ideal_cost": self.ideal_cost,
+            "final_suspicion": self.suspicion_level,
+            "dialogue_history": self.dialogue_history
+        }
+
+
+class DoctorAgent:
+    """Doctor Agent"""
+
+    USE_LONG_TERM_MEMORY = True  # Whether this agent reads/writes doctor_memory
+
+    # Prompt templates; static instructions (and historical experience) form the cached prefix
+    EVIDENCE_PROMPT = PromptTemplate(
+        "evidence",
+        L.t("evidence_prompt_role"),
+        L.t("evidence_prompt_instructions")
+    )
+    QUESTION_PROMPT = PromptTemplate(
+        "question",
+        L.t("question_prompt_role"),
+        L.t("question_prompt_instructions")
+    )
+    TEST_SELECTION_PROMPT = None  # Lists the knowledge base's tests; built by index_tests()
+    DIAGNOSIS_PROMPT = PromptTemplate(
+        "diagnosis",
+        L.t("diagnosis_prompt_role"),
+        L.t("diagnosis_prompt_instructions")
+    )
+
+    # Test names as matched in replies: without the generic words ("Blood" for "Blood Test")
+    # and with each suffix ("blood test"), so the names are rewritten once, not per reply
+    TEST_SHORT_NAMES = {}
+    TEST_FULL_NAMES = {}
+    # Tests sorted by price (stable, so equal prices keep catalog order) for the basic test fallback
+    TESTS_BY_COST = []
+    SORTED_TEST_COSTS = []
+
+    @classmethod
+    def index_tests(cls):
+        """Build the test selection prompt and test-name tables from MedicalConfig's tests"""
+        cls.TEST_SELECTION_PROMPT = PromptTemplate(
+            "test_selection",
+            L.t("test_selection_prompt_role"),
+            L.t("test_selection_prompt_instructions") + "\n".join(
+                L.t("test_selection_prompt_test_line", test=test, cost=cost,
+                    test_accuracy=MedicalConfig.TEST_ACCURACY.get(test, 0.7))
+                for test, cost in MedicalConfig.TEST_COSTS.items()
+            ) + L.t("test_selection_prompt_notes")
+        )
+        cls.TEST_SHORT_NAMES = {}
+        for test in MedicalConfig.TEST_COSTS:
+            short = test
+            for word in L.TEST_NAME_WORDS:
+                short = short.replace(word, "")
+            cls.TEST_SHORT_NAMES[test] = short.strip()
+        cls.TEST_FULL_NAMES = {test: tuple(f"{test}{suffix}" for suffix in L.TEST_NAME_SUFFIXES)
+                               for test in MedicalConfig.TEST_COSTS}
+        cls.TESTS_BY_COST = sorted(MedicalConfig.TEST_COSTS, key=MedicalConfig.TEST_COSTS.get)
+        cls.SORTED_TEST_COSTS = [MedicalConfig.TEST_COSTS[test] for test in cls.TESTS_BY_COST]
+
+    def __init__(self, api_client: DeepSeekClient, symptom_extractor: Optional[SymptomExtractor] = None,
+                 console: bool = True):
+        self.api_client = api_client
+        self.learning_history = []
+        self.consultation_log = []
+        self.successful_strategies = {}
+        self.memory_manager = MemoryManager()
+        self.historical_experience = ""
+        self.confidence_threshold = 0.8
+        self.context_budget = ContextBudgetManager(
+            MedicalConfig.DIAGNOSIS_CONTEXT_TOKEN_BUDGET,
+            MedicalConfig.DIAGNOSIS_RECENT_TURNS,
+            symptom_extractor or SymptomExtractor(MedicalConfig.SYMPTOM_SYNONYMS)
+        )
+        self.last_context_report = {}  # Tokens saved by the last make_diagnosis call
+        self.question_session = None  # Multi-turn questioning session for the current patient
+        
+        # Load long-term memory
+        if MedicalConfig.ENABLE_LONG_TERM_MEMORY and self.USE_LONG_TERM_MEMORY:
+            self.historical_experience = self.memory_manager.load_learning_experience()
+            if self.historical_experience and console:
+                print(L.t("doctor_loaded_long_term"))
+    
+    @traced("evidence_check")
+    def is_evidence_sufficient(self, dialogue_history: List, test_results: List, 
+                              current_round: int, current_suspicion: float) -> bool:
+        """Determine if evidence is sufficient for diagnosis"""
+        
+        # If there are test results, construct test summary
+        test_summary = ""
+        if test_results:
+            test_summary = L.t("tests_done_tests", count_test_results=len(test_results),
+                               items=", ".join([r.split(":")[0] for r in test_results if ":" in r][:3]))
+        
+        # Get recent dialogue (last 6 entries)
+        dialogue_text = DialogueBuffer.wrap(dialogue_history).render(last=6)
+        
+        system_prompt, prompt = self.EVIDENCE_PROMPT.render(L.t(
+            "evidence_prompt_input", current_round=current_round, current_suspicion=current_suspicion,
+            test_summary=test_summary, dialogue_text=dialogue_text))
+        
+        try:
+            response = self.api_client.chat(
+                system_prompt=system_prompt,
+                user_message=prompt,
+                temperature=0.3,  # Low temperature ensures stable judgment
+                site=self.EVIDENCE_PROMPT.site
+            ).strip()
+            
+            # Determine response
+            if L.t("evidence_reply_yes") in response or L.t("evidence_reply_yes_short") in response:
+                return True
+            elif L.t("evidence_reply_no") in response or L.t("evidence_reply_no_short") in response:
+                return False
+            else:
+                # If response is unclear, judge based on dialogue length and test count
+                has_tests = len(test_results) > 0
+                sufficient_dialogue = len(dialogue_history) >= 6
+                return (has_tests and sufficient_dialogue) or len(dialogue_history) >= 10
+                
+        except Exception as e:
+            print(L.t("evidence_assessment_api_call", e=e))
+            # Fallback strategy: based on simple rules
+            return len(dialogue_history) >= 8 or (len(test_results) >= 2 and len(dialogue_history) >= 4)
+    
+    def choose_action(self, program_state: programState, patient: PatientAgent) -> str:
+        """Choose action: ask about condition or request test"""
+        # Strategy based on learning history
+        suspicion = patient.suspicion_level
+        budget_ratio = program_state.remaining_budget / MedicalConfig.INITIAL_BUDGET
+        
+        # Simple strategy: decide based on suspicion and budget
+        if (suspicion > 0.6 and budget_ratio > 0.3) or suspicion > 0.8:
+            return L.t("action_request_test")
+        else:
+            return L.t("action_ask_question")
+
+    def start_session(self):
+        """Start a fresh questioning session for a new patient"""
+        if self.QUESTION_PROMPT.site in MedicalConfig.CHAT_SESSION_SITES:
+            self.question_session = ChatSession(self.QUESTION_PROMPT.system_prompt(self.historical_experience),
+                                                MedicalConfig.CHAT_SESSION_MAX_MESSAGES)
+
+    def _generate_question_in_session(self, dialogue_history: List, session: ChatSession) -> str:
+        """Send only the dialogue entries added since the last question"""
+        new_lines = session.sync(dialogue_history, "doctor")
+        session.add("user", new_lines or L.t("no_new_information"))
+        question = self.api_client.chat_messages(
+            session.messages(),
+            temperature=MedicalConfig.TEMPERATURE_DOCTOR_QUESTION,
+            site=self.QUESTION_PROMPT.site
+        ).strip()
+        session.add("assistant", question)
+        return question
+
+    @traced("generate_question")
+    def generate_question(self, dialogue_history: List, session: Optional[ChatSession] = None) -> str:
+        """Generate diagnostic question (in session, or the question session if sessions are on)"""
+        session = session or self.question_session
+        if self.QUESTION_PROMPT.site in MedicalConfig.CHAT_SESSION_SITES and session is not None:
+            return self._generate_question_in_session(dialogue_history, session)
+
+        history_text = DialogueBuffer.wrap(dialogue_history).render(last=4) \
+            if dialogue_history else L.t("no_dialogue_history_yet")  # Last 2 rounds of dialogue
+
+        system_prompt, prompt = self.QUESTION_PROMPT.render(L.t(
+            "question_prompt_input", history_text=history_text), self.historical_experience)
+
+        question = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_DOCTOR_QUESTION,
+            site=self.QUESTION_PROMPT.site
+        )
+        return question.strip()
+
+    @traced("select_test")
+    def select_test_type(self, program_state: programState, symptoms: List[str], dialogue_history: List) -> str:
+        """Based on patient condition, select the most appropriate test from test list"""
+        
+        # Get all test items
+        available_tests = list(MedicalConfig.TEST_COSTS.keys())
+        
+        # If insufficient budget or no symptoms, return a basic test
+        if program_state.remaining_budget < 50 or not symptoms:
+            return self._select_basic_test(program_state.remaining_budget)
+        
+        # Construct symptom description
+        symptoms_text = "、".join(symptoms) if symptoms else L.t("general_discomfort")
+        
+        # Get recent dialogue
+        history_text = DialogueBuffer.wrap(dialogue_history).render(last=4)
+        
+        # Get recently done tests
+        recent_tests = self._get_recent_tests(program_state)
+        
+        # The test list and rules are static (cached prefix); only the patient's situation varies
+        system_prompt, prompt = self.TEST_SELECTION_PROMPT.render(L.t(
+            "test_selection_prompt_input", symptoms_text=symptoms_text, history_text=history_text,
+            remaining_budget=program_state.remaining_budget,
+            recent_tests=L.join(recent_tests) if recent_tests else L.t("none")))
+        
+        try:
+            response = self.api_client.chat(
+                system_prompt=system_prompt,
+                user_message=prompt,
+                temperature=0.4,  # Medium temperature balances professionalism and flexibility
+                site=self.TEST_SELECTION_PROMPT.site
+            )
+            
+            # Extract test name from response
+            selected_test = self._extract_test_from_response(response, available_tests, program_state.remaining_budget)
+            
+            # If successfully selected valid test, return it
+            if selected_test:
+                return selected_test
+            else:
+                # If AI selection fails, fallback to basic test
+                return self._select_basic_test(program_state.remaining_budget)
+                
+        except Exception as e:
+            print(L.t("error_when_ai_selecting", e=e))
+            return self._select_basic_test(program_state.remaining_budget)
+    
+    def _extract_test_from_response(self, response: str, available_tests: List[str], budget: int) -> str:
+        """Extract test name from AI response"""
+        # Clean response
+        response = response.strip()
+        
+        # Try direct matching
+        for test in available_tests:
+            # Check if name appears in response
+            if test in response:
+                # Verify budget
+                if MedicalConfig.TEST_COSTS[test] <= budget:
+                    return test
+        
+        # If direct matching fails, try partial matching
+        for test in available_tests:
+            if self.TEST_SHORT_NAMES[test] in response:
+                if MedicalConfig.TEST_COSTS[test] <= budget:
+                    return test
+        
+        # Check for complete names like "Blood Test", "ECG Test"
+        folded = L.fold(response)
+        for test in available_tests:
+            for name in self.TEST_FULL_NAMES[test]:
+                if name in folded and MedicalConfig.TEST_COSTS[test] <= budget:
+                    return test
+        
+        return ""
+    
+    def _select_basic_test(self, budget: int) -> str:
+        """Select basic test (used when AI selection fails)"""
+        # Tests within budget are a prefix of the tests sorted by price
+        affordable = bisect_right(self.SORTED_TEST_COSTS, budget)
+        
+        if not affordable:
+            # If budget insufficient for any test, return cheapest
+            return self.TESTS_BY_COST[0]
+        
+        # Choose test at middle price position (avoid always choosing cheapest, increase diversity)
+        if affordable >= 3:
+            return self.TESTS_BY_COST[affordable // 2]  # Middle position
+        else:
+            return self.TESTS_BY_COST[0]  # First
+    
+    def _get_recent_tests(self, program_state: programState) -> List[str]:
+        """Get recently done tests"""
+        recent_tests = []
+        
+        # Find recent tests from action history
+        for action in reversed(program_state.actions_history[-10:]):  # Check last 10 actions
+            if action.get("type") == L.t("action_type_test"):
+                test_type = action.get("details", {}).get("test_type")
+                if test_type and test_type not in recent_tests:
+                    recent_tests.append(test_type)
+        
+        return recent_tests[-3:]  # Return last 3 tests
+
+    @traced("diagnosis")
+    def make_diagnosis(self, full_dialogue: List, test_results: List,
+                       test_priorities: Optional[Dict[str, float]] = None) -> str:
+        """Make final diagnosis"""
+        # Keep dialogue, test results and experience within the context token budget
+        context = self.context_budget.compress(full_dialogue, test_results, self.historical_experience, test_priorities)
+        self.last_context_report = context["report"]
+        if MedicalConfig.SHOW_DETAILED_LOGS and self.last_context_report["saved_tokens"] > 0:
+            report = self.last_context_report
+            print(L.t("diagnosis_context_tokens_saved", original_tokens=report["original_tokens"],
+                      compressed_tokens=report["compressed_tokens"], saved_tokens=report["saved_tokens"]))
+
+        dialogue_text = context["dialogue_text"]
+        test_text = context["test_text"] if test_results else L.t("no_test_results")
+
+        system_prompt, prompt = self.DIAGNOSIS_PROMPT.render(L.t(
+            "diagnosis_prompt_input", dialogue_text=dialogue_text, test_text=test_text), context["experience"])
+
+        diagnosis = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_DOCTOR_DIAGNOSIS,
+            site=self.DIAGNOSIS_PROMPT.site
+        )
+        return diagnosis
+    
+    def learn_from_round(self, round_result: Dict, run_id: str):
+        """Learn from this round and update long-term memory"""
+        self.learning_history.append(round_result)
+        
+        # Extract key learning points
+        key_learning = self._extract_key_learning(round_result)
+        
+        # Update strategy
+        strategy_key = f"q{round_result['questions_asked']}_t{round_result['tests_ordered']}"
+        if round_result["success"]:
+            self.successful_strategies[strategy_key] = \
+                self.successful_strategies.get(strategy_key, 0) + 1
+        else:
+            self.successful_strategies[strategy_key] = \
+                self.successful_strategies.get(strategy_key, 0) - 1
+        
+        # Save to long-term memory
+        if MedicalConfig.ENABLE_LONG_TERM_MEMORY and self.USE_LONG_TERM_MEMORY:
+            learning_experience = {
+                "success_rate": round_result["success"],
+                "avg_questions": round_result["questions_asked"],
+                "avg_tests": round_result["tests_ordered"],
+                "cost_efficiency": round_result.get("cost_ratio", 1.0),
+                "key_learning": key_learning,
+                "strategy_used": strategy_key
+            }
+            self.memory_manager.save_learning_experience(learning_experience, run_id)
+    
+    def _extract_key_learning(self, round_result: Dict) -> str:
+        """Extract key learning points from round result"""
+        if round_result["success"]:
+            if round_result["questions_asked"] <= 3:
+                return L.t("few_precise_questions_can")
+            elif round_result["tests_ordered"] > 0:
+                return L.t("reasonable_use_tests_improves")
+            else:
+                return L.t("pure_consultation_can_also")
+        else:
+            if round_result["final_suspicion"] >= MedicalConfig.SUSPICION_THRESHOLD:
+                return L.t("patient_trust_management_needs")
+            elif round_result.get("cost_ratio", 1) > 2.0:
+                return L.t("cost_control_needs_optimization")
+            else:
+                return L.t("need_improve_diagnostic_accuracy")
+
+    def get_learning_summary(self) -> str:
+        """Get learning summary"""
+        if not self.learning_history:
+            return L.t("no_learning_data_yet")
+        
+        recent_rounds = self.learning_history[-5:] if len(self.learning_history) >= 5 else self.learning_history
+        success_rate = sum(1 for r in recent_rounds if r["success"]) / len(recent_rounds)
+        avg_questions = sum(r["questions_asked"] for r in recent_rounds) / len(recent_rounds)
+        avg_tests = sum(r["tests_ordered"] for r in recent_rounds) / len(recent_rounds)
+        
+        return (L.t("recent_success_rate_average", success_rate=success_rate, avg_questions=avg_questions,
+                    avg_tests=avg_tests))
+    
+    def export_learning_data(self) -> Dict:
+        """Export learning data"""
+        return {
+            "learning_history": self.learning_history,
+            "successful_strategies": self.successful_strategies,
+            "total_rounds_learned": len(self.learning_history)
+        }
+
+    def import_learning_data(self, learning_data: Dict):
+        """Restore learning data exported earlier (resuming a checkpointed run)"""
+        self.learning_history = list(learning_data.get("learning_history", []))
+        self.successful_strategies = dict(learning_data.get("successful_strategies", {}))
+
+
+DoctorAgent.index_tests()
+
+
+# ==================== Generator ====================
+
+class CaseGenerator:
+    """Case Generator"""
+
+    SYMPTOMS_PROMPT = PromptTemplate(
+        "case_generation",
+        L.t("symptoms_prompt_role"),
+        L.t("symptoms_prompt_instructions")
+    )
+
+    def __init__(self, api_client: DeepSeekClient):
+        self.api_client = api_client
+
+    @traced("case_generation")
+    def generate_random_case(self, rng: Optional[random.Random] = None) -> Dict:
+        """Generate random case (drawing from rng, or the global random module)"""
+        rng = rng or random
+        disease = rng.choice(MedicalConfig.DISEASE_LIBRARY)
+        personality = rng.choice(list(MedicalConfig.PERSONALITY_TYPES.keys()))
+        return self.generate_case(disease, personality, rng)
+
+    def generate_case(self, disease: str, personality: str, rng: Optional[random.Random] = None) -> Dict:
+        """Generate a case of the given disease and personality (batch and scheduled scenarios)"""
+        rng = rng or random
+        personality_info = MedicalConfig.PERSONALITY_TYPES[personality]
+        
+        # Generate symptom description
+        symptoms = self._generate_symptoms_description(disease)
+        
+        # Generate ideal cost
+        cost_range = personality_info["ideal_cost_range"]
+        ideal_cost = rng.randint(cost_range[0], cost_range[1])
+        
+        return {
+            "true_disease": disease,
+            "symptoms_description": symptoms,
+            "personality": personality,
+            "ideal_cost": ideal_cost
+        }
+
+    def _generate_symptoms_description(self, disease: str) -> str:
+        """Generate symptom description"""
+        system_prompt, prompt = self.SYMPTOMS_PROMPT.render(L.t("disease_line", disease=disease))
+
+        response = self.api_client.chat(
+            system_prompt=system_prompt,
+            user_message=prompt,
+            temperature=MedicalConfig.TEMPERATURE_CASE_GENERATION,
+            site=self.SYMPTOMS_PROMPT.site
+        )
+        return response.strip()
+
+
+# ==================== Offline Simulation ====================
+
+class OfflineCaseGenerator(CaseGenerator):
+    """Offline Case Generator - Builds symptom descriptions from symptom facts"""
+
+    def _generate_symptoms_description(self, disease: str) -> str:
+        """Generate symptom description from the disease's symptom facts"""
+        facts = MedicalConfig.DISEASE_SYMPTOM_FACTS.get(disease, [L.t("generally_unwell")])
+        return L.describe_symptoms(facts)
+
+
+class OfflinePatientAgent(PatientAgent):
+    """Offline Patient Agent - Deterministic template-driven answers without API calls"""
+
+    HEDGES = L.PATIENT_HEDGES
+    VAGUE_ANSWERS = L.PATIENT_VAGUE_ANSWERS
+
+    def __init__(self, api_client: Optional[DeepSeekClient], case_info: Dict,
+                 rng: Optional[random.Random] = None):
+        super().__init__(api_client, case_info, rng)
+        self.symptom_facts = MedicalConfig.DISEASE_SYMPTOM_FACTS.get(self.true_condition, [L.t("generally_unwell")])
+        self.vagueness = MedicalConfig.PERSONALITY_VAGUENESS.get(self.personality, 0.3)
+        self.next_fact_index = 0
+        # Unless given a round stream, seed from the case so the same case always produces the same conversation
+        if rng is None:
+            case_key = f"{self.true_condition}|{self.personality}|{self.ideal_cost}"
+            self.rng = random.Random(zlib.crc32(case_key.encode("utf-8")))
+
+    def _pick_fact(self, question: str) -> str:
+        """Pick the fact that best matches the question, otherwise the next unrevealed one"""
+        question_terms = L.match_terms(question)
+        best_fact, best_score = None, 0
+        for fact in self.symptom_facts:
+            score = len(question_terms & L.match_terms(fact))
+            if score > best_score:
+                best_fact, best_score = fact, score
+        if best_fact:
+            return best_fact
+
+        fact = self.symptom_facts[self.next_fact_index % len(self.symptom_facts)]
+        self.next_fact_index += 1
+        return fact
+
+    def _phrase(self, fact: str) -> str:
+        """Phrase a fact, vague personalities hedge or withhold details"""
+        roll = self.rng.random()
+        if roll < self.vagueness / 2:
+            return self.rng.choice(self.VAGUE_ANSWERS)
+        if roll < self.vagueness:
+            return L.t("hedged_fact", choice=self.rng.choice(self.HEDGES), fact=fact)
+        return L.t("yes_fact", fact=fact)
+
+    def _generate_misunderstanding_response(self, question: str, trigger: str) -> str:
+        """Generate misunderstanding response from the chosen trigger"""
+        fact = self.rng.choice(self.symptom_facts)
+        return L.t("misunderstood_trigger", trigger=trigger.capitalize(), fact=fact)
+
+    def _generate_truthful_response(self, question: str) -> str:
+        """Generate truthful response from symptom facts"""
+        return self._phrase(self._pick_fact(question))
+
+    def get_initial_complaint(self) -> str:
+        """Get initial complaint from the first symptom facts"""
+        facts = self.symptom_facts[:2]
+        self.next_fact_index = len(facts)
+        response = L.t("initial_complaint", choice=self.rng.choice(self.HEDGES).lower(),
+                       facts=L.FACT_JOINER.join(facts))
+
+        self.dialogue_history.append({
+            "role": "patient",
+            "content": response
+        })
+
+        return response
+
+
+class OfflineDoctorAgent(DoctorAgent):
+    """Offline Doctor Agent - Rule-based doctor scoring diseases against symptom facts"""
+
+    USE_LONG_TERM_MEMORY = False  # Simulated rounds must not pollute real doctor memory
+
+    QUESTIONS = L.OFFLINE_QUESTIONS
+
+    def _score_diseases(self, dialogue_history: List, test_results: List) -> List:
+        """Score each disease by matched symptom facts and positive test results"""
+        patient_text = " ".join(
+            L.fold(msg["content"]) for msg in dialogue_history if msg["role"] != "doctor"
+        )
+        test_text = " ".join(test_results)
+        scores = []
+        for disease, facts in MedicalConfig.DISEASE_SYMPTOM_FACTS.items():
+            score = sum(1 for fact in facts if L.fold(fact) in patient_text)
+            if disease in test_text:  # Only positive results name the disease
+                score += 3
+            scores.append((score, disease))
+        scores.sort(key=lambda x: -x[0])
+        return scores
+
+    @traced("evidence_check")
+    def is_evidence_sufficient(self, dialogue_history: List, test_results: List,
+                              current_round: int, current_suspicion: float) -> bool:
+        """Evidence is sufficient once one disease clearly leads"""
+        scores = self._score_diseases(dialogue_history, test_results)
+        return scores[0][0] >= 2 and scores[0][0] - scores[1][0] >= 2
+
+    @traced("generate_question")
+    def generate_question(self, dialogue_history: List, session: Optional[ChatSession] = None) -> str:
+        """Ask the next question from the fixed question list"""
+        asked = sum(1 for msg in dialogue_history if msg["role"] == "doctor")
+        return self.QUESTIONS[asked % len(self.QUESTIONS)]
+
+    @traced("select_test")
+    def select_test_type(self, program_state: programState, symptoms: List[str], dialogue_history: List) -> str:
+        """Select the affordable test most relevant to the leading candidate"""
+        candidate = self._score_diseases(dialogue_history, program_state.test_results)[0][1]
+        recent_tests = self._get_recent_tests(program_state)
+        best_test, best_relevance = "", 0.0
+        # Only tests with a relevance entry for the candidate can win: one sparse column, not every test
+        for test, relevance in MedicalConfig.KNOWLEDGE.relevant_tests(candidate):
+            if MedicalConfig.TEST_COSTS[test] > program_state.remaining_budget or test in recent_tests:
+                continue
+            if relevance > best_relevance:
+                best_test, best_relevance = test, relevance
+        return best_test or self._select_basic_test(program_state.remaining_budget)
+
+    @traced("diagnosis")
+    def make_diagnosis(self, full_dialogue: List, test_results: List,
+                       test_priorities: Optional[Dict[str, float]] = None) -> str:
+        """Diagnose the highest scoring disease"""
+        score, disease = self._score_diseases(full_dialogue, test_results)[0]
+        return disease if score > 0 else L.t("unable_determine")
+
+
+# ==================== Engine ====================
+
+class MedicalDiagnosisprogram:
+    """Medical Diagnosis Engine"""
+
+    CONTINUE_PROMPT = PromptTemplate(
+        "continue_decision",
+        L.t("continue_prompt_role"),
+        L.t("continue_prompt_instructions")
+    )
+
+    def __init__(self, auto_mode: bool = False, patient_backend: str = "llm", offline: bool = False,
+                 backend_routes: Optional[Dict[str, str]] = None, seed: Optional[int] = None,
+                 api_client: Optional[DeepSeekClient] = None, console: bool = True):
+        # offline=True runs the whole consultation rule-based, without any API calls;
+        # api_client shares one warm client between programs (the service), otherwise each creates its own
+        self.offline = offline
+        self.console = console  # Print the consultation; the service and batch workers turn this off
+        self.seed = seed  # Rounds draw from RoundStreams(seed, round number); None uses the global random module
+        init_console()
+        if not offline:
+            MedicalConfig.load_environment()
+        self.patient_backend = "offline" if offline else patient_backend
+        self.backend_routes = dict(backend_routes or {})  # --llm-backend routes, kept for checkpoints
+        self.api_client = None if offline else api_client or DeepSeekClient(BackendRegistry.from_config(backend_routes))
+        self.medical_system = MedicalSystem()
+        if self.patient_backend == "offline":
+            self.case_generator = OfflineCaseGenerator(self.api_client)
+            self.patient_class = OfflinePatientAgent
+        else:
+            self.case_generator = CaseGenerator(self.api_client)
+            self.patient_class = PatientAgent
+        self.symptom_extractor = SymptomExtractor(MedicalConfig.SYMPTOM_SYNONYMS)
+        doctor_class = OfflineDoctorAgent if offline else DoctorAgent
+        self.doctor = doctor_class(self.api_client, self.symptom_extractor, console)
+        self.record_manager = RecordManager()
+        self.auto_mode = auto_mode
+        self.total_rounds = 0
+        self.program_results = []
+        self.run_id = None
+        self.checkpoint = None  # CheckpointJournal of this run, if checkpointing
+        self.strict = False  # Raise instead of finishing a round whose LLM calls failed (batch jobs retry it)
+        self._failed_calls_at_start = 0
+        self.speculative = MedicalConfig.ENABLE_SPECULATIVE_QUESTIONS and not offline
+        if MedicalConfig.ENABLE_TRACING:
+            tracer.enable(MedicalConfig.TRACE_OPENTELEMETRY)
+        self.profiler = None
+        self._speculation_pool = None
+        self._speculation_lock = threading.Lock()  # Discarded questions are accounted from the pool thread
+        self.speculation_stats = {
+            "started": 0,
+            "used": 0,
+            "discarded": 0,
+            "wasted_tokens": 0,     # Tokens of speculative questions that were thrown away
+            "saved_seconds": 0.0    # Question latency hidden behind the evidence check
+        }
+
+    def extract_symptoms_from_complaint(self, complaint: str) -> List[str]:
+        """Extract symptom keywords from patient complaint"""
+        return self.symptom_extractor.extract(complaint)
+    
+    def print_section(self, title: str, color: str = Fore.YELLOW):
+        """Print section title separator"""
+        if not self.console:
+            return
+        separator = "=" * 60
+        print(f"\n{color}{separator}")
+        print(f"{title:^60}")
+        print(f"{separator}{Style.RESET_ALL}\n")
+    
+    def _doctor_decide_continue(self, program_state, patient) -> bool:
+        """Doctor decides whether to continue collecting evidence"""
+        # Rule-based doctor stops as soon as evidence is sufficient
+        if self.offline:
+            return False
+    
+        # If sufficient budget and patient suspicion not high, doctor may want to collect more evidence
+        if program_state.remaining_budget > 200 and patient.suspicion_level < 0.5:
+            system_prompt, prompt = self.CONTINUE_PROMPT.render(L.t(
+                "continue_prompt_input", suspicion_level=patient.suspicion_level,
+                remaining_budget=program_state.remaining_budget))
+            
+            try:
+                response = self.doctor.api_client.chat(
+                    system_prompt=system_prompt,
+                    user_message=prompt,
+                    temperature=0.4,
+                    site=self.CONTINUE_PROMPT.site
+                ).strip()
+                
+                return L.t("continue_reply") in response
+            except:
+                # Default: if sufficient budget and patient not suspicious, continue
+                return program_state.remaining_budget > 150 and patient.suspicion_level < 0.4
+        else:
+            # When budget tight or patient suspicion high, stop immediately
+            return False
+
+    def print_info(self, message: str, color: str = Fore.WHITE):
+        """Print information"""
+        if self.console:
+            print(f"{color}{message}{Style.RESET_ALL}")
+
+    @traced("round")
+    def play_round(self, round_number: Optional[int] = None, scenario: Optional[Dict] = None) -> Dict:
+        """Conduct one round of diagnosis
+
+        round_number numbers the round within a run whose rounds are spread over several
+        programs; with a seed it picks the round's random streams. By default rounds count up.
+        scenario ({"disease", "personality"}) fixes the case instead of drawing it at random.
+        """
+        round_start = time.time()
+        case_info, patient, program_state, streams = self._start_round(round_number, scenario)
+
+        # Main loop
+        speculation = None  # (future, evidence seconds) of a question generated during the evidence check
+        while not program_state.is_round_over(self.doctor):  # Pass doctor parameter
+            self.print_info(f"\n{program_state.get_status_summary()}", Fore.CYAN)
+            
+            # If evidence already sufficient but hasn't broken loop, end directly
+            if program_state.evidence_sufficient:
+                self.print_info(L.t("doctor_thinks_evidence_sufficient_stop"), Fore.GREEN)
+                break
+                
+            # Doctor chooses action
+            action = self.doctor.choose_action(program_state, patient)
+            
+            if action == L.t("action_ask_question"):
+                prefetched = self._finish_speculation(speculation, used=True) if speculation else None
+                speculation = None
+                self._handle_questioning(program_state, patient, program_state.dialogue_history, prefetched)
+            else:
+                if speculation:
+                    self._finish_speculation(speculation, used=False)
+                    speculation = None
+                self._handle_test_ordering(program_state, patient, program_state.dialogue_history,
+                                           program_state.test_results, streams.tests)
+            
+            # After each action, doctor re-evaluates if evidence is sufficient
+            if program_state.questions_asked >= 4 or program_state.tests_ordered >= 1:
+                # Start the next question early; it is only thrown away if the round ends
+                future = self._start_speculative_question(program_state, patient)
+
+                # Doctor assessment
+                evidence_start = time.time()
+                is_sufficient = self.doctor.is_evidence_sufficient(
+                    program_state.dialogue_history,
+                    program_state.test_results,
+                    program_state.current_round,
+                    patient.suspicion_level
+                )
+                if future:
+                    speculation = (future, time.time() - evidence_start)
+                
+                if is_sufficient and not program_state.evidence_sufficient:
+                    program_state.evidence_sufficient = True
+                    self.print_info(L.t("doctor_thinks_current_evidence"), Fore.GREEN)
+                    # Can choose to continue consultation or end immediately
+                    # Here let doctor decide whether to continue
+                    continue_action = self._doctor_decide_continue(program_state, patient)
+                    if not continue_action:
+                        break
+        
+            # if not self.auto_mode and not program_state.is_round_over(self.doctor):
+            #     input("Press Enter to continue...")
+
+        if speculation:  # Round ended before the speculative question was asked
+            self._finish_speculation(speculation, used=False)
+
+        return self._finish_round(program_state, patient, case_info, time.time() - round_start)
+
+    def _start_round(self, round_number: Optional[int] = None,
+                     scenario: Optional[Dict] = None) -> Tuple[Dict, PatientAgent, programState, RoundStreams]:
+        """Generate the case and patient of a new round and take the initial complaint"""
+        self.total_rounds = round_number if round_number is not None else self.total_rounds + 1
+        streams = RoundStreams(self.seed, self.total_rounds)
+        self._failed_calls_at_start = self.api_client.failed_calls() if self.api_client else 0
+        self.print_section(L.t("patient_consultation", total_rounds=self.total_rounds), Fore.CYAN)
+
+        # Generate case and patient
+        if scenario:
+            case_info = self.case_generator.generate_case(scenario["disease"], scenario["personality"], streams.case)
+        else:
+            case_info = self.case_generator.generate_random_case(streams.case)
+        tracer.annotate(round=self.total_rounds, disease=case_info["true_disease"],
+                        personality=case_info["personality"])
+        patient = self.patient_class(self.api_client, case_info, streams.patient)
+        self.doctor.start_session()
+        program_state = programState()
+        program_state.current_round = self.total_rounds
+        program_state.console = self.console
+
+        # Display case information
+        self.print_info(L.t("patient_personality", personality=case_info["personality"]), Fore.MAGENTA)
+        self.print_info(L.t("ideal_cost_yuan", ideal_cost=case_info["ideal_cost"]), Fore.MAGENTA)
+        self.print_info(L.t("true_condition", true_disease=case_info["true_disease"]), Fore.GREEN)
+        
+        # Patient initial complaint
+        self.print_info(L.t("patient_complaint"), Fore.YELLOW)
+        initial_complaint = patient.get_initial_complaint()
+        self.print_info(L.t("patient_complaint_line", initial_complaint=initial_complaint), Fore.WHITE)
+        patient_symptoms = self.extract_symptoms_from_complaint(initial_complaint)
+        program_state.patient_symptoms = patient_symptoms
+        program_state.dialogue_history = DialogueBuffer(patient.dialogue_history)
+        return case_info, patient, program_state, streams
+
+    def _finish_round(self, program_state: programState, patient: PatientAgent, case_info: Dict,
+                      seconds: float, diagnosis: Optional[str] = None) -> Dict:
+        """Diagnose (unless a diagnosis is given), evaluate, save and count a round"""
+        round_result = self._evaluate_round(program_state, patient, case_info, program_state.dialogue_history,
+                                            program_state.test_results, diagnosis)
+        
+        # Save this round's record
+        if MedicalConfig.SAVE_RECORDS:
+            round_data = self._prepare_round_data(program_state, patient, case_info, round_result)
+            round_file = self.record_manager.save_round_log(round_data, self.total_rounds)
+            self.print_info(L.t("round_s_record_saved", round_file=round_file), Fore.GREEN)
+        
+        self._record_round_metrics(case_info, round_result, seconds)
+        return round_result
+
+    def _record_round_metrics(self, case_info: Dict, round_result: Dict, seconds: float):
+        """Update the live metrics with a finished round"""
+        metrics.inc("doctor_rounds_total", disease=case_info["true_disease"],
+                    personality=case_info["personality"],
+                    outcome="success" if round_result["success"] else "failure")
+        metrics.observe("doctor_round_duration_seconds", seconds)
+        metrics.observe("doctor_round_cost_yuan", round_result["total_cost"])
+        metrics.inc("doctor_budget_spent_yuan_total", round_result["total_cost"], disease=case_info["true_disease"])
+        metrics.inc("doctor_questions_total", round_result["questions_asked"])
+        metrics.inc("doctor_tests_total", round_result["tests_ordered"])
+
+    def _start_speculative_question(self, program_state: programState, patient: PatientAgent) -> Optional[Future]:
+        """Generate the next question in the background if the doctor is going to ask one"""
+        if not self.speculative or program_state.is_round_over():
+            return None
+        if self.doctor.choose_action(program_state, patient) != L.t("action_ask_question"):
+            return None
+        if self._speculation_pool is None:
+            self._speculation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-question")
+        with self._speculation_lock:
+            self.speculation_stats["started"] += 1
+        # The question goes to a copy of the doctor's session, which replaces it only if the question is asked;
+        # the copied history keeps a discarded question that is still running apart from the next turns
+        session = self.doctor.question_session.copy() if self.doctor.question_session else None
+        return self._speculation_pool.submit(self._timed_question, list(program_state.dialogue_history), session)
+
+    def _timed_question(self, dialogue_history: List,
+                        session: Optional[ChatSession]) -> Tuple[str, float, int, Optional[ChatSession], int]:
+        """Generate a question, returning it with its latency, token cost, the session it extended and failed calls"""
+        start_time = time.time()
+        failed_before = self.api_client.failed_calls()
+        question = self.doctor.generate_question(dialogue_history, session)
+        return (question, time.time() - start_time, self.api_client.last_call_tokens(), session,
+                self.api_client.failed_calls() - failed_before)
+
+    def _finish_speculation(self, speculation: Tuple[Future, float], used: bool) -> Optional[str]:
+        """Collect a speculative question and account for the time saved, or let a discarded one finish unseen"""
+        future, evidence_seconds = speculation
+        if not used:
+            # Nobody waits for a thrown-away question; its tokens are counted once it completes
+            future.add_done_callback(self._account_discarded)
+            return None
+        question, question_seconds, _, session, failed = future.result()
+        if session is not None:
+            self.doctor.question_session = session
+        if failed:
+            self.api_client.add_failed_calls(failed)
+        with self._speculation_lock:
+            self.speculation_stats["used"] += 1
+            # Run sequentially, the question would have started after the evidence check
+            self.speculation_stats["saved_seconds"] += min(question_seconds, evidence_seconds)
+        return question
+
+    def _account_discarded(self, future: Future):
+        """Count a thrown-away speculative question and its tokens"""
+        tokens = future.result()[2] if future.exception() is None else 0
+        with self._speculation_lock:
+            self.speculation_stats["discarded"] += 1
+            self.speculation_stats["wasted_tokens"] += tokens
+
+    @traced("questioning")
+    def _handle_questioning(self, program_state: programState, patient: PatientAgent, 
+                          dialogue_history: List, prefetched_question: Optional[str] = None):
+        """Handle questioning about condition"""
+        self.print_info(L.t("doctor_asks_about_condition"), Fore.BLUE)
+        
+        question = prefetched_question or self.doctor.generate_question(dialogue_history)
+        self.print_info(L.t("doctor_says", question=question), Fore.BLUE)
+        
+        response = patient.respond_to_question(question)
+        self.print_info(L.t("patient_says", response=response), Fore.WHITE)
+        
+        program_state.add_question()
+        program_state.add_symptoms(self.extract_symptoms_from_complaint(response))
+        program_state.record_action(L.t("action_type_question"), {"question": question, "response": response})
+        
+        dialogue_history.extend([
+            {"role": "doctor", "content": question},
+            {"role": "patient", "content": response}
+        ])
+
+    @traced("test_ordering")
+    def _handle_test_ordering(self, program_state: programState, patient: PatientAgent,
+                            dialogue_history: List, test_results: List, rng: Optional[random.Random] = None,
+                            test_type: Optional[str] = None):
+        """Handle test request (the doctor selects the test unless one is given)"""
+        self.print_info(L.t("doctor_requests_test"), Fore.GREEN)
+        
+        test_type = test_type or self.doctor.select_test_type(program_state, program_state.patient_symptoms, dialogue_history)
+        if not test_type:
+            test_type = L.t("fallback_test")  # Ultimate fallback
+        self.print_info(L.t("doctor_recommends_test", test_type=test_type), Fore.GREEN)
+        
+        test_result = self.medical_system.perform_test(test_type, patient.true_condition, rng)
+        self.print_info(L.t("test_result", result=test_result["result"]), Fore.WHITE)
+        self.print_info(L.t("test_cost_yuan", cost=test_result["cost"]), Fore.YELLOW)
+        
+        program_state.add_test(test_result['cost'])
+        program_state.posterior.observe(test_type, test_result["result_type"] == "true_positive")
+        program_state.record_action(L.t("action_type_test"), {
+            "test_type": test_type, 
+            "result": test_result['result'],
+            "cost": test_result['cost'],
+            "accurate": test_result['accurate'],
+            "relevance": test_result['relevance'],
+            "result_type": test_result['result_type']
+        })
+        
+        test_results.append(f"{test_type}: {test_result['result']}")
+        
+        dialogue_history.append({
+            "role": "system", 
+            "content": L.t("performed_test_result", test_type=test_type, result=test_result["result"])
+        })
+    
+    def _get_test_priorities(self, program_state: programState) -> Dict[str, float]:
+        """Rank test result lines by diagnostic value (positive, relevant findings first)"""
+        priorities = {}
+        for action in program_state.actions_history:
+            if action["type"] != L.t("action_type_test"):
+                continue
+            details = action["details"]
+            relevance = details.get("relevance", 0.0)
+            bonus = 1.0 if details.get("result_type") == "true_positive" else 0.0
+            priorities[f"{details['test_type']}: {details['result']}"] = relevance + bonus
+        return priorities
+
+    def _get_round_end_reason(self, program_state: programState) -> str:
+        """Get round end reason"""
+        if program_state.patient_suspicion >= MedicalConfig.SUSPICION_THRESHOLD:
+            return L.t("patient_suspicion_too_high")
+        elif program_state.remaining_budget <= 0:
+            return L.t("budget_exhausted")
+        elif program_state.questions_asked >= MedicalConfig.MAX_QUESTIONS_PER_ROUND:
+            return L.t("question_count_reached_limit")
+        elif program_state.evidence_sufficient:
+            return L.t("end_evidence_sufficient")
+        else:
+            return L.t("unknown_reason")
+
+    @traced("evaluation")
+    def _evaluate_round(self, program_state: programState, patient: PatientAgent, 
+                       case_info: Dict, dialogue_history: List, test_results: List,
+                       diagnosis: Optional[str] = None) -> Dict:
+        """Evaluate this round's results (the doctor diagnoses unless a diagnosis is given)"""
+        self.print_section(L.t("round_evaluation"), Fore.MAGENTA)
+
+        # Failure condition check
+        failure_reasons = []
+        if patient.suspicion_level >= MedicalConfig.SUSPICION_THRESHOLD:
+            failure_reasons.append(L.t("patient_trust_lost"))
+        if program_state.remaining_budget < 0:
+            failure_reasons.append(L.t("budget_exhausted"))
+        if program_state.questions_asked >= MedicalConfig.MAX_QUESTIONS_PER_ROUND:
+            failure_reasons.append(L.t("question_count_exceeded_limit"))
+
+        # Final diagnosis
+        self.print_info(L.t("doctor_thinking_about_final"), Fore.CYAN)
+        diagnosis = diagnosis or self.doctor.make_diagnosis(dialogue_history, test_results,
+                                                            self._get_test_priorities(program_state))
+        self.print_info(L.t("doctor_diagnosis", diagnosis=diagnosis), Fore.CYAN)
+        if self.strict and self.api_client:
+            failed = self.api_client.failed_calls() - self._failed_calls_at_start
+            if failed:  # Before the doctor learns from or anyone records a round played on fallback replies
+                raise RuntimeError(L.t("round_llm_calls_failed", failed=failed))
+
+        # Judge diagnostic accuracy
+        diagnosis_correct = L.fold(case_info["true_disease"]) in L.fold(diagnosis)
+        cost_ratio = program_state.total_cost / case_info["ideal_cost"]
+
+        # Comprehensive evaluation
+        success = (diagnosis_correct and 
+                  not failure_reasons and 
+                  cost_ratio <= 2.0)  # Cost not exceeding 2 times ideal cost
+
+        if success:
+            self.print_info(L.t("consultation_successful"), Fore.GREEN)
+        else:
+            self.print_info(L.t("consultation_failed"), Fore.RED)
+            if failure_reasons:
+                self.print_info(L.t("failure_reasons", failure_reasons=", ".join(failure_reasons)), Fore.RED)
+            if not diagnosis_correct:
+                self.print_info(L.t("diagnosis_incorrect"), Fore.RED)
+            if cost_ratio > 2.0:
+                self.print_info(L.t("cost_exceeded_actual_yuan", total_cost=program_state.total_cost,
+                                    ideal_cost=case_info["ideal_cost"]), Fore.RED)
+
+        round_result = {
+            "round": self.total_rounds,
+            "success": success,
+            "true_disease": case_info["true_disease"],
+            "personality": case_info["personality"],
+            "diagnosis": diagnosis,
+            "diagnosis_correct": diagnosis_correct,
+            "questions_asked": program_state.questions_asked,
+            "tests_ordered": program_state.tests_ordered,
+            "total_cost": program_state.total_cost,
+            "ideal_cost": case_info["ideal_cost"],
+            "final_suspicion": patient.suspicion_level,
+            "failure_reasons": failure_reasons,
+            "cost_ratio": cost_ratio,
+            "evidence_sufficient": program_state.evidence_sufficient,  # New
+            "differential": [  # Most likely diseases given the test results alone
+                {"disease": disease, "probability": round(probability, 4)}
+                for disease, probability in program_state.posterior.top(MedicalConfig.DIFFERENTIAL_SIZE)
+            ] if program_state.tests_ordered else [],
+            "context_report": self.doctor.last_context_report,
+            "round_end_reason": self._get_round_end_reason(program_state)
+        }
+
+        # Doctor learning
+        self.doctor.learn_from_round(round_result, self.run_id)
+
+        # Display learning progress
+        learning_summary = self.doctor.get_learning_summary()
+        self.print_info(L.t("learning_progress", learning_summary=learning_summary), Fore.CYAN)
+
+        return round_result
+
+    def _prepare_round_data(self, program_state: programState, patient: PatientAgent, 
+                           case_info: Dict, round_result: Dict) -> Dict:
+        """Prepare this round's data for saving"""
+        return {
+            "round_info": {
+                "round_number": self.total_rounds,
+                "start_time": program_state.start_time.isoformat(),
+                "end_time": datetime.now().isoformat(),
+                "result": round_result
+            },
+            "patient_info": patient.export_to_dict(),
+            "case_info": case_info,
+            "program_state": program_state.export_to_dict(),
+            "doctor_learning": self.doctor.export_learning_data()
+        }
+
+    def run_program(self, total_rounds: int = 5, resume: Optional[CheckpointJournal] = None):
+        """Run complete program (or continue a checkpointed one after its last finished round)"""
+        self.print_section(L.t("ai_doctor_patient_diagnosis"), Fore.CYAN)
+        self.print_info(L.t("rules"), Fore.YELLOW)
+        self.print_info(L.t("doctor_must_diagnose_disease"), Fore.WHITE)
+        self.print_info(L.t("patient_descriptions_may_vague"), Fore.WHITE)
+        self.print_info(L.t("tests_accurate_but_increase"), Fore.WHITE)
+        self.print_info(L.t("need_balance_trust_cost"), Fore.WHITE)
+
+        MedicalConfig.validate(require_api_key=not self.offline and self.api_client.registry.uses("deepseek"))
+        site_backends = self.api_client.registry.describe() if self.api_client else {}
+        if any(name != "deepseek" for name in site_backends.values()):
+            routes = ", ".join(f"{site}→{name}" for site, name in site_backends.items())
+            self.print_info(L.t("llm_backends", routes=routes), Fore.CYAN)
+
+        if MedicalConfig.ENABLE_METRICS:
+            server = start_metrics_server(MedicalConfig.METRICS_HOST, MedicalConfig.METRICS_PORT)
+            self.print_info(L.t("metrics_http_metrics", metrics_host=MedicalConfig.METRICS_HOST,
+                                server_port=server.server_port), Fore.CYAN)
+
+        if MedicalConfig.PROFILE_MODE:
+            self.profiler = RunProfiler(MedicalConfig.PROFILE_MODE, MedicalConfig.PROFILE_SAMPLE_INTERVAL)
+            self.profiler.start()
+
+        try:
+            self.program_results = []
+            program_start_time = datetime.now()
+            if resume:
+                program_start_time = self._restore_checkpoint(resume)
+            elif MedicalConfig.SAVE_RECORDS and MedicalConfig.ENABLE_CHECKPOINTS:
+                self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self.checkpoint = CheckpointJournal(self.run_id)
+                self.checkpoint.start({
+                    "run_id": self.run_id,
+                    "total_rounds": total_rounds,
+                    "start_time": program_start_time.isoformat(),
+                    "seed": self.seed,
+                    "auto_mode": self.auto_mode,
+                    "offline": self.offline,
+                    "patient_backend": self.patient_backend,
+                    "knowledge_base": MedicalConfig.KNOWLEDGE_BASE,
+                    "backend_routes": self.backend_routes,
+                    "hedge": MedicalConfig.ENABLE_HEDGING,
+                    "hedge_backend": MedicalConfig.HEDGE_BACKEND,
+                    "speculate": MedicalConfig.ENABLE_SPECULATIVE_QUESTIONS,
+                    "trace": MedicalConfig.ENABLE_TRACING,
+                    "trace_otel": MedicalConfig.TRACE_OPENTELEMETRY
+                })
+
+            for round_num in range(len(self.program_results), total_rounds):
+                result = self.play_round()
+                self.program_results.append(result)
+                if self.checkpoint:
+                    self.checkpoint.append(result, self.doctor, self.speculation_stats)
+
+                if round_num < total_rounds - 1:
+                    if not self.auto_mode:
+                        input(L.t("press_enter_next_patient"))
+                    else:
+                        print("\n" + "="*60)
+                        if not self.offline:
+                            time.sleep(2)
+
+            if self._speculation_pool:
+                # The pool has one worker, so thrown-away questions are done and counted after this
+                self._speculation_pool.submit(lambda: None).result()
+            if self.api_client and self.api_client.hedger:
+                self.api_client.hedger.drain()  # Count the tokens of hedge races' losers
+
+            # Save complete record
+            if MedicalConfig.SAVE_RECORDS:
+                self.run_id = self._save_complete_program_record(program_start_time, total_rounds)
+                if self.checkpoint:
+                    self.checkpoint.remove()
+        finally:
+            # Stop profiling and write its output next to the record, also when the run failed or was interrupted
+            if self.profiler:
+                self.profiler.stop()
+                profile_id = self.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+                profile_base = os.path.join(MedicalConfig.RECORDS_DIRC, f"profile_{profile_id}")
+                for profile_file in self.profiler.save(profile_base):
+                    self.print_info(L.t("profile_saved", profile_file=profile_file), Fore.GREEN)
+
+        # Export this run's spans next to the record
+        if tracer.enabled:
+            trace_id = self.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+            trace_file = tracer.export_chrome(os.path.join(MedicalConfig.RECORDS_DIRC, f"trace_{trace_id}.json"))
+            self.print_info(L.t("trace_saved_open_ui", trace_file=trace_file), Fore.GREEN)
+
+        # Final report
+        self._show_final_report()
+
+    def _restore_checkpoint(self, checkpoint: CheckpointJournal) -> datetime:
+        """Continue a checkpointed run: finished rounds, random state and doctor learning"""
+        self.run_id = checkpoint.run_id
+        self.checkpoint = checkpoint
+        self.program_results = [entry["result"] for entry in checkpoint.entries]
+        self.total_rounds = len(self.program_results)
+        rng_state = checkpoint.rng_state()
+        if rng_state:
+            random.setstate(rng_state)
+        if checkpoint.entries:
+            last = checkpoint.entries[-1]
+            self.doctor.import_learning_data({"learning_history": self.program_results,
+                                              "successful_strategies": last["successful_strategies"]})
+            self.speculation_stats = dict(last["speculation_stats"])
+        self.print_info(L.t("resuming_run", run_id=self.run_id, completed=self.total_rounds,
+                            total_rounds=checkpoint.settings["total_rounds"]), Fore.CYAN)
+        return datetime.fromisoformat(checkpoint.settings["start_time"])
+
+    def _save_complete_program_record(self, start_time: datetime, total_rounds: int) -> str:
+        """Save complete program record"""
+        program_data = {
+            "program_info": {
+                "total_rounds": total_rounds,
+                "seed": self.seed,
+                "start_time": start_time.isoformat(),
+                "end_time": datetime.now().isoformat(),
+                "total_duration_seconds": (datetime.now() - start_time).total_seconds()
+            },
+            "program_results": self.program_results,
+            "doctor_final_learning": self.doctor.export_learning_data(),
+            "performance_summary": self._calculate_performance_summary(),
+            "api_usage": self.api_client.get_cache_report() if self.api_client else {},
+            "hedging": self.api_client.hedger.get_report() if self.api_client and self.api_client.hedger else {},
+            "coalescing": self.api_client.single_flight.get_report() if self.api_client and self.api_client.single_flight else {},
+            "speculation": self.speculation_stats
+        }
+        
+        run_id = self.record_manager.save_program_record(program_data, self.run_id)
+        self.print_info(L.t("complete_record_saved_id", run_id=run_id), Fore.GREEN)
+        return run_id
+
+    def _calculate_performance_summary(self) -> Dict:
+        """Calculate performance summary"""
+        total_success = sum(1 for r in self.program_results if r["success"])
+        success_rate = total_success / len(self.program_results)
+        
+        avg_questions = sum(r["questions_asked"] for r in self.program_results) / len(self.program_results)
+        avg_tests = sum(r["tests_ordered"] for r in self.program_results) / len(self.program_results)
+        avg_cost = sum(r["total_cost"] for r in self.program_results) / len(self.program_results)
+        avg_cost_ratio = sum(r["cost_ratio"] for r in self.program_results) / len(self.program_results)
+
+        return {
+            "success_rate": success_rate,
+            "avg_questions": avg_questions,
+            "avg_tests": avg_tests,
+            "avg_cost": avg_cost,
+            "avg_cost_ratio": avg_cost_ratio,
+            "total_rounds": len(self.program_results)
+        }
+
+    def _show_final_report(self):
+        """Show final report"""
+        self.print_section(L.t("final_report"), Fore.MAGENTA)
+        
+        performance = self._calculate_performance_summary()
+        
+        self.print_info(L.t("total_rounds", total_rounds=performance["total_rounds"]), Fore.CYAN)
+        self.print_info(L.t("success_rate", success_rate=performance["success_rate"]), 
+                       Fore.GREEN if performance['success_rate'] > 0.5 else Fore.RED)
+        self.print_info(L.t("average_questions", avg_questions=performance["avg_questions"]), Fore.CYAN)
+        self.print_info(L.t("average_tests", avg_tests=performance["avg_tests"]), Fore.CYAN)
+        self.print_info(L.t("average_cost_yuan", avg_cost=performance["avg_cost"]), Fore.CYAN)
+        self.print_info(L.t("average_cost_ratio", avg_cost_ratio=performance["avg_cost_ratio"]), 
+                       Fore.GREEN if performance['avg_cost_ratio'] <= 1.5 else Fore.YELLOW if performance['avg_cost_ratio'] <= 2.0 else Fore.RED)
+
+        # Display doctor learning summary
+        learning_summary = self.doctor.get_learning_summary()
+        self.print_info(L.t("doctor_learning_summary", learning_summary=learning_summary), Fore.CYAN)
+
+        # Display prompt cache hit rate per call site
+        cache_report = self.api_client.get_cache_report() if self.api_client else {}
+        if cache_report:
+            self.print_info(L.t("prompt_cache_hits_call"), Fore.CYAN)
+            for site, stats in sorted(cache_report.items()):
+                self.print_info(L.t("calls_prompt_tokens_cached", site=site, backend=stats["backend"],
+                                    calls=stats["calls"], cache_hit_tokens=stats["cache_hit_tokens"],
+                                    prompt_tokens=stats["prompt_tokens"],
+                                    cache_hit_rate=stats["cache_hit_rate"]), Fore.CYAN)
+
+        # Display how often hedged requests won and what they cost
+        hedge_report = self.api_client.hedger.get_report() if self.api_client and self.api_client.hedger else {}
+        if any(stats["hedged"] for stats in hedge_report.values()):
+            self.print_info(L.t("hedged_requests_call_site"), Fore.CYAN)
+            for site, stats in sorted(hedge_report.items()):
+                self.print_info(L.t("calls_hedged_hedge_won", site=site, hedged=stats["hedged"],
+                                    calls=stats["calls"], hedge_wins=stats["hedge_wins"],
+                                    hedge_win_rate=stats["hedge_win_rate"],
+                                    budget_skips=stats["budget_skips"], cancelled=stats["cancelled"],
+                                    wasted_tokens=stats["wasted_tokens"]), Fore.CYAN)
+
+        # Display requests served by another caller's identical in-flight request
+        coalesce_report = self.api_client.single_flight.get_report() \
+            if self.api_client and self.api_client.single_flight else {}
+        if any(stats["coalesced"] for stats in coalesce_report.values()):
+            self.print_info(L.t("coalesced_requests_call_site"), Fore.CYAN)
+            for site, stats in sorted(coalesce_report.items()):
+                self.print_info(L.t("calls_shared_flight_request", site=site, coalesced=stats["coalesced"],
+                                    calls=stats["calls"]),
+                               Fore.CYAN)
+
+        # Display speculative question accounting
+        spec = self.speculation_stats
+        if spec["started"]:
+            self.print_info(L.t("speculative_questions_used_discarded", used=spec["used"],
+                                started=spec["started"], discarded=spec["discarded"],
+                                wasted_tokens=spec["wasted_tokens"], saved_seconds=spec["saved_seconds"]), Fore.CYAN)
+        
+        # Display the functions that took the most time
+        if self.profiler:
+            self.print_info(L.t("top_functions_cumulative_time", mode=self.profiler.mode), Fore.CYAN)
+            for entry in self.profiler.top_functions(MedicalConfig.PROFILE_TOP_FUNCTIONS):
+                if "calls" in entry:
+                    detail = L.t("profile_self_time", calls=entry["calls"], self_seconds=entry["self"])
+                else:
+                    detail = L.t("profile_samples", samples=entry["samples"])
+                self.print_info(L.t("profile_function_line", cumulative=entry["cumulative"],
+                                    function=entry["function"], detail=detail), Fore.CYAN)
+
+        # Display where the traced time went
+        if tracer.enabled:
+            spans = sorted(tracer.summary().items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            self.print_info(L.t("time_span_top"), Fore.CYAN)
+            for name, stats in spans[:8]:
+                self.print_info(L.t("span_time_line", name=name, count=stats["count"],
+                                    total_ms=stats["total_ms"] / 1000), Fore.CYAN)
+
+        # Display record saving information
+        if self.run_id:
+            self.print_info(L.t("records_saved", records_dirc=MedicalConfig.RECORDS_DIRC), Fore.GREEN)
+            self.print_info(L.t("round_logs_saved", round_logs_dir=MedicalConfig.ROUND_LOGS_DIR), Fore.GREEN)
+            self.print_info(L.t("doctor_memory_saved", doctor_memory_dir=MedicalConfig.DOCTOR_MEMORY_DIR), Fore.GREEN)
+
+
+# ==================== Consultation Service ====================
+
+class ServiceError(Exception):
+    """Error answered to an API client with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ConsultationSession:
+    """Consultation Session - One patient's consultation, driven turn by turn over the HTTP API
+
+    Steps run on the service's worker threads, one at a time per session (the service holds
+    the session's lock), through the same round helpers as the CLI loop.
+    """
+
+    def __init__(self, session_id: str, program: MedicalDiagnosisprogram, round_number: int):
+        self.id = session_id
+        self.program = program
+        self.case_info, self.patient, self.state, self.streams = program._start_round(round_number)
+        self.started = time.time()
+        self.last_active = self.started
+        self.result = None  # Round result once diagnosed
+        self.lock = None  # asyncio.Lock, set by the service
+
+    @property
+    def status(self) -> str:
+        """open, over (only a diagnosis is accepted) or finished"""
+        if self.result is not None:
+            return "finished"
+        return "over" if self.state.is_round_over() else "open"
+
+    def _require_open(self):
+        if self.result is not None:
+            raise ServiceError(409, L.t("service_consultation_finished", session_id=self.id))
+        if self.state.is_round_over():
+            raise ServiceError(409, L.t("service_round_over", reason=self.program._get_round_end_reason(self.state)))
+
+    def doctor_turn(self, question: str = "") -> Dict:
+        """The doctor asks (the given question, or the AI doctor's next one) and the patient answers"""
+        self._require_open()
+        self.program._handle_questioning(self.state, self.patient, self.state.dialogue_history, question or None)
+        return {"question": self.state.dialogue_history[-2]["content"],
+                "answer": self.state.dialogue_history[-1]["content"]}
+
+    def patient_turn(self, statement: str) -> Dict:
+        """The client speaks as the patient and the AI doctor asks its next question"""
+        self._require_open()
+        dialogue = self.state.dialogue_history
+        # The statement answers the doctor's pending question, if the last turn is one
+        pending = dialogue[-1]["content"] if dialogue and dialogue[-1]["role"] == "doctor" else None
+        dialogue.append({"role": "patient", "content": statement})
+        self.state.add_symptoms(self.program.extract_symptoms_from_complaint(statement))
+        if pending is not None:
+            self.state.record_action(L.t("action_type_question"), {"question": pending, "response": statement})
+        question = self.program.doctor.generate_question(dialogue)
+        self.state.add_question()
+        dialogue.append({"role": "doctor", "content": question})
+        return {"question": question}
+
+    def order_test(self, test: str = "") -> Dict:
+        """Perform the given test, or the one the AI doctor selects"""
+        self._require_open()
+        if test and test not in MedicalConfig.TEST_COSTS:
+            raise ServiceError(400, L.t("service_unknown_test", test=test))
+        self.program._handle_test_ordering(self.state, self.patient, self.state.dialogue_history,
+                                           self.state.test_results, self.streams.tests, test or None)
+        details = self.state.actions_history[-1]["details"]
+        return {key: details[key] for key in ("test_type", "result", "cost")}
+
+    def diagnose(self, diagnosis: str = "") -> Dict:
+        """Finish with the given diagnosis, or the AI doctor's, and evaluate the round"""
+        if self.result is not None:
+            raise ServiceError(409, L.t("service_consultation_finished", session_id=self.id))
+        self.result = self.program._finish_round(self.state, self.patient, self.case_info,
+                                                 time.time() - self.started, diagnosis or None)
+        return {"result": self.result}
+
+    def snapshot(self) -> Dict:
+        """Public state; the true disease is only revealed once the consultation is finished"""
+        state = self.state
+        return {
+            "id": self.id,
+            "round": state.current_round,
+            "status": self.status,
+            "personality": self.case_info["personality"],
+            "ideal_cost": self.case_info["ideal_cost"],
+            "questions_asked": state.questions_asked,
+            "tests_ordered": state.tests_ordered,
+            "total_cost": state.total_cost,
+            "remaining_budget": state.remaining_budget,
+            "patient_suspicion": round(state.patient_suspicion, 2),
+            "symptoms": list(state.patient_symptoms),
+            "dialogue": list(state.dialogue_history),
+            "test_results": list(state.test_results),
+            "differential": [{"disease": disease, "probability": round(probability, 4)}
+                             for disease, probability in state.posterior.top(MedicalConfig.DIFFERENTIAL_SIZE)]
+                            if state.tests_ordered else [],
+            "result": self.result
+        }
+
+
+class ConsultationService:
+    """Consultation Service - Consultations as a local asyncio HTTP/JSON API
+
+    One event loop accepts connections and parses requests; consultation steps (LLM calls, test
+    execution, record writes) run on a thread pool, so many sessions proceed at once while
+    sharing one warm LLM client (connections, request coalescing, usage stats), the loaded
+    knowledge base and the doctor memory cache.
+
+        POST   /consultations                  start a consultation (random case)
+        GET    /consultations                  list consultations
+        GET    /consultations/<id>             state of a consultation
+        POST   /consultations/<id>/turns       {"role": "doctor", "content": question or ""} or
+                                               {"role": "patient", "content": statement}
+        POST   /consultations/<id>/tests       {"test": name or ""}
+        POST   /consultations/<id>/diagnosis   {"diagnosis": disease or ""}
+        DELETE /consultations/<id>             drop a consultation
+        GET    /tests                          test catalog
+        GET    /health                         service status
+    """
+
+    def __init__(self, patient_backend: str = "llm", offline: bool = False,
+                 backend_routes: Optional[Dict[str, str]] = None, seed: Optional[int] = None):
+        self.offline = offline
+        self.patient_backend = "offline" if offline else patient_backend
+        self.seed = seed
+        if not offline:
+            MedicalConfig.load_environment()
+        self.api_client = None if offline else DeepSeekClient(BackendRegistry.from_config(backend_routes),
+                                                              MedicalConfig.SERVICE_WORKERS)
+        self.executor = ThreadPoolExecutor(MedicalConfig.SERVICE_WORKERS, thread_name_prefix="consultation")
+        self.sessions = {}  # id -> ConsultationSession
+        self.rounds_started = 0
+        self.rounds_finished = 0
+        self.started = time.time()
+
+    def _new_session(self, session_id: str, round_number: int) -> ConsultationSession:
+        """Program sharing the warm client, and the consultation started on it (worker thread)"""
+        program = MedicalDiagnosisprogram(auto_mode=True, patient_backend=self.patient_backend,
+                                          offline=self.offline, seed=self.seed, api_client=self.api_client,
+                                          console=False)
+        program.run_id = f"consultation/{session_id}"  # Attributes the doctor's memory entries
+        return ConsultationSession(session_id, program, round_number)
+
+    def _expire_sessions(self):
+        """Drop consultations idle for longer than SERVICE_SESSION_TTL"""
+        deadline = time.time() - MedicalConfig.SERVICE_SESSION_TTL
+        for session_id, session in list(self.sessions.items()):
+            if session.last_active < deadline and not session.lock.locked():
+                del self.sessions[session_id]
+
+    async def _create(self) -> Dict:
+        import asyncio
+        import secrets
+
+        self._expire_sessions()
+        if len(self.sessions) >= MedicalConfig.SERVICE_MAX_SESSIONS:
+            raise ServiceError(503, L.t("service_too_many_sessions", max_sessions=MedicalConfig.SERVICE_MAX_SESSIONS))
+        self.rounds_started += 1
+        session = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._new_session, secrets.token_hex(8), self.rounds_started)
+        session.lock = asyncio.Lock()
+        self.sessions[session.id] = session
+        return session.snapshot()
+
+    async def _step(self, session: ConsultationSession, step, *args) -> Dict:
+        """Run one step of a session on a worker thread, after the session's previous step"""
+        import asyncio
+
+        async with session.lock:
+            session.last_active = time.time()
+            finished = session.result is not None
+            reply = await asyncio.get_running_loop().run_in_executor(self.executor, partial(step, *args))
+            if not finished and session.result is not None:
+                self.rounds_finished += 1
+            return dict(reply, consultation=session.snapshot())
+
+    @staticmethod
+    def _text(payload: Dict, key: str, required: bool = False) -> str:
+        value = payload.get(key, "")
+        if not isinstance(value, str) or (required and not value.strip()):
+            raise ServiceError(400, L.t("service_expected_text", key=key))
+        return value.strip()
+
+    def health(self) -> Dict:
+        statuses = Counter(session.status for session in self.sessions.values())
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "offline": self.offline,
+            "seed": self.seed,
+            "workers": MedicalConfig.SERVICE_WORKERS,
+            "consultations": dict(statuses, total=len(self.sessions)),
+            "rounds_started": self.rounds_started,
+            "rounds_finished": self.rounds_finished,
+            "api_usage": self.api_client.get_cache_report() if self.api_client else {}
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        """Route one request to its handler; returns (status, JSON payload)"""
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        try:
+            try:
+                payload = json.loads(body) if body.strip() else {}
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                raise ServiceError(400, L.t("service_bad_json"))
+
+            if parts == ["health"] and method == "GET":
+                return 200, self.health()
+            if parts == ["tests"] and method == "GET":
+                return 200, {"tests": [{"name": test, "cost": cost, "accuracy": MedicalConfig.TEST_ACCURACY[test]}
+                                       for test, cost in MedicalConfig.TEST_COSTS.items()]}
+            if parts == ["consultations"] and method == "POST":
+                return 201, await self._create()
+            if parts == ["consultations"] and method == "GET":
+                return 200, {"consultations": [{"id": session.id, "round": session.state.current_round,
+                                                "status": session.status}
+                                               for session in self.sessions.values()]}
+            if len(parts) in (2, 3) and parts[0] == "consultations":
+                session = self.sessions.get(parts[1])
+                if session is None:
+                    raise ServiceError(404, L.t("service_unknown_consultation", session_id=parts[1]))
+                action = (method, parts[2] if len(parts) == 3 else "")
+                if action == ("GET", ""):
+                    async with session.lock:
+                        return 200, session.snapshot()
+                if action == ("DELETE", ""):
+                    del self.sessions[session.id]
+                    return 200, {"deleted": session.id}
+                if action == ("POST", "turns"):
+                    role = payload.get("role")
+                    if role == "doctor":
+                        return 200, await self._step(session, session.doctor_turn, self._text(payload, "content"))
+                    if role == "patient":
+                        return 200, await self._step(session, session.patient_turn,
+                                                     self._text(payload, "content", required=True))
+                    raise ServiceError(400, L.t("service_bad_role"))
+                if action == ("POST", "tests"):
+                    return 200, await self._step(session, session.order_test, self._text(payload, "test"))
+                if action == ("POST", "diagnosis"):
+                    return 200, await self._step(session, session.diagnose, self._text(payload, "diagnosis"))
+            raise ServiceError(404, L.t("service_no_route", method=method, path=path))
+        except ServiceError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": L.t("service_internal_error", e=e)}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive) until the client closes it"""
+        import asyncio
+        from http import HTTPStatus
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    method, path, length = "", "", -1
+                if length < 0 or length > MedicalConfig.SERVICE_MAX_BODY:
+                    status, payload = (400 if length < 0 else 413), {"error": L.t("service_bad_request")}
+                    headers["connection"] = "close"
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method.upper(), path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write((f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away mid-request
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        """Start listening; returns the asyncio server (port 0 picks a free port)"""
+        import asyncio
+
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def run(self, host: str, port: int):
+        """Validate the configuration and serve until interrupted"""
+        import asyncio
+
+        MedicalConfig.validate(require_api_key=not self.offline and self.api_client.registry.uses("deepseek"))
+        if MedicalConfig.ENABLE_METRICS:
+            server = start_metrics_server(MedicalConfig.METRICS_HOST, MedicalConfig.METRICS_PORT)
+            print(L.t("metrics_http_metrics", metrics_host=MedicalConfig.METRICS_HOST, server_port=server.server_port))
+
+        async def main():
+            server = await self.serve(host, port)
+            bound_port = server.sockets[0].getsockname()[1]
+            print(L.t("service_listening", host=host, port=bound_port, workers=MedicalConfig.SERVICE_WORKERS))
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(main())
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ==================== Batch Evaluation ====================
+
+class BatchQueue:
+    """Batch Queue - Persistent job queue of batch evaluations in a local SQLite file
+
+    Jobs are keyed by (batch, index), so expanding the same scenario matrix again adds nothing
+    and a restarted batch only runs the jobs that are not done. Jobs left running by a crashed
+    or interrupted run, and jobs that ran out of attempts, go back to pending when the batch
+    is opened again. One connection is shared by the worker threads behind a lock; queue
+    operations are tiny next to a consultation.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS batches (
+            id TEXT PRIMARY KEY,
+            settings TEXT NOT NULL,
+            created TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            batch_id TEXT NOT NULL,
+            job_index INTEGER NOT NULL,
+            disease TEXT NOT NULL,
+            personality TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',  -- pending, running, done or failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            started REAL,
+            finished REAL,
+            result TEXT,
+            error TEXT,
+            PRIMARY KEY (batch_id, job_index)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (batch_id, status, attempts, job_index);
+    """
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.lock = threading.Lock()
+
+    def open_batch(self, batch_id: str, settings: Dict, scenarios: List[Tuple[str, str]]):
+        """Create the batch and its jobs if new, and make unfinished jobs runnable again"""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT settings FROM batches WHERE id = ?", (batch_id,)).fetchone()
+            if row and json.loads(row[0]) != settings:
+                raise ValueError(L.t("batch_settings_differ", batch_id=batch_id))
+            self.conn.execute("INSERT OR IGNORE INTO batches (id, settings, created) VALUES (?, ?, ?)",
+                              (batch_id, json.dumps(settings, ensure_ascii=False), datetime.now().isoformat()))
+            self._insert_jobs(batch_id, 0, scenarios)
+            self.conn.execute("UPDATE jobs SET status = 'pending', attempts = 0 "
+                              "WHERE batch_id = ? AND status IN ('running', 'failed')", (batch_id,))
+
+    def add_jobs(self, batch_id: str, first_index: int, scenarios: List[Tuple[str, str]]):
+        """Append jobs to a batch from first_index on (existing indexes are kept)"""
+        with self.lock, self.conn:
+            self._insert_jobs(batch_id, first_index, scenarios)
+
+    def _insert_jobs(self, batch_id: str, first_index: int, scenarios: List[Tuple[str, str]]):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO jobs (batch_id, job_index, disease, personality) VALUES (?, ?, ?, ?)",
+            [(batch_id, index, disease, personality)
+             for index, (disease, personality) in enumerate(scenarios, first_index)])
+
+    def claim(self, batch_id: str, worker: str) -> Optional[Tuple[int, str, str]]:
+        """Take the next pending job: (index, disease, personality), or None when none is left
+
+        Fewest attempts first, so a failed job is retried after the fresh ones rather than at once.
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT job_index, disease, personality FROM jobs WHERE batch_id = ? "
+                                    "AND status = 'pending' ORDER BY attempts, job_index LIMIT 1",
+                                    (batch_id,)).fetchone()
+            if row:
+                self.conn.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                                  "started = ? WHERE batch_id = ? AND job_index = ?",
+                                  (worker, time.time(), batch_id, row[0]))
+            return row
+
+    def complete(self, batch_id: str, job_index: int, result: Dict):
+        """Store a finished job's round result"""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE jobs SET status = 'done', finished = ?, result = ?, error = NULL "
+                              "WHERE batch_id = ? AND job_index = ?",
+                              (time.time(), json.dumps(result, ensure_ascii=False), batch_id, job_index))
+
+    def fail(self, batch_id: str, job_index: int, error: str, max_attempts: int) -> bool:
+        """Record a failed attempt; the job is retried until it used max_attempts (returns True if final)"""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                              "finished = ?, error = ? WHERE batch_id = ? AND job_index = ?",
+                              (max_attempts, time.time(), error, batch_id, job_index))
+            row = self.conn.execute("SELECT status FROM jobs WHERE batch_id = ? AND job_index = ?",
+                                    (batch_id, job_index)).fetchone()
+            return row[0] == "failed"
+
+    def counts(self, batch_id: str) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY status",
+                                     (batch_id,)).fetchall()
+        return dict(rows)
+
+    def results(self, batch_id: str) -> List[Dict]:
+        """Round results of the finished jobs, in job order"""
+        with self.lock:
+            rows = self.conn.execute("SELECT result FROM jobs WHERE batch_id = ? AND status = 'done' "
+                                     "ORDER BY job_index", (batch_id,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+class ScenarioScheduler:
+    """Scenario Scheduler - Spends an adaptive batch's consultations where the success rate is least certain
+
+    Each disease × personality cell keeps a Wilson interval of its success rate. Waves of
+    consultations go to the cells with the widest interval, counting the consultations already
+    planned in the wave at the cell's current rate, until every cell is within the target
+    half-width or the round cap is spent. Cells whose outcome is nearly always the same settle
+    after a few rounds, so the budget goes to the uncertain ones instead of a uniform matrix.
+    """
+
+    def __init__(self, cells: List[Tuple[str, str]], target_width: float, max_rounds: int,
+                 z: Optional[float] = None):
+        self.cells = cells
+        self.target_width = target_width
+        self.max_rounds = max_rounds
+        self.z = z or MedicalConfig.SCHEDULER_CONFIDENCE_Z
+
+    def interval(self, successes: float, rounds: int) -> Tuple[float, float]:
+        """Wilson score interval of a success rate"""
+        if rounds == 0:
+            return 0.0, 1.0
+        z2 = self.z * self.z
+        rate = successes / rounds
+        center = (rate + z2 / (2 * rounds)) / (1 + z2 / rounds)
+        half = self.z / (1 + z2 / rounds) * (rate * (1 - rate) / rounds + z2 / (4 * rounds * rounds)) ** 0.5
+        return max(0.0, center - half), min(1.0, center + half)
+
+    def half_width(self, successes: float, rounds: int) -> float:
+        low, high = self.interval(successes, rounds)
+        return (high - low) / 2
+
+    def tally(self, results: List[Dict]) -> Dict[Tuple[str, str], List[int]]:
+        """(successes, rounds) per cell"""
+        counts = {cell: [0, 0] for cell in self.cells}
+        for result in results:
+            cell = counts.get((result["true_disease"], result["personality"]))
+            if cell is not None:
+                cell[0] += bool(result["success"])
+                cell[1] += 1
+        return counts
+
+    def next_wave(self, results: List[Dict], size: int, rounds_so_far: int) -> List[Tuple[str, str]]:
+        """Cells of the next wave of consultations; empty once the batch is precise enough or out of rounds"""
+        counts = self.tally(results)
+        # An unplayed cell counts as a coin flip until it has results
+        rates = {cell: successes / rounds if rounds else 0.5 for cell, (successes, rounds) in counts.items()}
+        planned = {cell: rounds for cell, (_, rounds) in counts.items()}
+        wave = []
+        for _ in range(min(size, self.max_rounds - rounds_so_far)):
+            widths = {cell: self.half_width(rates[cell] * planned[cell], planned[cell]) for cell in self.cells}
+            cell = max(self.cells, key=widths.get)  # First cell in matrix order on ties
+            if widths[cell] <= self.target_width:
+                break
+            wave.append(cell)
+            planned[cell] += 1
+        return wave
+
+    def summary(self, results: List[Dict]) -> Dict:
+        """Rounds and interval per cell, the widest cell and the uniform matrix with the same worst-cell precision"""
+        cells = {}
+        for (disease, personality), (successes, rounds) in self.tally(results).items():
+            low, high = self.interval(successes, rounds)
+            cells[f"{disease} × {personality}"] = {"rounds": rounds, "successes": successes,
+                                                  "ci_low": low, "ci_high": high, "half_width": (high - low) / 2}
+        widest = max(cells, key=lambda name: cells[name]["half_width"])
+        return {
+            "target_half_width": self.target_width,
+            "z": self.z,
+            "rounds": len(results),
+            "cells_above_target": sum(cell["half_width"] > self.target_width for cell in cells.values()),
+            "widest_cell": widest,
+            "widest_half_width": cells[widest]["half_width"],
+            "uniform_equivalent_rounds": len(cells) * max(cell["rounds"] for cell in cells.values()),
+            "cells": cells
+        }
+
+
+class BatchRunner:
+    """Batch Runner - Evaluates a disease × personality matrix through the job queue with a worker pool
+
+    Each worker thread plays jobs on its own program; the programs share one warm LLM client.
+    A job's round number is its index in the matrix, so with a seed every job plays out the same
+    whichever worker runs it and however often the batch was restarted. With a target interval
+    width the matrix is only the first pass: a ScenarioScheduler then adds waves of jobs for the
+    least certain cells. A wave is planned from finished waves only, so a restarted batch or one
+    with a different number of workers plans the same waves.
+    """
+
+    QUEUE_FILE = "batch_queue.sqlite3"
+
+    def __init__(self, diseases: List[str], personalities: List[str], repeats: int, workers: int,
+                 patient_backend: str = "llm", offline: bool = False,
+                 backend_routes: Optional[Dict[str, str]] = None, seed: Optional[int] = None,
+                 name: Optional[str] = None, target_width: Optional[float] = None,
+                 max_rounds: Optional[int] = None):
+        self.offline = offline
+        self.patient_backend = "offline" if offline else patient_backend
+        self.seed = seed
+        self.workers = workers
+        self.scenarios = [(disease, personality) for disease in diseases for personality in personalities
+                          for _ in range(repeats)]
+        self.settings = {
+            "diseases": diseases,
+            "personalities": personalities,
+            "repeats": repeats,
+            "seed": seed,
+            "offline": offline,
+            "patient_backend": self.patient_backend,
+            "knowledge_base": MedicalConfig.KNOWLEDGE_BASE
+        }
+        self.scheduler = None
+        if target_width is not None:
+            max_rounds = max_rounds or MedicalConfig.SCHEDULER_MAX_ROUNDS
+            self.scheduler = ScenarioScheduler([(d, p) for d in diseases for p in personalities],
+                                               target_width, max_rounds)
+            self.settings.update(target_half_width=target_width, max_rounds=max_rounds)
+        # The same matrix and settings always map to the same batch, so rerunning the command resumes it
+        digest = hashlib.sha1(json.dumps(self.settings, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        self.batch_id = name or f"batch_{digest.hexdigest()[:10]}"
+        if not offline:
+            MedicalConfig.load_environment()
+        self.api_client = None if offline else DeepSeekClient(BackendRegistry.from_config(backend_routes), workers)
+        self.lock = threading.Lock()  # Guards the progress counters
+        self.finished_now = 0
+        self.failed_now = 0
+        self.total = len(self.scenarios)
+
+    def _worker(self, queue: BatchQueue, worker: str, started: float, stop: threading.Event):
+        """Play queued jobs until the queue is empty or the batch is stopped"""
+        program = MedicalDiagnosisprogram(auto_mode=True, patient_backend=self.patient_backend,
+                                          offline=self.offline, seed=self.seed, api_client=self.api_client,
+                                          console=False)
+        program.strict = True  # A job whose LLM calls failed is retried rather than stored
+        while not stop.is_set():
+            job = queue.claim(self.batch_id, worker)
+            if job is None:
+                return
+            job_index, disease, personality = job
+            program.run_id = f"{self.batch_id}/{job_index + 1}"  # Attributes the doctor's memory entries
+            try:
+                result = program.play_round(job_index + 1, {"disease": disease, "personality": personality})
+            except Exception as e:
+                final = queue.fail(self.batch_id, job_index, repr(e), MedicalConfig.BATCH_MAX_ATTEMPTS)
+                print(L.t("batch_job_failed", round_number=job_index + 1, disease=disease, personality=personality,
+                          e=e, final=L.t("batch_giving_up") if final else L.t("batch_will_retry")))
+                with self.lock:
+                    self.failed_now += final
+                continue
+            queue.complete(self.batch_id, job_index, result)
+            with self.lock:
+                self.finished_now += 1
+                if self.finished_now % max(1, self.total // 20) == 0:
+                    done = queue.counts(self.batch_id).get("done", 0)
+                    print(L.t("batch_progress", done=done, total=self.total, failed=self.failed_now,
+                              rate=self.finished_now / (time.time() - started)))
+
+    def run(self) -> Optional[str]:
+        """Expand the matrix into the queue, work it off and save the record; returns its ID once complete"""
+        MedicalConfig.validate(require_api_key=not self.offline and self.api_client.registry.uses("deepseek"))
+        if MedicalConfig.ENABLE_METRICS:
+            server = start_metrics_server(MedicalConfig.METRICS_HOST, MedicalConfig.METRICS_PORT)
+            print(L.t("metrics_http_metrics", metrics_host=MedicalConfig.METRICS_HOST, server_port=server.server_port))
+
+        self.finished_now = self.failed_now = 0
+        queue = BatchQueue(os.path.join(MedicalConfig.RECORDS_DIRC, self.QUEUE_FILE))
+        queue.open_batch(self.batch_id, self.settings, self.scenarios)
+        counts = queue.counts(self.batch_id)
+        self.total = sum(counts.values())  # Includes the waves an adaptive batch already added
+        done = counts.get("done", 0)
+        print(L.t("batch_opened", batch_id=self.batch_id, total=self.total, done=done, pending=self.total - done,
+                  workers=self.workers, queue_file=queue.path))
+
+        started = time.time()
+        while True:
+            if self.total > done + self.finished_now and not self._work_off(queue, started, done):
+                return None
+            counts = queue.counts(self.batch_id)
+            if counts.get("failed") or not self.scheduler:
+                break
+            wave = self.scheduler.next_wave(queue.results(self.batch_id), MedicalConfig.SCHEDULER_WAVE_SIZE,
+                                            self.total)
+            if not wave:
+                break
+            queue.add_jobs(self.batch_id, self.total, wave)
+            self.total += len(wave)
+
+        results = queue.results(self.batch_id)
+        queue.close()
+        if counts.get("failed"):
+            print(L.t("batch_failed_jobs", failed=counts["failed"], attempts=MedicalConfig.BATCH_MAX_ATTEMPTS))
+            return None
+        return self._save_and_report(results, started)
+
+    def _work_off(self, queue: BatchQueue, started: float, done: int) -> bool:
+        """Run the pending jobs on the worker pool; False if the batch was interrupted"""
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._worker, args=(queue, f"worker-{i}", started, stop),
+                                    name=f"batch-worker-{i}", daemon=True)
+                   for i in range(min(self.workers, self.total - done - self.finished_now))]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)  # Short joins keep Ctrl-C responsive
+        except KeyboardInterrupt:
+            # Workers stop after their current job; jobs cut off by the exit are rerun next time
+            # (the queue stays open for them, and WAL keeps an interrupted write atomic)
+            stop.set()
+            print(L.t("batch_paused", done=done + self.finished_now, total=self.total))
+            return False
+        return True
+
+    @staticmethod
+    def _group_summary(results: List[Dict], key) -> Dict[str, Dict]:
+        """Rounds, success rate and average cost ratio per group of results"""
+        groups = {}
+        for result in results:
+            groups.setdefault(key(result), []).append(result)
+        return {
+            name: {
+                "rounds": len(group),
+                "success_rate": sum(r["success"] for r in group) / len(group),
+                "diagnosis_accuracy": sum(r["diagnosis_correct"] for r in group) / len(group),
+                "avg_cost_ratio": sum(r["cost_ratio"] for r in group) / len(group)
+            }
+            for name, group in groups.items()
+        }
+
+    def _save_and_report(self, results: List[Dict], started: float) -> str:
+        """Write the batch record and print success rates by disease and personality"""
+        by_disease = self._group_summary(results, lambda r: r["true_disease"])
+        by_personality = self._group_summary(results, lambda r: r["personality"])
+        by_cell = self._group_summary(results, lambda r: f"{r['true_disease']} × {r['personality']}")
+        success_rate = sum(r["success"] for r in results) / len(results)
+        allocation = self.scheduler.summary(results) if self.scheduler else None
+        if MedicalConfig.SAVE_RECORDS:
+            RecordManager().save_program_record({
+                "program_info": dict(self.settings, batch_id=self.batch_id, total_rounds=len(results),
+                                     end_time=datetime.now().isoformat()),
+                "program_results": results,
+                "performance_summary": {
+                    "success_rate": success_rate,
+                    "by_disease": by_disease,
+                    "by_personality": by_personality,
+                    "by_cell": by_cell,
+                    "allocation": allocation
+                },
+                "api_usage": self.api_client.get_cache_report() if self.api_client else {}
+            }, self.batch_id)
+            print(L.t("complete_record_saved_id", run_id=self.batch_id))
+
+        print(L.t("batch_complete", batch_id=self.batch_id, total=len(results), success_rate=success_rate,
+                  seconds=time.time() - started))
+        for title, summary in ((L.t("batch_by_disease"), by_disease), (L.t("batch_by_personality"), by_personality)):
+            print(title)
+            for name, stats in sorted(summary.items(), key=lambda item: item[1]["success_rate"]):
+                print(L.t("batch_group_line", name=name, **stats))
+        if allocation:
+            print(L.t("batch_allocation", rounds=allocation["rounds"], cells=len(allocation["cells"]),
+                      widest_cell=allocation["widest_cell"], widest=allocation["widest_half_width"],
+                      target=allocation["target_half_width"], above=allocation["cells_above_target"],
+                      uniform=allocation["uniform_equivalent_rounds"]))
+        return self.batch_id
+
+
+# ==================== Main Program ====================
+
+def print_banner():
+    """Print welcome banner"""
+    banner = L.t("banner", cyan=Fore.CYAN, reset_all=Style.RESET_ALL)
+    print(banner)
+
+def print_resume_hint(program: Optional[MedicalDiagnosisprogram]):
+    """Tell how to continue a run that stopped before its complete record was saved"""
+    checkpoint = program.checkpoint if program else None
+    if checkpoint and os.path.exists(checkpoint.path):
+        print(L.t("resume_hint", yellow=Fore.YELLOW, completed=len(program.program_results),
+                  run_id=checkpoint.run_id, reset_all=Style.RESET_ALL))
+
+def apply_checkpoint_settings(args, settings: Dict):
+    """Override the command-line arguments with the settings a checkpointed run was started with"""
+    args.rounds = settings["total_rounds"]
+    args.auto = settings["auto_mode"]
+    args.offline = settings["offline"]
+    args.patient_backend = settings["patient_backend"]
+    args.seed = settings.get("seed")
+    # Checkpoints written before routes and flags were recorded keep the ones given now
+    if "backend_routes" in settings:
+        args.llm_backend = [f"{site}={name}" for site, name in settings["backend_routes"].items()]
+        args.hedge = settings["hedge"]
+        args.hedge_backend = settings["hedge_backend"]
+        args.speculate = settings["speculate"]
+        args.trace = settings["trace"]
+        args.trace_otel = settings["trace_otel"]
+    if settings["knowledge_base"] != MedicalConfig.KNOWLEDGE_BASE:
+        args.knowledge_base = settings["knowledge_base"]
+
+
+def build_parser():
+    """Command-line parser of the edition"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=L.t("cli_description"))
+    parser.add_argument('--auto', action='store_true', help=L.t("auto_mode_no_interaction"))
+    parser.add_argument('--rounds', type=int, default=5, help=L.t("number_rounds"))
+    parser.add_argument('--patient-backend', choices=['llm', 'offline'], default='llm',
+                        help=L.t("patient_backend_llm_deepseek"))
+    parser.add_argument('--offline', action='store_true',
+                        help=L.t("fully_offline_simulation_rule"))
+    parser.add_argument('--llm-backend', action='append', default=[], metavar='SITE=NAME',
+                        help=L.t("route_llm_call_site"))
+    parser.add_argument('--hedge', action='store_true',
+                        help=L.t("hedge_llm_calls_outlive"))
+    parser.add_argument('--hedge-backend', default='',
+                        help=L.t("backend_hedged_duplicates_default"))
+    parser.add_argument('--speculate', action='store_true',
+                        help=L.t("generate_next_question_while"))
+    parser.add_argument('--trace', action='store_true',
+                        help=L.t("record_spans_each_round"))
+    parser.add_argument('--trace-otel', action='store_true',
+                        help=L.t("trace_also_emit_spans"))
+    parser.add_argument('--metrics', action='store_true',
+                        help=L.t("serve_live_prometheus_metrics"))
+    parser.add_argument('--metrics-port', type=int, default=MedicalConfig.METRICS_PORT,
+                        help=L.t("port_metrics_endpoint_picks"))
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=['cprofile', 'sample'],
+                        help=L.t("profile_run_cprofile_default"))
+    parser.add_argument('--knowledge-base', metavar='PATH',
+                        help=L.t("knowledge_base_file_help"))
+    parser.add_argument('--seed', type=int,
+                        help=L.t("seed_help"))
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help=L.t("resume_run_help"))
+    parser.add_argument('--batch', action='store_true',
+                        help=L.t("batch_help"))
+    parser.add_argument('--batch-repeats', type=int, default=1, metavar='N',
+                        help=L.t("batch_repeats_help"))
+    parser.add_argument('--batch-diseases', default='', metavar='NAMES',
+                        help=L.t("batch_diseases_help"))
+    parser.add_argument('--batch-personalities', default='', metavar='NAMES',
+                        help=L.t("batch_personalities_help"))
+    parser.add_argument('--batch-name', default='',
+                        help=L.t("batch_name_help"))
+    parser.add_argument('--batch-target-ci', type=float, metavar='HALF_WIDTH',
+                        help=L.t("batch_target_ci_help"))
+    parser.add_argument('--batch-max-rounds', type=int, default=MedicalConfig.SCHEDULER_MAX_ROUNDS, metavar='N',
+                        help=L.t("batch_max_rounds_help"))
+    parser.add_argument('--workers', type=int, default=MedicalConfig.BATCH_WORKERS,
+                        help=L.t("workers_help"))
+    parser.add_argument('--serve', action='store_true',
+                        help=L.t("serve_help"))
+    parser.add_argument('--serve-port', type=int, default=MedicalConfig.SERVICE_PORT,
+                        help=L.t("serve_port_help"))
+    return parser
+
+
+def main():
+    """Main function"""
+    parser = build_parser()
+    args = parser.parse_args()
+
+    # A resumed run keeps the settings it was started with
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = CheckpointJournal(args.resume).load()
+        except (OSError, ValueError, IndexError):
+            parser.error(L.t("no_checkpoint_for_run", run_id=args.resume, records_dirc=MedicalConfig.RECORDS_DIRC))
+        apply_checkpoint_settings(args, checkpoint.settings)
+
+    if args.knowledge_base:
+        try:
+            kb = MedicalConfig.use_knowledge_base(args.knowledge_base)
+        except ValueError as e:
+            parser.error(str(e))
+        print(L.t("knowledge_base_loaded", path=args.knowledge_base, tests=len(kb.tests),
+                  diseases=len(kb.diseases)))
+
+    if args.profile:
+        MedicalConfig.PROFILE_MODE = args.profile
+
+    if args.metrics:
+        MedicalConfig.ENABLE_METRICS = True
+        MedicalConfig.METRICS_PORT = args.metrics_port
+
+    if args.trace or args.trace_otel:
+        MedicalConfig.ENABLE_TRACING = True
+        MedicalConfig.TRACE_OPENTELEMETRY = args.trace_otel
+
+    if args.speculate:
+        MedicalConfig.ENABLE_SPECULATIVE_QUESTIONS = True
+
+    if args.hedge:
+        MedicalConfig.ENABLE_HEDGING = True
+        MedicalConfig.HEDGE_BACKEND = args.hedge_backend
+
+    backend_routes = {}
+    for item in args.llm_backend:
+        site, _, name = item.partition("=")
+        if not name:
+            parser.error(L.t("llm_backend_expects_site", item=item))
+        backend_routes[site] = name
+
+    init_console()
+    if args.batch:
+        matrix = {}
+        for option, value, known in (("--batch-diseases", args.batch_diseases, MedicalConfig.DISEASE_LIBRARY),
+                                     ("--batch-personalities", args.batch_personalities,
+                                      list(MedicalConfig.PERSONALITY_TYPES))):
+            names = [name.strip() for name in value.split(",") if name.strip()] or list(known)
+            unknown = [name for name in names if name not in known]
+            if unknown:
+                parser.error(L.t("batch_unknown_names", option=option, names=L.join(unknown)))
+            matrix[option] = names
+        if args.batch_repeats < 1 or args.workers < 1 or args.batch_max_rounds < 1:
+            parser.error(L.t("batch_counts_positive"))
+        if args.batch_target_ci is not None and not 0 < args.batch_target_ci < 0.5:
+            parser.error(L.t("batch_target_ci_range"))
+        print_banner()
+        runner = BatchRunner(matrix["--batch-diseases"], matrix["--batch-personalities"], args.batch_repeats,
+                             args.workers, patient_backend=args.patient_backend, offline=args.offline,
+                             backend_routes=backend_routes, seed=args.seed, name=args.batch_name or None,
+                             target_width=args.batch_target_ci, max_rounds=args.batch_max_rounds)
+        try:
+            runner.run()
+        except ValueError as e:
+            print(L.t("program_error", red=Fore.RED, e=e, reset_all=Style.RESET_ALL))
+        return
+
+    if args.serve:
+        print_banner()
+        service = ConsultationService(patient_backend=args.patient_backend, offline=args.offline,
+                                      backend_routes=backend_routes, seed=args.seed)
+        try:
+            service.run(MedicalConfig.SERVICE_HOST, args.serve_port)
+        except KeyboardInterrupt:
+            print(L.t("service_stopped", yellow=Fore.YELLOW, reset_all=Style.RESET_ALL))
+        return
+
+    program = None
+    try:
+        print_banner()
+        program = MedicalDiagnosisprogram(auto_mode=args.auto, patient_backend=args.patient_backend,
+                                          offline=args.offline, backend_routes=backend_routes, seed=args.seed)
+        program.run_program(total_rounds=args.rounds, resume=checkpoint)
+        
+    except KeyboardInterrupt:
+        print(L.t("program_interrupted_user", yellow=Fore.YELLOW, reset_all=Style.RESET_ALL))
+        print_resume_hint(program)
+    except Exception as e:
+        print(L.t("program_error", red=Fore.RED, e=e, reset_all=Style.RESET_ALL))
+        import traceback
+        traceback.print_exc()
+        print_resume_hint(program)
@@ -0,0 +1,391 @@
+"""Medical knowledge base - tests, diseases, personalities and test-disease relevance
+
+The tables live in a data file (en.json, cn.json, or any JSON/YAML file with the
+same layout) rather than in code:
+
+    {
+      "tests": [{"name": "Blood Test", "cost": 50, "accuracy": 0.85}, ...],
+      "diseases": ["Common Cold", ...],
+      "personalities": {"Cautious": {"suspicion_gain": 0.15, "cost_sensitivity": 0.8,
+                                     "ideal_cost_range": [160, 300]}, ...},
+      "relevance": {"Blood Test": {"Common Cold": 0.3, ...}, ...}
+    }
+
+A file is validated once and compiled into name tables plus typed arrays (costs,
+accuracies and the relevance matrix in CSR and CSC form), pickled to
+__pycache__/<name>.<hash>.kbc next to it. Later loads with the same content hash
+skip parsing and validation.
+
+Relevance is stored sparsely, so catalogs with thousands of diseases and hundreds
+of tests cost memory and time in proportion to their non-zero entries: a lookup
+is a binary search within one row, the tests relevant to a disease are one CSC
+column, and DiseasePosterior updates only the entries of the observed test.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, List, Tuple
+
+COMPILED_FORMAT = 2  # Bump when the compiled layout changes; old caches are then ignored
+CACHE_DIR = "__pycache__"
+PERSONALITY_FIELDS = ("suspicion_gain", "cost_sensitivity", "ideal_cost_range")
+
+_loaded = {}  # Content hash -> KnowledgeBase
+_lock = threading.Lock()
+
+
+class KnowledgeBaseError(ValueError):
+    """A knowledge base file that cannot be read or fails validation"""
+
+
+class RelevanceMatrix:
+    """Sparse tests x diseases relevance, kept both by row (CSR) and by column (CSC)
+
+    Row t spans indices/data[indptr[t]:indptr[t + 1]], sorted by disease; column d
+    spans col_indices/col_data[col_indptr[d]:col_indptr[d + 1]], sorted by test.
+    """
+
+    def __init__(self, compiled: Dict):
+        self.indptr = compiled["indptr"]
+        self.indices = compiled["indices"]
+        self.data = compiled["data"]
+        self.col_indptr = compiled["col_indptr"]
+        self.col_indices = compiled["col_indices"]
+        self.col_data = compiled["col_data"]
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def get(self, test: int, disease: int, default: float = 0.0) -> float:
+        """Relevance of one entry, by binary search within the test's row"""
+        start, end = self.indptr[test], self.indptr[test + 1]
+        i = bisect_left(self.indices, disease, start, end)
+        return self.data[i] if i < end and self.indices[i] == disease else default
+
+    def row(self, test: int) -> Tuple[array, array]:
+        """(disease indices, relevances) of the diseases a test has entries for"""
+        start, end = self.indptr[test], self.indptr[test + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def column(self, disease: int) -> Tuple[array, array]:
+        """(test indices, relevances) of the tests with an entry for a disease"""
+        start, end = self.col_indptr[disease], self.col_indptr[disease + 1]
+        return self.col_indices[start:end], self.col_data[start:end]
+
+
+class KnowledgeBase:
+    """A compiled knowledge base, with the name tables and dict views the engine reads"""
+
+    def __init__(self, compiled: Dict, path: str = ""):
+        self.path = path
+        self.digest = compiled["digest"]
+        self.tests: List[str] = list(compiled["tests"])
+        self.diseases: List[str] = list(compiled["diseases"])
+        self.costs = compiled["costs"]  # array('q'), per test
+        self.accuracy = compiled["accuracy"]  # array('d'), per test
+        self.relevance = RelevanceMatrix(compiled)
+
+        self.test_index: Dict[str, int] = {name: i for i, name in enumerate(self.tests)}
+        self.disease_index: Dict[str, int] = {name: i for i, name in enumerate(self.diseases)}
+        self.test_costs: Dict[str, int] = dict(zip(self.tests, self.costs))
+        self.test_accuracy: Dict[str, float] = dict(zip(self.tests, self.accuracy))
+        self.personality_types: Dict[str, Dict] = compiled["personalities"]
+        self._likelihood_ratios = {}  # (test row, default relevance) -> see likelihood_ratios()
+
+    def likelihood_ratios(self, test: int, default_relevance: float) -> Tuple[array, array, array]:
+        """(disease indices, positive ratios, negative ratios) of a test's row, computed once
+
+        A ratio compares a disease's chance of that outcome with the chance for a
+        disease without an entry; see DiseasePosterior.
+        """
+        key = (test, default_relevance)
+        ratios = self._likelihood_ratios.get(key)
+        if ratios is None:
+            diseases, relevances = self.relevance.row(test)
+            accuracy = self.accuracy[test]
+            background = accuracy * default_relevance
+            floor = DiseasePosterior.MIN_RATIO
+            positive = array("d", (max(accuracy * r / background, floor) if background else 1.0
+                                   for r in relevances))
+            negative = array("d", (max((1 - accuracy * r) / (1 - background), floor) if background < 1 else 1.0
+                                   for r in relevances))
+            ratios = self._likelihood_ratios[key] = (diseases, positive, negative)
+        return ratios
+
+    def relevance_of(self, test: str, disease: str, default: float = 0.0) -> float:
+        """Relevance of a test to a disease, by name; default for names or entries not in the table"""
+        row = self.test_index.get(test)
+        column = self.disease_index.get(disease)
+        if row is None or column is None:
+            return default
+        return self.relevance.get(row, column, default)
+
+    def relevant_tests(self, disease: str) -> List[Tuple[str, float]]:
+        """(test, relevance) for every test with an entry for the disease, in catalog order"""
+        column = self.disease_index.get(disease)
+        if column is None:
+            return []
+        tests, values = self.relevance.column(column)
+        return [(self.tests[t], value) for t, value in zip(tests, values)]
+
+    def __repr__(self):
+        return (f"<KnowledgeBase {os.path.basename(self.path) or '?'}: {len(self.tests)} tests, "
+                f"{len(self.diseases)} diseases, {self.relevance.nnz} relevance entries>")
+
+
+class DiseasePosterior:
+    """Belief over a knowledge base's diseases, updated from test outcomes
+
+    Uses the likelihood MedicalSystem.perform_test simulates: a test comes back
+    positive for disease d with probability accuracy x relevance(test, d), where
+    diseases without an entry have default_relevance. Every disease outside the
+    test's row shares one likelihood, which cancels out on normalization, so an
+    update only rescales the row's entries (O(nnz of the row)). Weights are kept
+    relative to diseases never touched by an update, which all weigh 1.
+    """
+
+    MIN_RATIO = 1e-12  # Floor on a likelihood ratio, so a zero-relevance positive cannot zero a weight
+
+    def __init__(self, kb: KnowledgeBase, default_relevance: float = 0.1):
+        self.kb = kb
+        self.default_relevance = default_relevance
+        self.weights: Dict[int, float] = {}  # Disease index -> weight relative to untouched diseases
+        self.total = float(len(kb.diseases))  # Sum of all weights
+        self.observations = 0
+
+    def observe(self, test: str, positive: bool):
+        """Fold one test outcome into the belief"""
+        row = self.kb.test_index.get(test)
+        if row is None:
+            return
+        diseases, positive_ratios, negative_ratios = self.kb.likelihood_ratios(row, self.default_relevance)
+        weights, get, total = self.weights, self.weights.get, self.total
+        for disease, ratio in zip(diseases, positive_ratios if positive else negative_ratios):
+            old = get(disease, 1.0)
+            weights[disease] = old * ratio
+            total += old * ratio - old
+        self.total = total
+        self.observations += 1
+
+    def probability(self, disease: str) -> float:
+        column = self.kb.disease_index.get(disease)
+        if column is None:
+            return 0.0
+        return self.weights.get(column, 1.0) / self.total
+
+    def top(self, k: int = 5) -> List[Tuple[str, float]]:
+        """The k most likely diseases with their probabilities, in O(touched log k + k)
+
+        Untouched diseases all weigh 1, so the first k of them in catalog order are
+        the only ones that can make the cut.
+        """
+        weights = self.weights
+        leaders = [(d, weights[d]) for d in heapq.nlargest(k, weights, key=weights.get)]
+        leaders += islice(((d, 1.0) for d in range(len(self.kb.diseases)) if d not in weights), k)
+        leaders.sort(key=lambda item: -item[1])  # Stable: ties keep touched diseases first
+        return [(self.kb.diseases[d], weight / self.total) for d, weight in leaders[:k]]
+
+
+def _parse(path: str, content: bytes) -> Dict:
+    """Raw tables of a JSON or YAML file"""
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise KnowledgeBaseError(f"{path}: reading YAML knowledge bases requires PyYAML "
+                                     f"(pip install pyyaml)") from None
+        try:
+            raw = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise KnowledgeBaseError(f"{path}: {e}") from e
+    else:
+        try:
+            raw = json.loads(content)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise KnowledgeBaseError(f"{path}: {e}") from e
+    if not isinstance(raw, dict):
+        raise KnowledgeBaseError(f"{path}: expected a mapping at the top level")
+    return raw
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_knowledge_base(raw: Dict, path: str = "", digest: str = "") -> Dict:
+    """Validate raw tables and compile them; every problem found is reported in one KnowledgeBaseError"""
+    errors = []
+    tests, costs, accuracy = {}, array("q"), array("d")  # tests: name -> row
+    for i, test in enumerate(raw.get("tests") or []):
+        where = f"tests[{i}]"
+        if not isinstance(test, dict) or not isinstance(test.get("name"), str) or not test["name"]:
+            errors.append(f"{where}: expected an object with a non-empty name")
+            continue
+        name = test["name"]
+        if name in tests:
+            errors.append(f"{where}: duplicate test {name!r}")
+            continue
+        cost, acc = test.get("cost"), test.get("accuracy")
+        if not isinstance(cost, int) or isinstance(cost, bool) or cost < 0:
+            errors.append(f"{where} ({name}): cost must be a non-negative integer, got {cost!r}")
+            cost = 0
+        if not _is_number(acc) or not 0 <= acc <= 1:
+            errors.append(f"{where} ({name}): accuracy must be a number in 0..1, got {acc!r}")
+            acc = 0
+        tests[name] = len(tests)  # Registered even when invalid, so relevance rows still resolve
+        costs.append(cost)
+        accuracy.append(float(acc))
+    if not raw.get("tests"):
+        errors.append("tests: at least one test is required")
+
+    diseases = {}  # name -> column
+    for i, disease in enumerate(raw.get("diseases") or []):
+        if not isinstance(disease, str) or not disease:
+            errors.append(f"diseases[{i}]: expected a non-empty string, got {disease!r}")
+        elif disease in diseases:
+            errors.append(f"diseases[{i}]: duplicate disease {disease!r}")
+        else:
+            diseases[disease] = len(diseases)
+    if not raw.get("diseases"):
+        errors.append("diseases: at least one disease is required")
+
+    personalities = {}
+    raw_personalities = raw.get("personalities")
+    if not isinstance(raw_personalities, dict) or not raw_personalities:
+        errors.append("personalities: expected a non-empty mapping of name -> traits")
+        raw_personalities = {}
+    for name, traits in raw_personalities.items():
+        where = f"personalities.{name}"
+        if not isinstance(traits, dict) or any(field not in traits for field in PERSONALITY_FIELDS):
+            errors.append(f"{where}: expected {', '.join(PERSONALITY_FIELDS)}")
+            continue
+        low_high = traits["ideal_cost_range"]
+        if not (isinstance(low_high, (list, tuple)) and len(low_high) == 2 and all(map(_is_number, low_high))
+                and 0 <= low_high[0] <= low_high[1]):
+            errors.append(f"{where}: ideal_cost_range must be [low, high] with 0 <= low <= high")
+            continue
+        if not _is_number(traits["suspicion_gain"]) or not _is_number(traits["cost_sensitivity"]):
+            errors.append(f"{where}: suspicion_gain and cost_sensitivity must be numbers")
+            continue
+        personalities[name] = dict(traits, ideal_cost_range=tuple(low_high))
+
+    rows = [[] for _ in tests]
+    raw_relevance = raw.get("relevance") or {}
+    if not isinstance(raw_relevance, dict):
+        errors.append("relevance: expected a mapping of test -> {disease: relevance}")
+        raw_relevance = {}
+    for test, entries in raw_relevance.items():
+        if test not in tests:
+            errors.append(f"relevance.{test}: unknown test")
+            continue
+        if not isinstance(entries, dict):
+            errors.append(f"relevance.{test}: expected a mapping of disease -> relevance")
+            continue
+        for disease, value in entries.items():
+            if disease not in diseases:
+                errors.append(f"relevance.{test}.{disease}: unknown disease")
+            elif not _is_number(value) or not 0 <= value <= 1:
+                errors.append(f"relevance.{test}.{disease}: relevance must be a number in 0..1, got {value!r}")
+            else:
+                rows[tests[test]].append((diseases[disease], float(value)))
+
+    if errors:
+        shown = errors[:20] + ([f"... and {len(errors) - 20} more"] if len(errors) > 20 else [])
+        raise KnowledgeBaseError(f"{path or 'knowledge base'} is invalid:\n  " + "\n  ".join(shown))
+
+    indptr, indices, data = array("q", [0]), array("q"), array("d")
+    for row in rows:
+        for column, value in sorted(row):
+            indices.append(column)
+            data.append(value)
+        indptr.append(len(indices))
+
+    # CSC copy by counting sort; walking rows in order leaves each column sorted by test
+    col_indptr = array("q", [0]) * (len(diseases) + 1)
+    for column in indices:
+        col_indptr[column + 1] += 1
+    for column in range(len(diseases)):
+        col_indptr[column + 1] += col_indptr[column]
+    fill = array("q", col_indptr[:-1])
+    col_indices, col_data = array("q", [0]) * len(indices), array("d", [0.0]) * len(indices)
+    for row in range(len(tests)):
+        for i in range(indptr[row], indptr[row + 1]):
+            position = fill[indices[i]]
+            col_indices[position], col_data[position] = row, data[i]
+            fill[indices[i]] = position + 1
+
+    return {"format": COMPILED_FORMAT, "digest": digest, "tests": tuple(tests), "diseases": tuple(diseases),
+            "costs": costs, "accuracy": accuracy, "personalities": personalities,
+            "indptr": indptr, "indices": indices, "data": data,
+            "col_indptr": col_indptr, "col_indices": col_indices, "col_data": col_data}
+
+
+def cache_path(path: str, digest: str) -> str:
+    """Where the compiled form of a knowledge base with this content hash is kept"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, f"{stem}.{digest[:16]}.kbc")
+
+
+def _read_cache(cached: str, digest: str):
+    try:
+        with open(cached, "rb") as f:
+            compiled = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get("format") != COMPILED_FORMAT \
+            or compiled.get("digest") != digest:
+        return None
+    return compiled
+
+
+def _write_cache(cached: str, compiled: Dict):
+    """Store the compiled form and drop stale ones of the same file; a read-only location is not an error"""
+    directory = os.path.dirname(cached)
+    stem = os.path.basename(cached).rsplit(".", 2)[0]  # "<stem>.<digest>.kbc", as cache_path() names it
+    try:
+        os.makedirs(directory, exist_ok=True)
+        temp = f"{cached}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cached)
+        for name in os.listdir(directory):
+            if name.endswith(".kbc") and name.rsplit(".", 2)[0] == stem and name != os.path.basename(cached):
+                os.remove(os.path.join(directory, name))
+    except OSError:
+        pass
+
+
+def load_knowledge_base(path: str, use_cache: bool = True) -> KnowledgeBase:
+    """Load a knowledge base file, from its compiled cache when the content hash matches"""
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        raise KnowledgeBaseError(f"Cannot read knowledge base {path}: {e}") from e
+    digest = hashlib.sha256(f"{COMPILED_FORMAT}\0".encode() + content).hexdigest()
+    with _lock:
+        kb = _loaded.get(digest)
+        if kb is not None:
+            return kb
+        cached = cache_path(path, digest)
+        compiled = _read_cache(cached, digest) if use_cache else None
+        if compiled is None:
+            compiled = compile_knowledge_base(_parse(path, content), path, digest)
+            if use_cache:
+                _write_cache(cached, compiled)
+        kb = _loaded[digest] = KnowledgeBase(compiled, path)
+        return kb
+
+
+def forget_loaded():
+    """Drop the in-process memo, so the next load reads the file or its compiled cache again"""
+    with _lock:
+        _loaded.clear()
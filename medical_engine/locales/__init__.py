@@ -0,0 +1,47 @@
+"""Locale packs - everything language-specific the engine needs, imported on demand
+
+A pack is a plain module (en.py, cn.py) with the text-matching hooks, the
+patient/doctor behaviour tables, the name of its knowledge base file (see
+medical_engine.knowledge) and a MESSAGES dict of prompts and console text. Only the packs of the
+editions actually loaded are imported.
+"""
+
+import importlib
+import threading
+from typing import Dict
+
+LOCALES = {"EN": "en", "CN": "cn"}  # Edition -> pack module
+
+_packs = {}
+_lock = threading.Lock()
+
+
+class LocalePack:
+    """A loaded locale pack; module attributes are copied in so lookups stay plain attribute reads"""
+
+    def __init__(self, edition: str, module):
+        self.edition = edition
+        self.__dict__.update({k: v for k, v in vars(module).items() if not k.startswith("_")})
+        self.MESSAGES: Dict[str, str] = module.MESSAGES
+
+    def t(self, key: str, /, **values) -> str:
+        """Message text; with values the text is a str.format template"""
+        text = self.MESSAGES[key]
+        return text.format(**values) if values else text
+
+    def join(self, items) -> str:
+        """Join list items with the locale's separator"""
+        return self.LIST_SEPARATOR.join(items)
+
+
+def load_locale(edition: str) -> LocalePack:
+    """Import the pack of an edition on first use"""
+    edition = edition.upper()
+    if edition not in LOCALES:
+        raise ValueError(f"Unknown edition: {edition} (available: {', '.join(LOCALES)})")
+    with _lock:
+        pack = _packs.get(edition)
+        if pack is None:
+            module = importlib.import_module(f"{__name__}.{LOCALES[edition]}")
+            pack = _packs[edition] = LocalePack(edition, module)
+        return pack
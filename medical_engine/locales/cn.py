@@ -0,0 +1,515 @@
+"""中文语言包 - 文本匹配、患者行为、提示词和界面文本"""
+
+import re
+
+# ==================== 文本匹配 ====================
+WORD_BOUNDARY = ""  # 中文没有词边界，症状和触发词在任意位置匹配
+LIST_SEPARATOR = "、"
+FACT_JOINER = "，还"  # 连接初始主诉中的症状事实
+TEST_NAME_WORDS = ("检查", "测试", "检测")  # 部分匹配时从检查名称中去掉
+TEST_NAME_SUFFIXES = ("检查", "测试", "检测")  # 回答中出现"<检查名>检查"即指该检查
+
+
+def fold(text: str) -> str:
+    """匹配前的文本归一化（中文无大小写，原样返回）"""
+    return text
+
+
+def match_terms(text: str) -> set:
+    """文本的二字组集合，用于问题与症状事实的中文相似度匹配"""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def describe_symptoms(facts: list) -> str:
+    """根据症状事实生成离线病例描述"""
+    return "我最近" + "，".join(facts) + "。"
+
+
+# ==================== 医学知识 ====================
+
+# 检查项目、疾病、患者个性和检查-疾病相关度：medical_engine/knowledge/cn.json
+KNOWLEDGE_BASE = "cn.json"
+
+# 问题关键词 -> 患者误解的概率和方式
+MISUNDERSTANDING_TRIGGERS = {
+    "吃饭": {"threshold": 0.4, "misunderstanding": "认为几小时前吃饭的算'空腹'"},
+    "喝酒": {"threshold": 0.3, "misunderstanding": "不认为啤酒算'喝酒'"},
+    "运动": {"threshold": 0.5, "misunderstanding": "认为散步不算'运动'"},
+    "睡眠": {"threshold": 0.4, "misunderstanding": "把打盹也算作'睡觉'"},
+    "疼痛": {"threshold": 0.6, "misunderstanding": "分不清酸痛和刺痛"},
+    # 新增触发器
+    "恶心": {"threshold": 0.35, "misunderstanding": "把胃部不适说成恶心"},
+    "头晕": {"threshold": 0.45, "misunderstanding": "分不清头晕和眩晕"},
+    "发热": {"threshold": 0.3, "misunderstanding": "把正常体温波动当发烧"},
+    "咳嗽": {"threshold": 0.4, "misunderstanding": "把清嗓子也算作咳嗽"},
+    "乏力": {"threshold": 0.5, "misunderstanding": "把正常疲劳说成病态乏力"},
+    "食欲": {"threshold": 0.35, "misunderstanding": "把心情不好说成没食欲"},
+    "药物": {"threshold": 0.4, "misunderstanding": "忘记用药或记错剂量"},
+    "时间": {"threshold": 0.6, "misunderstanding": "记错症状开始时间"},
+    "频率": {"threshold": 0.55, "misunderstanding": "夸大或缩小症状频率"},
+    "位置": {"threshold": 0.5, "misunderstanding": "描述不准疼痛位置"}
+}
+
+# 标准症状 -> 患者常用的说法
+SYMPTOM_SYNONYMS = {
+    "头痛": ["头疼", "脑袋疼", "头胀痛"],
+    "头晕": ["头昏", "晕乎乎", "眩晕"],
+    "发热": ["发烧", "低烧", "高烧", "低热", "高热", "体温高"],
+    "咳嗽": ["干咳", "咳痰"],
+    "胸痛": ["胸口疼", "胸口痛", "胸闷", "胸口发紧"],
+    "腹痛": ["肚子疼", "肚子痛", "胃疼", "胃痛", "上腹痛"],
+    "恶心": ["想吐", "反胃"],
+    "呕吐": ["吐了", "老是吐"],
+    "乏力": ["没劲", "没力气", "疲劳", "疲倦", "很累", "容易累"],
+    "食欲": ["胃口", "没胃口", "不想吃饭"],
+    "多饮": ["口渴", "口干", "老想喝水"],
+    "多尿": ["尿频", "老上厕所", "小便多"],
+    "心悸": ["心慌", "心跳快", "心跳加速"],
+    "气短": ["气喘", "喘不上气", "喘不过气", "呼吸困难"],
+    "关节痛": ["关节疼", "关节肿痛"],
+    "皮疹": ["起疹子", "红疹", "疹子", "荨麻疹", "皮肤发痒"],
+    "失眠": ["睡不着", "入睡困难", "睡不好", "早醒"],
+    "焦虑": ["紧张", "担心", "坐立不安"],
+    "抑郁": ["情绪低落", "心情不好", "高兴不起来"],
+    "视力模糊": ["看不清", "眼花", "视物模糊"],
+    "耳鸣": ["耳朵嗡嗡响"],
+    "鼻塞": ["鼻子不通气", "鼻子堵"],
+    "流涕": ["流鼻涕", "流清涕"]
+}
+
+# 每种疾病的症状事实，供规则驱动的离线患者使用（不调用API）
+DISEASE_SYMPTOM_FACTS = {
+    "偏头痛": ["一侧头痛，一跳一跳的", "见光和听到噪音会更严重", "头痛厉害时会恶心", "每次发作持续几个小时"],
+    "胃炎": ["上腹部烧灼样腹痛", "饭后腹胀", "早上有点恶心", "最近食欲不好"],
+    "过敏性鼻炎": ["早上老打喷嚏", "流清水样鼻涕", "鼻塞时好时坏", "花粉季节眼睛发痒"],
+    "普通感冒": ["嗓子疼了两三天", "流涕打喷嚏", "有点低烧", "干咳"],
+    "高血压": ["后脑勺头痛", "站起来快了会头晕", "脸上发红发热", "药店量血压偏高"],
+    "糖尿病": ["总是口渴多饮", "多尿，夜里也要起来", "整天乏力", "没减肥体重却下降"],
+    "哮喘": ["呼气时有哨子声", "运动后气短", "夜里胸口发紧", "咳嗽会把我咳醒"],
+    "关节炎": ["膝盖和手指关节痛", "早上关节僵硬", "关节周围肿胀", "天冷时疼得更厉害"],
+    "皮肤病": ["胳膊上起了发痒的皮疹", "皮肤上有红斑", "皮肤干燥脱皮", "越抓皮疹越多"],
+    "失眠症": ["躺下几个小时都睡不着", "凌晨三点就醒", "白天乏力", "烦躁注意力不集中"],
+    "肺炎": ["高烧还发冷", "咳嗽有黄痰", "深呼吸时胸痛", "气短"],
+    "支气管炎": ["一直咳嗽有痰", "咳嗽时胸口不舒服", "低热", "有点喘"],
+    "胃溃疡": ["吃完东西腹痛会缓解", "两餐之间胃里烧着疼", "大便发黑", "恶心腹胀"],
+    "肾结石": ["一侧腰部剧烈疼痛", "疼痛放射到大腿根", "尿里有血", "排尿疼痛"],
+    "胆囊炎": ["右边肋骨下面疼", "吃油腻的东西后疼", "恶心呕吐", "有点发热"],
+    "心肌炎": ["心悸心跳快", "休息时也胸痛", "爬楼梯就气短", "几周前得过感冒"],
+    "脑震荡": ["撞到头以后一直头痛", "头晕，脑子发懵", "摔倒后恶心", "记不住事情"],
+    "腰椎间盘突出": ["腰痛", "疼痛顺着腿往下窜", "脚发麻", "久坐后更疼"],
+    "骨质疏松": ["突然背痛", "个子好像变矮了", "轻轻摔一下就骨折了", "有点驼背"],
+    "贫血": ["乏力没劲", "脸色苍白", "站起来头晕", "稍微活动就心悸"],
+    "甲状腺功能亢进": ["休息时也心悸", "食欲很好体重却下降", "怕热爱出汗", "手发抖"],
+    "痛风": ["大脚趾突然剧痛", "关节又红又肿", "喝酒后夜里开始疼", "关节痛一阵一阵发作"],
+    "肝炎": ["皮肤和眼睛发黄", "乏力没有食欲", "尿色发深", "右上腹隐隐作痛"],
+    "肠易激综合征": ["腹痛，排便后缓解", "腹泻和便秘交替", "经常腹胀", "压力大时症状加重"],
+    "抑郁症": ["大部分时间情绪低落", "对以前喜欢的事没兴趣", "失眠早醒", "一点精力都没有"],
+    "焦虑症": ["控制不住地担心", "一紧张就心悸", "坐立不安", "因为焦虑睡不好"],
+    "白内障": ["视力模糊像隔着雾", "晚上看灯光刺眼", "颜色看着发暗", "看书需要更亮的光"],
+    "青光眼": ["视野边缘视力模糊", "眼睛胀痛", "看灯有光晕", "眼眶周围头痛"],
+    "中耳炎": ["一侧耳朵疼", "耳朵发闷", "听声音发闷还耳鸣", "从昨天开始发热"],
+    "鼻窦炎": ["鼻塞流脓涕", "脸颊和额头发胀", "低头时头痛", "闻不到味道"]
+}
+
+# 离线患者给出模糊回答的概率（按个性）
+PERSONALITY_VAGUENESS = {
+    "谨慎型": 0.2, "随意型": 0.5, "疑病症": 0.3, "节俭型": 0.3,
+    "急躁型": 0.4, "依赖型": 0.2, "理性型": 0.1, "多疑型": 0.45
+}
+
+# 症状前紧跟否定词（"没有发烧"、"不咳嗽"）时不计入
+SYMPTOM_NEGATION_PATTERN = re.compile(r"(?:没有|没|不|无|未)$")
+
+# 在症状前多少个字符内查找否定词
+SYMPTOM_NEGATION_WINDOW = 2
+
+# 离线患者：模糊型个性使用的含糊说法和敷衍回答
+PATIENT_HEDGES = ["好像", "有点", "说不清，", "大概", "不太确定，"]
+
+PATIENT_VAGUE_ANSWERS = [
+    "说不上来，就是感觉不太对劲。",
+    "我也不太清楚，时好时坏的。",
+    "嗯，这个我没太注意。"
+]
+
+# 离线规则医生从中挑选的问题
+OFFLINE_QUESTIONS = [
+    "症状是什么时间开始的？之后有变化吗？",
+    "如果有疼痛，疼痛的位置在哪里？",
+    "有没有发热或者咳嗽？",
+    "食欲怎么样？吃饭后有没有变化？",
+    "最近睡眠怎么样？",
+    "有没有乏力或者头晕？",
+    "这些症状发作的频率是多少？",
+    "有没有恶心、呕吐或者胃部不适？",
+    "目前有在服用什么药物吗？",
+    "平时运动吗？运动后会加重吗？",
+    "最近有喝酒吗？",
+    "视力、听力、皮肤或者小便有没有变化？"
+]
+
+# 阳性检查的结果描述（填入{disease}）
+POSITIVE_RESULTS = {
+    "血糖检测": "血糖检测显示血糖明显升高，符合{disease}诊断标准",
+    "心电图": "心电图显示异常波形，提示{disease}可能",
+    "X光胸片": "X光胸片显示肺部阴影，符合{disease}表现",
+    "血常规": "血常规检查多项指标异常，支持{disease}诊断"
+}
+
+# 疾病 -> 检查 -> 假阴性的结果描述
+FALSE_NEGATIVE_RESULTS = {
+    "糖尿病": {
+        "血糖检测": "血糖值在正常范围上限，建议复查",
+        "血常规": "血常规检查无明显异常"
+    },
+    "肺炎": {
+        "X光胸片": "X光胸片未见明显肺部阴影",
+        "血常规": "白细胞计数轻度升高，无特异性"
+    },
+    # ... 其他疾病的假阴性描述
+}
+
+# 正常（低相关）检查的结果描述
+NORMAL_RESULTS = {
+    "心电图": "心电图显示正常窦性心律",
+    "血糖检测": "血糖值在正常范围内",
+    "X光胸片": "胸部X光片未见明显异常",
+    "血常规": "血常规各项指标均在正常范围"
+}
+
+
+# ==================== 文本 ====================
+
+MESSAGES = {
+    # 配置类
+    "error_deepseek_api_key": """❌ 错误: 未找到DEEPSEEK_API_KEY!
+请在.env文件中设置DEEPSEEK_API_KEY=your_api_key
+或设置环境变量: export DEEPSEEK_API_KEY=your_api_key""",
+    "medical_configuration_validation_successful": "✅ 医疗配置验证成功",
+
+    # 追踪
+    "opentelemetry_not_installed_exporting": "⚠️ 未安装opentelemetry，只导出Chrome trace",
+
+    # 性能剖析
+    "unknown_profile_mode": "❌ 未知的剖析模式: {mode}",
+
+    # 记忆管理系统
+    "no_historical_learning_experience": "暂无历史学习经验",
+    "doctor_s_historical_learning": "【医生历史学习经验】",
+    "based_recent_session_summaries": "(基于最近{count_memories}场的经验总结)",
+    "diagnosis_success_rate_average": "诊断{i}: 成功率{success_rate:.1%}, 平均问题{avg_questions:.1f}, 关键学习: {key_learning}",
+
+    # API客户端
+    "unknown_llm_backend_available": "❌ 未知的LLM后端: {name}（可用: {backends}）",
+    "unknown_call_site_available": "❌ 未知的调用点: {site}（可用: all, {sites}）",
+    "unknown_hedge_backend": "❌ 未知的对冲后端: {hedge_backend}",
+    "api_response_time_s": "⏱️  API响应时间: {elapsed_time:.2f}s",
+    "deepseek_api_call_failed": "❌ DeepSeek API调用失败: {e}",
+    "i_need_more_information": "我需要更多信息来判断您的情况。",
+
+    # 医疗系统
+    "shows_abnormalities_related": "{test_name}检查显示异常，与{disease}相关",
+    "results_within_normal_range": "{test_name}检查结果在正常范围内",
+    "shows_no_abnormalities": "{test_name}检查未见异常",
+
+    # 上下文预算
+    "summary_first_dialogue_entries": "[前{turns}条对话摘要] 医生共提问{questions}次；患者提到：{symptoms}",
+
+    # 状态管理
+    "doctor_thinks_evidence_sufficient": "🧠 医生认为证据充分，准备进行诊断",
+    "sufficient_evidence": "✅证据充分",
+    "collecting": "📝采集中",
+    "current_round_questions_tests": "当前回合: {current_round} | 问题数: {questions_asked} | 检查数: {tests_ordered} | 总费用: {total_cost} | 剩余预算: {remaining_budget} | 患者怀疑: {patient_suspicion:.2f} | {evidence_status}",
+
+    # 智能体类
+    "truthful_prompt_role": "你是一个诚实的患者，正在向医生描述病情",
+    "truthful_prompt_instructions": "请基于真实情况回答医生：\n- 准确描述你的感受\n- 可以有些不确定但不要故意误导\n- 保持自然、口语化\n- 不超过50字",
+    "misunderstanding_prompt_role": "你是一个患者，有时会误解医生的问题",
+    "misunderstanding_prompt_instructions": """请基于你的真实情况，但带着给出的误解来回答：
+- 可以理解错误医生的意思
+- 可以记错或混淆一些细节
+- 保持自然、口语化
+- 不超过50字""",
+    "complaint_prompt_role": "你是一个身体不适的患者，正在向医生描述病情",
+    "complaint_prompt_instructions": """你要向医生描述你的不适，请用自然的口语描述你的症状：
+- 开头像真实患者那样自然描述
+- 可以有些模糊表达（如"好像"、"有点"、"说不清"）
+- 不超过80字""",
+    "patient_condition_memory": "你的真实病情: {symptoms_description}",
+    "misunderstanding_session_input": """现在医生问你: "{question}"
+
+你的误解: {misunderstanding}
+请带着这个误解回答：可以理解错误医生的意思，或混淆一些细节。""",
+    "misunderstanding_prompt_input": "现在医生问你: \"{question}\"\n\n你的误解: {misunderstanding}",
+    "patient_question_input": "现在医生问你: \"{question}\"",
+    "complaint_prompt_input": "医生问你今天哪里不舒服。",
+    "evidence_prompt_role": "你是经验丰富的临床医生，善于判断何时可以做出诊断",
+    "evidence_prompt_instructions": """作为经验丰富的医生，你需要判断当前收集的证据是否足够做出诊断。
+
+请评估：
+1. 关键症状是否已明确？
+2. 关键鉴别检查是否已完成？
+3. 是否有足够证据排除其他可能疾病？
+4. 能否以较高置信度做出诊断？
+
+如果证据足够，请回答"是的，证据足够诊断"。
+如果还需要更多信息，请回答"不，需要更多信息"。
+
+只回答上述两个选项之一。""",
+    "question_prompt_role": "你是一个专业的医生，善于通过问诊诊断疾病",
+    "question_prompt_instructions": """你是一个经验丰富的医生，正在诊断患者。
+
+请提出一个最有助于诊断的问题：
+- 要基于已有信息推理
+- 问题要精准、有针对性
+- 单次只问一个问题
+
+只输出问题。""",
+    "test_selection_prompt_role": "你是一位专业的医学专家，擅长根据症状选择恰当的检查项目",
+    "test_selection_prompt_instructions": "你是一位经验丰富的医生，正在为患者选择检查项目。\n\n【检查项目列表】\n",
+    "test_selection_prompt_test_line": "{test}: {cost}元 (准确率{test_accuracy:.0%})",
+    "test_selection_prompt_notes": """
+
+【重要说明】
+1. 必须从上述检查项目中选择
+2. 必须选择费用不超过患者剩余预算的检查
+3. 优先选择与症状最相关的检查
+4. 避免重复最近已做的检查
+5. 考虑检查的临床价值和必要性
+6. 💡 重要提醒：患者的理想预算可能比剩余预算少，请谨慎选择，若检查太多可考虑不检查
+
+【决策建议】
+- 如果当前信息已经足够诊断，可以选择"血常规"作为基础检查
+- 如果症状不典型或需要排除其他疾病，选择针对性强的检查
+- 平衡诊断需求和费用控制
+
+请根据患者的症状选择最合适的1项检查，直接输出检查名称（仅名称）。""",
+    "diagnosis_prompt_role": "你是一个专业的医疗诊断专家",
+    "diagnosis_prompt_instructions": "根据提供的医患对话和检查结果做出诊断，输出最可能的疾病诊断。",
+    "doctor_loaded_long_term": "✅ 医生加载了长期记忆经验",
+    "tests_done_tests": "【已做检查】{count_test_results}项检查：{items}",
+    "evidence_prompt_input": """【当前问诊情况】
+- 当前回合: {current_round}
+- 患者怀疑度: {current_suspicion:.2f}
+{test_summary}
+
+【最近对话记录】
+{dialogue_text}""",
+    "evidence_reply_yes": "是的，证据足够诊断",
+    "evidence_reply_yes_short": "证据足够",
+    "evidence_reply_no": "不，需要更多信息",
+    "evidence_reply_no_short": "需要更多信息",
+    "evidence_assessment_api_call": "⚠️ 证据评估API调用失败: {e}",
+    "action_request_test": "要求检查",
+    "action_ask_question": "询问病情",
+    "no_new_information": "暂无新信息",
+    "no_dialogue_history_yet": "暂无对话历史",
+    "question_prompt_input": "【当前对话历史】\n{history_text}\n\n输出问题：",
+    "general_discomfort": "全身不适",
+    "test_selection_prompt_input": """【患者症状】
+{symptoms_text}
+
+【近期对话历史】
+{history_text}
+
+【患者剩余预算】
+{remaining_budget}元
+
+【最近已做的检查】
+{recent_tests}
+
+检查名称：""",
+    "error_when_ai_selecting": "⚠️ AI选择检查时出错: {e}",
+    "action_type_test": "检查",
+    "diagnosis_context_tokens_saved": "📉 诊断上下文: {original_tokens} → {compressed_tokens} tokens (节省{saved_tokens})",
+    "no_test_results": "无检查结果",
+    "diagnosis_prompt_input": "【对话记录】\n{dialogue_text}\n\n【检查结果】\n{test_text}\n\n请输出最可能的疾病诊断：",
+    "few_precise_questions_can": "少量精准提问即可确诊",
+    "reasonable_use_tests_improves": "合理使用检查提高诊断准确性",
+    "pure_consultation_can_also": "纯问诊也能成功诊断",
+    "patient_trust_management_needs": "患者信任管理需要改进",
+    "cost_control_needs_optimization": "费用控制需要优化",
+    "need_improve_diagnostic_accuracy": "需要提高诊断准确性",
+    "no_learning_data_yet": "尚无学习数据",
+    "recent_success_rate_average": "近期成功率: {success_rate:.1%} | 平均问题: {avg_questions:.1f} | 平均检查: {avg_tests:.1f}",
+
+    # 生成器
+    "symptoms_prompt_role": "你是一个真实患者，正在描述自己的病情",
+    "symptoms_prompt_instructions": """请为给定疾病的患者生成一个真实的病情描述，要求：
+1. 包含2-4个典型症状
+2. 症状描述要自然、口语化
+3. 包含一些模糊表达（如"有点"、"好像"、"说不清"）
+4. 不超过80字
+
+只输出症状描述。""",
+    "disease_line": "疾病: {disease}",
+
+    # 离线模拟
+    "generally_unwell": "全身不舒服",
+    "hedged_fact": "{choice}{fact}吧……",
+    "yes_fact": "是的，{fact}。",
+    "misunderstood_trigger": "{trigger}？应该没什么问题吧……不过{fact}。",
+    "initial_complaint": "医生，我{choice}{facts}。",
+    "unable_determine": "无法确定",
+
+    # 引擎
+    "continue_prompt_role": "你是谨慎的医生，会权衡证据充分性和患者感受",
+    "continue_prompt_instructions": """作为医生，你已收集到初步证据，患者当前情况如下。
+
+你是否想再问1-2个问题或做一个检查来确认诊断？
+回答"继续问诊"或"停止问诊"。""",
+    "continue_prompt_input": """- 患者怀疑度较低 ({suspicion_level:.2f})
+- 还有充足预算 ({remaining_budget}元)""",
+    "continue_reply": "继续问诊",
+    "patient_consultation": "🩺 第 {total_rounds} 位患者就诊",
+    "patient_personality": "【患者个性】{personality}",
+    "ideal_cost_yuan": "【理想费用】{ideal_cost}元",
+    "true_condition": "【真实病情】{true_disease}",
+    "patient_complaint": "\n患者主诉:",
+    "patient_complaint_line": "患者: {initial_complaint}",
+    "doctor_thinks_evidence_sufficient_stop": "🧠 医生认为证据已充分，停止问诊",
+    "doctor_thinks_current_evidence": "🧠 医生认为当前证据已足够诊断",
+    "round_s_record_saved": "💾 本轮记录已保存: {round_file}",
+    "doctor_asks_about_condition": "\n💬 医生询问病情",
+    "doctor_says": "医生: {question}",
+    "patient_says": "患者: {response}",
+    "action_type_question": "询问",
+    "doctor_requests_test": "\n🔬 医生要求检查",
+    "fallback_test": "血常规",
+    "doctor_recommends_test": "医生: 建议进行{test_type}检查",
+    "test_result": "检查结果: {result}",
+    "test_cost_yuan": "检查费用: {cost}元",
+    "performed_test_result": "进行了{test_type}检查，结果: {result}",
+    "patient_suspicion_too_high": "患者怀疑度过高",
+    "budget_exhausted": "预算耗尽",
+    "question_count_reached_limit": "问题数达到上限",
+    "end_evidence_sufficient": "医生认为证据充分",
+    "unknown_reason": "未知原因",
+    "round_evaluation": "📊 回合评估",
+    "patient_trust_lost": "患者信任丧失",
+    "question_count_exceeded_limit": "问题数超限",
+    "doctor_thinking_about_final": "🤔 医生思考最终诊断...",
+    "doctor_diagnosis": "医生诊断: {diagnosis}",
+    "consultation_successful": "✅ 问诊成功！",
+    "consultation_failed": "❌ 问诊失败",
+    "failure_reasons": "失败原因: {failure_reasons}",
+    "diagnosis_incorrect": "诊断不正确",
+    "cost_exceeded_actual_yuan": "费用超标 (实际: {total_cost}元, 理想: {ideal_cost}元)",
+    "learning_progress": "\n📈 学习进度: {learning_summary}",
+    "ai_doctor_patient_diagnosis": "🏥 AI医患诊断开始",
+    "rules": "规则:",
+    "doctor_must_diagnose_disease": "• 医生要通过询问和检查诊断疾病",
+    "patient_descriptions_may_vague": "• 患者描述可能模糊或不准确",
+    "tests_accurate_but_increase": "• 检查准确但增加费用和患者怀疑",
+    "need_balance_trust_cost": "• 需要在信任、费用、准确性间平衡",
+    "llm_backends": "🔌 LLM后端: {routes}",
+    "metrics_http_metrics": "📊 指标: http://{metrics_host}:{server_port}/metrics",
+    "press_enter_next_patient": "\n按回车继续下一位患者...",
+    "profile_saved": "🔬 剖析结果已保存: {profile_file}",
+    "trace_saved_open_ui": "🧭 追踪已保存: {trace_file}（可在 ui.perfetto.dev 或 chrome://tracing 中打开）",
+    "complete_record_saved_id": "💾 完整记录已保存，ID: {run_id}",
+    "final_report": "🎓 最终报告",
+    "total_rounds": "总回合数: {total_rounds}",
+    "success_rate": "成功率: {success_rate:.1%}",
+    "average_questions": "平均问题数: {avg_questions:.1f}",
+    "average_tests": "平均检查数: {avg_tests:.1f}",
+    "average_cost_yuan": "平均费用: {avg_cost:.1f}元",
+    "average_cost_ratio": "平均费用比率: {avg_cost_ratio:.1f}",
+    "doctor_learning_summary": "\n医生学习总结: {learning_summary}",
+    "prompt_cache_hits_call": "\n🗄️  各调用点提示缓存命中:",
+    "calls_prompt_tokens_cached": "  {site} [{backend}]: {calls}次调用, 缓存 {cache_hit_tokens}/{prompt_tokens} 提示tokens ({cache_hit_rate:.1%})",
+    "hedged_requests_call_site": "\n🏇 各调用点对冲请求:",
+    "calls_hedged_hedge_won": "  {site}: {hedged}/{calls}次调用发出对冲, 对冲胜出{hedge_wins}次 ({hedge_win_rate:.1%}), 因预算跳过{budget_skips}次, 取消落后请求{cancelled}次, 浪费{wasted_tokens} tokens",
+    "coalesced_requests_call_site": "\n🔗 各调用点合并的请求:",
+    "calls_shared_flight_request": "  {site}: {coalesced}/{calls}次调用共享了进行中的请求",
+    "speculative_questions_used_discarded": "\n🔮 推测提问: 使用{used}/{started}次, 丢弃{discarded}次（浪费{wasted_tokens} tokens）, 节省{saved_seconds:.1f}秒",
+    "top_functions_cumulative_time": "\n🔬 累计耗时最多的函数（{mode}）:",
+    "profile_self_time": "自身{self_seconds:.3f}秒, {calls}次调用",
+    "profile_samples": "{samples}次采样",
+    "profile_function_line": "  {cumulative:8.3f}秒  {function}（{detail}）",
+    "time_span_top": "\n🧭 各span耗时（前8）:",
+    "span_time_line": "  {name}: {count}次 {total_ms:.2f}秒",
+    "records_saved": "\n📁 记录已保存到: {records_dirc}/",
+    "round_logs_saved": "📁 回合日志已保存到: {round_logs_dir}/",
+    "doctor_memory_saved": "📁 医生记忆已保存到: {doctor_memory_dir}/",
+
+    # 主程序
+    "banner": """
+{cyan}╔══════════════════════════════════════════════════════════════╗
+{cyan}║                                                              ║
+{cyan}║              🏥 AI 医患诊断学习                               ║
+{cyan}║                                                              ║
+{cyan}║        医生智能体 vs 患者智能体 - 多轮学习进化               ║
+{cyan}║                    带完整记录系统                           ║
+{cyan}║                                                              ║
+{cyan}╚══════════════════════════════════════════════════════════════╝
+{reset_all}""",
+    "cli_description": "AI医患诊断",
+    "auto_mode_no_interaction": "自动模式（无需交互）",
+    "number_rounds": "回合数",
+    "patient_backend_llm_deepseek": "患者后端：llm（DeepSeek）或 offline（规则驱动，不调用API）",
+    "fully_offline_simulation_rule": "完全离线模拟（规则驱动的患者和医生，无需网络）",
+    "route_llm_call_site": "将LLM调用点（或\"all\"）路由到MedicalConfig.LLM_BACKENDS中的后端，如 patient=local；可重复",
+    "hedge_llm_calls_outlive": "对耗时超过调用点p95延迟的LLM调用发出对冲请求",
+    "backend_hedged_duplicates_default": "对冲请求使用的后端（默认与原请求相同）",
+    "generate_next_question_while": "在医生评估证据的同时生成下一个问题",
+    "record_spans_each_round": "记录每回合的span，并在记录旁保存Chrome/Perfetto追踪文件",
+    "trace_also_emit_spans": "配合--trace，同时通过OpenTelemetry发出span（需安装opentelemetry-api）",
+    "serve_live_prometheus_metrics": "在 http://127.0.0.1:<端口>/metrics 提供实时Prometheus指标",
+    "port_metrics_endpoint_picks": "指标端点的端口（0表示自动选择空闲端口）",
+    "profile_run_cprofile_default": "剖析本次运行（默认cprofile，或低开销的sample），并在记录旁保存.pstats/.collapsed文件",
+    "knowledge_base_file_help": "使用的知识库文件（JSON，安装PyYAML后也可用YAML），包含检查项目、疾病、患者个性和检查-疾病相关度",
+    "knowledge_base_loaded": "📚 知识库: {path}（{tests}项检查，{diseases}种疾病）",
+    "seed_help": "随机种子，使回合可复现：每回合的病例、检查结果和患者行为各自使用由种子和回合号派生的独立随机流",
+    "resume_run_help": "从medical_records中的检查点继续被中断的运行（回合数、后端和知识库沿用检查点中的设置）",
+    "no_checkpoint_for_run": "在 {records_dirc} 中找不到运行 {run_id} 的检查点（已完成的运行会删除检查点）",
+    "resuming_run": "♻️ 继续运行 {run_id}：已完成 {completed}/{total_rounds} 回合",
+    "resume_hint": "{yellow}💾 已完成的 {completed} 个回合已保存检查点，可用 --resume {run_id} 继续{reset_all}",
+    "batch_help": "批量评估：将每个疾病×个性场景（见 --batch-*）放入本地SQLite任务队列，用 --workers 个工作线程执行；重新运行同一命令即可继续",
+    "batch_repeats_help": "每个疾病×个性场景的问诊次数",
+    "batch_diseases_help": "要评估的疾病，逗号分隔（默认全部）",
+    "batch_personalities_help": "要评估的患者个性，逗号分隔（默认全部）",
+    "batch_name_help": "批次ID（默认由场景矩阵和设置生成）",
+    "workers_help": "--batch 同时进行的问诊数",
+    "batch_target_ci_help": "自适应批量评估：在 --batch-repeats 的首轮之后，持续为成功率95%%置信区间最宽的\"疾病×个性\"场景追加问诊，直到所有区间半宽都不超过该值（如 0.1）",
+    "batch_max_rounds_help": "自适应批量评估（--batch-target-ci）最多运行的问诊次数",
+    "batch_target_ci_range": "--batch-target-ci 必须介于 0 和 0.5 之间",
+    "batch_unknown_names": "{option}: 未知的名称: {names}",
+    "batch_counts_positive": "--batch-repeats、--batch-max-rounds 和 --workers 至少为1",
+    "batch_settings_differ": "批次 {batch_id} 已存在且设置不同，请换一个 --batch-name",
+    "batch_opened": "📦 批次 {batch_id}：共{total}次问诊，已完成{done}次，{workers}个工作线程执行剩余{pending}次（队列: {queue_file}）",
+    "batch_progress": "⏳ 已完成 {done}/{total}，失败{failed}次，{rate:.2f} 次问诊/秒",
+    "batch_job_failed": "❌ 问诊 {round_number}（{disease}，{personality}）失败: {e}；{final}",
+    "round_llm_calls_failed": "问诊过程中有 {failed} 次LLM调用失败",
+    "batch_will_retry": "稍后重试",
+    "batch_giving_up": "不再重试",
+    "batch_paused": "\n⏸️ 批次已暂停，已完成 {done}/{total}；重新运行同一命令即可继续",
+    "batch_failed_jobs": "⚠️ {failed}次问诊在尝试{attempts}次后仍失败；重新运行同一命令可重试",
+    "batch_complete": "✅ 批次 {batch_id} 完成：共{total}次问诊，成功率 {success_rate:.1%}（本次运行{seconds:.0f}秒）",
+    "batch_allocation": "🎯 自适应分配：{cells} 个场景共 {rounds} 次问诊，最宽区间 ±{widest:.1%}（{widest_cell}），目标 ±{target:.1%}，{above} 个场景未达目标；达到同样最差精度的均匀矩阵需要 {uniform} 次",
+    "batch_by_disease": "📊 按疾病:",
+    "batch_by_personality": "📊 按个性:",
+    "batch_group_line": "  {name}: 成功率 {success_rate:.0%}，诊断准确率 {diagnosis_accuracy:.0%}，费用比 {avg_cost_ratio:.2f}（{rounds}回合）",
+    "serve_help": "以本地HTTP/JSON服务运行：通过API开始问诊、提交医生/患者发言、开检查并获取诊断",
+    "serve_port_help": "问诊服务的端口（0表示自动选择空闲端口）",
+    "service_listening": "🌐 问诊服务: http://{host}:{port}/consultations（{workers}个工作线程），按Ctrl-C停止",
+    "service_stopped": "\n{yellow}问诊服务已停止{reset_all}",
+    "service_bad_request": "请求格式错误或请求体过大",
+    "service_bad_json": "请求体必须是JSON对象",
+    "service_no_route": "没有这个接口: {method} {path}",
+    "service_unknown_consultation": "未知的问诊: {session_id}",
+    "service_too_many_sessions": "进行中的问诊过多（上限{max_sessions}），请稍后再试",
+    "service_consultation_finished": "问诊 {session_id} 已经结束",
+    "service_round_over": "问诊已结束（{reason}），只能提交诊断",
+    "service_unknown_test": "未知的检查: {test}",
+    "service_bad_role": "发言需要指定 role 为 \"doctor\" 或 \"patient\"",
+    "service_expected_text": "字段\"{key}\"需要文本内容",
+    "service_internal_error": "内部错误: {e}",
+    "llm_backend_expects_site": "--llm-backend 需要 SITE=NAME 格式，收到: {item}",
+    "program_interrupted_user": "\n\n{yellow}程序被用户中断{reset_all}",
+    "program_error": "\n{red}❌ 程序错误: {e}{reset_all}",
+
+    # 兜底文本
+    "no_specific_symptoms": "无明确症状",
+    "none": "无"
+}
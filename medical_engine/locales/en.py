@@ -0,0 +1,564 @@
+"""English locale pack - text matching, patient behaviour, prompts and messages"""
+
+import re
+
+# ==================== Text Matching ====================
+WORD_BOUNDARY = r"\b"  # Symptoms and triggers only match whole words
+LIST_SEPARATOR = ", "
+FACT_JOINER = " and "  # Joins the facts of the initial complaint
+TEST_NAME_WORDS = ("Test", "Scan", "Check")  # Dropped from test names for partial matches
+TEST_NAME_SUFFIXES = (" test", " scan", " check")  # "<test> scan" in a reply names that test
+
+
+def fold(text: str) -> str:
+    """Case-fold text before matching"""
+    return text.lower()
+
+
+def match_terms(text: str) -> set:
+    """Words longer than three letters, for matching a question against symptom facts"""
+    return {w for w in re.findall(r"[a-z']+", text.lower()) if len(w) > 3}
+
+
+def describe_symptoms(facts: list) -> str:
+    """Offline case description from symptom facts"""
+    return "I have " + ", ".join(facts[:-1]) + (" and " if len(facts) > 1 else "") + facts[-1] + "."
+
+
+# ==================== Medical Knowledge ====================
+
+# Tests, diseases, personalities and test-disease relevance: medical_engine/knowledge/en.json
+KNOWLEDGE_BASE = "en.json"
+
+# Question keyword -> chance and kind of patient misunderstanding
+MISUNDERSTANDING_TRIGGERS = {
+    "eating": {"threshold": 0.4, "misunderstanding": "Considers eating a few hours ago as 'fasting'"},
+    "drinking": {"threshold": 0.3, "misunderstanding": "Doesn't consider beer as 'drinking alcohol'"},
+    "exercise": {"threshold": 0.5, "misunderstanding": "Doesn't consider walking as 'exercise'"},
+    "sleep": {"threshold": 0.4, "misunderstanding": "Counts napping as 'sleeping'"},
+    "pain": {"threshold": 0.6, "misunderstanding": "Confuses soreness and stabbing pain"},
+    # New triggers
+    "nausea": {"threshold": 0.35, "misunderstanding": "Describes stomach discomfort as nausea"},
+    "dizziness": {"threshold": 0.45, "misunderstanding": "Confuses dizziness and vertigo"},
+    "fever": {"threshold": 0.3, "misunderstanding": "Mistakes normal temperature fluctuations for fever"},
+    "cough": {"threshold": 0.4, "misunderstanding": "Counts throat clearing as coughing"},
+    "fatigue": {"threshold": 0.5, "misunderstanding": "Describes normal tiredness as pathological fatigue"},
+    "appetite": {"threshold": 0.35, "misunderstanding": "Attributes bad mood to lack of appetite"},
+    "medication": {"threshold": 0.4, "misunderstanding": "Forgets medication or remembers wrong dosage"},
+    "time": {"threshold": 0.6, "misunderstanding": "Mistakes symptom onset time"},
+    "frequency": {"threshold": 0.55, "misunderstanding": "Exaggerates or minimizes symptom frequency"},
+    "location": {"threshold": 0.5, "misunderstanding": "Inaccurately describes pain location"}
+}
+
+# Canonical symptom -> phrases patients use for it (matched case-insensitively on word boundaries)
+SYMPTOM_SYNONYMS = {
+    "headache": ["headaches", "head hurts", "head aches", "head pain"],
+    "dizziness": ["dizzy", "lightheaded", "light-headed", "vertigo"],
+    "fever": ["feverish", "high temperature", "running a temperature", "chills"],
+    "cough": ["coughing", "coughs"],
+    "chest pain": ["chest tightness", "chest hurts", "pain in my chest", "tight chest"],
+    "abdominal pain": ["stomach ache", "stomachache", "belly pain", "tummy ache", "stomach hurts",
+                       "stomach pain", "stomach discomfort"],
+    "nausea": ["nauseous", "queasy", "sick to my stomach", "feel sick"],
+    "vomiting": ["vomit", "vomited", "throwing up", "threw up", "throw up", "puking"],
+    "fatigue": ["tired", "exhausted", "no energy", "worn out", "weakness"],
+    "appetite": ["no appetite", "not hungry", "off my food"],
+    "thirst": ["thirsty"],
+    "urination": ["urinate", "urinating", "peeing", "pee a lot", "bathroom a lot"],
+    "palpitations": ["heart racing", "racing heart", "heart pounding", "pounding heart"],
+    "shortness of breath": ["short of breath", "breathless", "can't breathe", "hard to breathe",
+                            "out of breath", "wheezing"],
+    "joint pain": ["joints hurt", "achy joints", "painful joints", "stiff joints", "sore joints"],
+    "rash": ["rashes", "hives", "itchy skin", "red patches", "itchy rash"],
+    "insomnia": ["can't sleep", "cannot sleep", "trouble sleeping", "awake at night", "lying awake",
+                 "can't fall asleep"],
+    "anxiety": ["anxious", "nervous", "worried", "constant worry"],
+    "depression": ["depressed", "feeling down", "hopeless", "lost interest"],
+    "blurred vision": ["blurry vision", "can't see clearly", "vision is blurry", "blurry"],
+    "tinnitus": ["ringing in my ears", "ears ringing", "ringing ears"],
+    "nasal congestion": ["stuffy nose", "blocked nose", "congested"],
+    "runny nose": ["nose running", "runny"]
+}
+
+# Symptom facts per disease used by the rule-based offline patient (no API calls)
+DISEASE_SYMPTOM_FACTS = {
+    "Migraine": ["throbbing headache on one side of my head", "light and noise make it worse",
+                 "nausea when the headache is bad", "attacks last for hours and then go away"],
+    "Gastritis": ["burning abdominal pain in the upper belly", "bloated after meals",
+                  "some nausea in the morning", "poor appetite lately"],
+    "Allergic Rhinitis": ["sneezing a lot in the morning", "runny nose with clear discharge",
+                          "nasal congestion that comes and goes", "itchy eyes in pollen season"],
+    "Common Cold": ["sore throat for a couple of days", "runny nose and sneezing",
+                    "a mild fever", "a dry cough"],
+    "Hypertension": ["headache at the back of my head", "dizziness when I stand up quickly",
+                     "my face feels flushed", "blood pressure was high at the pharmacy"],
+    "Diabetes": ["constant thirst even after drinking water", "frequent urination even at night",
+                 "fatigue all day long", "losing weight without trying"],
+    "Asthma": ["wheezing when I breathe out", "shortness of breath after exercise",
+               "chest tightness at night", "a cough that wakes me up"],
+    "Arthritis": ["joint pain in my knees and fingers", "stiff joints in the morning",
+                  "swelling around the joints", "pain gets worse in cold weather"],
+    "Skin Disease": ["an itchy rash on my arms", "red patches on the skin",
+                     "dry and flaky skin", "scratching makes the rash spread"],
+    "Insomnia": ["lying awake for hours before falling asleep", "waking up at 3 am",
+                 "fatigue during the day", "irritable and unfocused"],
+    "Pneumonia": ["high fever with chills", "cough with yellow phlegm",
+                  "chest pain when I breathe deeply", "shortness of breath"],
+    "Bronchitis": ["persistent cough with mucus", "chest discomfort when coughing",
+                   "a low fever", "wheezing a little"],
+    "Gastric Ulcer": ["abdominal pain that eases after eating", "burning pain between meals",
+                      "dark stools", "nausea and bloating"],
+    "Kidney Stones": ["sharp pain in my lower back on one side", "pain spreading to the groin",
+                      "blood in my urine", "painful urination"],
+    "Cholecystitis": ["pain under my right ribs", "pain after fatty meals",
+                      "nausea and vomiting", "a mild fever"],
+    "Myocarditis": ["palpitations and a racing heart", "chest pain at rest",
+                    "shortness of breath climbing stairs", "had a cold a few weeks ago"],
+    "Concussion": ["headache since I hit my head", "dizziness and feeling foggy",
+                   "nausea after the fall", "trouble remembering things"],
+    "Lumbar Disc Herniation": ["lower back pain", "pain shooting down my leg",
+                               "numbness in my foot", "pain worse after sitting long"],
+    "Osteoporosis": ["back pain that came on suddenly", "I seem to be getting shorter",
+                     "a bone broke after a small fall", "a stooped posture"],
+    "Anemia": ["fatigue and weakness", "pale skin",
+               "dizziness when standing", "palpitations with little effort"],
+    "Hyperthyroidism": ["palpitations even at rest", "losing weight though my appetite is big",
+                        "sweating and feeling hot", "my hands tremble"],
+    "Gout": ["sudden severe pain in my big toe", "the joint is red and swollen",
+             "the pain started at night after drinking", "joint pain that comes in attacks"],
+    "Hepatitis": ["yellowish skin and eyes", "fatigue and poor appetite",
+                  "dark urine", "dull pain on the right side"],
+    "Irritable Bowel Syndrome": ["abdominal pain relieved after a bowel movement",
+                                 "alternating diarrhea and constipation",
+                                 "bloating a lot", "symptoms worse with stress"],
+    "Depression": ["feeling down most days", "lost interest in things I enjoyed",
+                   "insomnia and early waking", "no energy at all"],
+    "Anxiety Disorder": ["constant worry I can't control", "palpitations when nervous",
+                         "restless and tense", "trouble sleeping because of anxiety"],
+    "Cataracts": ["blurred vision like looking through fog", "glare from lights at night",
+                  "colors look faded", "need more light to read"],
+    "Glaucoma": ["blurred vision at the edges", "eye pain and pressure",
+                 "halos around lights", "headache around the eyes"],
+    "Otitis Media": ["ear pain on one side", "a feeling of fullness in the ear",
+                     "muffled hearing and tinnitus", "a fever since yesterday"],
+    "Sinusitis": ["nasal congestion with thick discharge", "pressure around my cheeks and forehead",
+                  "headache when bending forward", "reduced sense of smell"]
+}
+
+# Probability that the offline patient gives a vague answer, per personality
+PERSONALITY_VAGUENESS = {
+    "Cautious": 0.2, "Easygoing": 0.5, "Hypochondriac": 0.3, "Frugal": 0.3,
+    "Impatient": 0.4, "Dependent": 0.2, "Rational": 0.1, "Paranoid": 0.45
+}
+
+# A negation shortly before a symptom ("no fever", "don't have a cough") suppresses it
+SYMPTOM_NEGATION_PATTERN = re.compile(r"(?:\bno|\bnot|\bnever|\bwithout|n't)\s+(?:\w+\s+){0,2}$")
+
+# Characters before a symptom searched for a negation
+SYMPTOM_NEGATION_WINDOW = 25
+
+# Offline patient: hedges and non-answers used by vague personalities
+PATIENT_HEDGES = ["Sort of", "I think", "Not sure, but", "A bit, maybe", "Hard to say, but"]
+
+PATIENT_VAGUE_ANSWERS = [
+    "It's hard to describe, I just don't feel right.",
+    "I'm not really sure, it comes and goes.",
+    "Hmm, I haven't paid much attention to that."
+]
+
+# Questions the rule-based offline doctor picks from
+OFFLINE_QUESTIONS = [
+    "When did it start, and has it changed over time?",
+    "Where is the pain located, if you have any pain?",
+    "Do you have any fever or cough?",
+    "How is your appetite, and does eating change anything?",
+    "How has your sleep been lately?",
+    "Do you feel fatigue or dizziness?",
+    "What is the frequency of these episodes?",
+    "Any nausea, vomiting or stomach discomfort?",
+    "Are you taking any medication at the moment?",
+    "Do you do any exercise, and does it make things worse?",
+    "Have you been drinking alcohol recently?",
+    "Any changes in your vision, hearing, skin or urination?"
+]
+
+# Result text of a positive test ({disease} is filled in)
+POSITIVE_RESULTS = {
+    "Blood Glucose Test": "Blood glucose test shows significantly elevated levels, meeting {disease} diagnostic criteria",
+    "Electrocardiogram": "ECG shows abnormal waveforms, suggesting possible {disease}",
+    "Chest X-ray": "Chest X-ray shows lung shadows, consistent with {disease} presentation",
+    "Blood Test": "Blood test shows multiple abnormal indicators, supporting {disease} diagnosis"
+}
+
+# Disease -> test -> result text of a false negative
+FALSE_NEGATIVE_RESULTS = {
+    "Diabetes": {
+        "Blood Glucose Test": "Blood glucose values at upper normal range, recommend retesting",
+        "Blood Test": "Blood test shows no significant abnormalities"
+    },
+    "Pneumonia": {
+        "Chest X-ray": "Chest X-ray shows no obvious lung shadows",
+        "Blood Test": "White blood cell count mildly elevated, non-specific"
+    },
+    # ... Other disease false negative descriptions
+}
+
+# Result text of a normal (low-relevance) test
+NORMAL_RESULTS = {
+    "Electrocardiogram": "ECG shows normal sinus rhythm",
+    "Blood Glucose Test": "Blood glucose values within normal range",
+    "Chest X-ray": "Chest X-ray shows no significant abnormalities",
+    "Blood Test": "All blood test indicators within normal range"
+}
+
+
+# ==================== Messages ====================
+
+MESSAGES = {
+    # Configuration Class
+    "error_deepseek_api_key": """❌ Error: DEEPSEEK_API_KEY not found!
+Please set DEEPSEEK_API_KEY=your_api_key in .env file
+Or set environment variable: export DEEPSEEK_API_KEY=your_api_key""",
+    "medical_configuration_validation_successful": "✅ Medical configuration validation successful",
+
+    # Tracing
+    "opentelemetry_not_installed_exporting": "⚠️ opentelemetry is not installed, exporting the Chrome trace only",
+
+    # Profiling
+    "unknown_profile_mode": "❌ Unknown profile mode: {mode}",
+
+    # Memory Management System
+    "no_historical_learning_experience": "No historical learning experience available",
+    "doctor_s_historical_learning": "【Doctor's Historical Learning Experience】",
+    "based_recent_session_summaries": "(Based on recent {count_memories} session summaries)",
+    "diagnosis_success_rate_average": "Diagnosis {i}: Success rate {success_rate:.1%}, Average questions {avg_questions:.1f}, Key learning: {key_learning}",
+
+    # API Client
+    "unknown_llm_backend_available": "❌ Unknown LLM backend: {name} (available: {backends})",
+    "unknown_call_site_available": "❌ Unknown call site: {site} (available: all, {sites})",
+    "unknown_hedge_backend": "❌ Unknown hedge backend: {hedge_backend}",
+    "api_response_time_s": "⏱️  API response time: {elapsed_time:.2f}s",
+    "deepseek_api_call_failed": "❌ DeepSeek API call failed: {e}",
+    "i_need_more_information": "I need more information to assess your condition.",
+
+    # Medical System
+    "shows_abnormalities_related": "{test_name} shows abnormalities related to {disease}",
+    "results_within_normal_range": "{test_name} results within normal range",
+    "shows_no_abnormalities": "{test_name} shows no abnormalities",
+
+    # Context Budget
+    "summary_first_dialogue_entries": "[Summary of the first {turns} dialogue entries] Doctor asked {questions} questions; patient reported: {symptoms}",
+
+    # State Management
+    "doctor_thinks_evidence_sufficient": "🧠 Doctor thinks evidence is sufficient, preparing for diagnosis",
+    "sufficient_evidence": "✅Sufficient evidence",
+    "collecting": "📝Collecting",
+    "current_round_questions_tests": "Current round: {current_round} | Questions: {questions_asked} | Tests: {tests_ordered} | Total cost: {total_cost} | Remaining budget: {remaining_budget} | Patient suspicion: {patient_suspicion:.2f} | {evidence_status}",
+
+    # Agent Classes
+    "truthful_prompt_role": "You are an honest patient describing your condition to the doctor",
+    "truthful_prompt_instructions": """Please answer the doctor based on actual situation:
+- Accurately describe your feelings
+- Can be somewhat uncertain but don't intentionally mislead
+- Keep it natural, conversational
+- No more than 50 words""",
+    "misunderstanding_prompt_role": "You are a patient who sometimes misunderstands doctor's questions",
+    "misunderstanding_prompt_instructions": """Please answer based on your actual situation, but with the given misunderstanding:
+- You can misunderstand the doctor's meaning
+- You can misremember or confuse some details
+- Keep it natural, conversational
+- No more than 50 words""",
+    "complaint_prompt_role": "You are an unwell patient describing your condition to the doctor",
+    "complaint_prompt_instructions": """You need to describe your discomfort to the doctor. Please describe your symptoms in natural conversation:
+- Start naturally like a real patient
+- Can include some vague expressions (like "sort of", "a bit", "not sure")
+- No more than 80 words""",
+    "patient_condition_memory": "Your actual condition: {symptoms_description}",
+    "misunderstanding_session_input": """The doctor asks you: "{question}"
+
+Your misunderstanding: {misunderstanding}
+Answer with this misunderstanding: you can misunderstand the doctor's meaning or confuse some details.""",
+    "misunderstanding_prompt_input": """The doctor asks you: "{question}"
+
+Your misunderstanding: {misunderstanding}""",
+    "patient_question_input": "The doctor asks you: \"{question}\"",
+    "complaint_prompt_input": "The doctor asks what brings you in today.",
+    "evidence_prompt_role": "You are an experienced clinical doctor, good at determining when a diagnosis can be made",
+    "evidence_prompt_instructions": """As an experienced doctor, you need to determine if currently collected evidence is sufficient to make a diagnosis.
+
+Please assess:
+1. Are key symptoms already clear?
+2. Have key differential tests been completed?
+3. Is there enough evidence to exclude other possible diseases?
+4. Can a diagnosis be made with high confidence?
+
+If evidence is sufficient, answer "Yes, evidence is sufficient for diagnosis".
+If more information is needed, answer "No, more information needed".
+
+Only answer one of the above two options.""",
+    "question_prompt_role": "You are a professional doctor, good at diagnosing through consultation",
+    "question_prompt_instructions": """You are an experienced doctor, currently diagnosing a patient.
+
+Please ask one question that would be most helpful for diagnosis:
+- Based on reasoning from existing information
+- Question should be precise and targeted
+- Ask only one question at a time
+
+Output only the question.""",
+    "test_selection_prompt_role": "You are a professional medical expert, good at selecting appropriate test items based on symptoms",
+    "test_selection_prompt_instructions": """You are an experienced doctor, currently selecting test items for a patient.
+
+【Test Item List】
+""",
+    "test_selection_prompt_test_line": "{test}: {cost} yuan (accuracy {test_accuracy:.0%})",
+    "test_selection_prompt_notes": """
+
+【Important Notes】
+1. Must select from the above test items
+2. Must select a test whose cost is within the patient's remaining budget
+3. Prioritize tests most relevant to symptoms
+4. Avoid repeating recently done tests
+5. Consider clinical value and necessity of tests
+6. 💡 Important reminder: Patient's ideal budget may be less than remaining budget, choose carefully, consider not testing if too many tests
+
+【Decision Advice】
+- If current information is already sufficient for diagnosis, you can choose "Blood Test" as basic test
+- If symptoms are atypical or need to exclude other diseases, choose strongly targeted tests
+- Balance diagnostic needs and cost control
+
+Please select the most appropriate 1 test item based on patient's symptoms, output only the test name.""",
+    "diagnosis_prompt_role": "You are a professional medical diagnosis expert",
+    "diagnosis_prompt_instructions": "Based on the doctor-patient dialogue and test results provided, please make a diagnosis. Output the most likely disease diagnosis.",
+    "doctor_loaded_long_term": "✅ Doctor loaded long-term memory experience",
+    "tests_done_tests": "【Tests Done】{count_test_results} tests: {items}",
+    "evidence_prompt_input": """【Current Consultation Status】
+- Current round: {current_round}
+- Patient suspicion: {current_suspicion:.2f}
+{test_summary}
+
+【Recent Dialogue Record】
+{dialogue_text}""",
+    "evidence_reply_yes": "Yes, evidence is sufficient for diagnosis",
+    "evidence_reply_yes_short": "evidence is sufficient",
+    "evidence_reply_no": "No, more information needed",
+    "evidence_reply_no_short": "more information needed",
+    "evidence_assessment_api_call": "⚠️ Evidence assessment API call failed: {e}",
+    "action_request_test": "Request test",
+    "action_ask_question": "Ask about condition",
+    "no_new_information": "No new information",
+    "no_dialogue_history_yet": "No dialogue history yet",
+    "question_prompt_input": "【Current Dialogue History】\n{history_text}\n\nOutput question:",
+    "general_discomfort": "General discomfort",
+    "test_selection_prompt_input": """【Patient Symptoms】
+{symptoms_text}
+
+【Recent Dialogue History】
+{history_text}
+
+【Patient's Remaining Budget】
+{remaining_budget} yuan
+
+【Recently Done Tests】
+{recent_tests}
+
+Test name:""",
+    "error_when_ai_selecting": "⚠️ Error when AI selecting test: {e}",
+    "action_type_test": "Test",
+    "diagnosis_context_tokens_saved": "📉 Diagnosis context: {original_tokens} → {compressed_tokens} tokens (saved {saved_tokens})",
+    "no_test_results": "No test results",
+    "diagnosis_prompt_input": """【Dialogue Record】
+{dialogue_text}
+
+【Test Results】
+{test_text}
+
+Please output the most likely disease diagnosis:""",
+    "few_precise_questions_can": "A few precise questions can confirm diagnosis",
+    "reasonable_use_tests_improves": "Reasonable use of tests improves diagnostic accuracy",
+    "pure_consultation_can_also": "Pure consultation can also successfully diagnose",
+    "patient_trust_management_needs": "Patient trust management needs improvement",
+    "cost_control_needs_optimization": "Cost control needs optimization",
+    "need_improve_diagnostic_accuracy": "Need to improve diagnostic accuracy",
+    "no_learning_data_yet": "No learning data yet",
+    "recent_success_rate_average": "Recent success rate: {success_rate:.1%} | Average questions: {avg_questions:.1f} | Average tests: {avg_tests:.1f}",
+
+    # Generator
+    "symptoms_prompt_role": "You are a real patient describing your illness",
+    "symptoms_prompt_instructions": """Please generate a realistic illness description for a patient with the given disease, requirements:
+1. Include 2-4 typical symptoms
+2. Symptom descriptions should be natural, conversational
+3. Include some vague expressions (like "a bit", "sort of", "not sure")
+4. No more than 80 words
+
+Output symptom description only.""",
+    "disease_line": "Disease: {disease}",
+
+    # Offline Simulation
+    "generally_unwell": "generally unwell",
+    "hedged_fact": "{choice} {fact}...",
+    "yes_fact": "Yes, {fact}.",
+    "misunderstood_trigger": "'{trigger}'? I don't think so, not really... but {fact}.",
+    "initial_complaint": "Doctor, {choice} I have {facts}.",
+    "unable_determine": "Unable to determine",
+
+    # Engine
+    "continue_prompt_role": "You are a cautious doctor, balancing evidence sufficiency and patient feelings",
+    "continue_prompt_instructions": """As a doctor, you've collected preliminary evidence, and the patient's current situation is given below.
+
+Do you want to ask 1-2 more questions or do one test to confirm diagnosis?
+Answer "Continue consultation" or "Stop consultation".""",
+    "continue_prompt_input": """- Patient suspicion is low ({suspicion_level:.2f})
+- Still have sufficient budget ({remaining_budget} yuan)""",
+    "continue_reply": "Continue consultation",
+    "patient_consultation": "🩺 Patient {total_rounds} Consultation",
+    "patient_personality": "【Patient Personality】{personality}",
+    "ideal_cost_yuan": "【Ideal Cost】{ideal_cost} yuan",
+    "true_condition": "【True Condition】{true_disease}",
+    "patient_complaint": "\nPatient Complaint:",
+    "patient_complaint_line": "Patient: {initial_complaint}",
+    "doctor_thinks_evidence_sufficient_stop": "🧠 Doctor thinks evidence is sufficient, stopping consultation",
+    "doctor_thinks_current_evidence": "🧠 Doctor thinks current evidence is sufficient for diagnosis",
+    "round_s_record_saved": "💾 This round's record saved: {round_file}",
+    "doctor_asks_about_condition": "\n💬 Doctor asks about condition",
+    "doctor_says": "Doctor: {question}",
+    "patient_says": "Patient: {response}",
+    "action_type_question": "Question",
+    "doctor_requests_test": "\n🔬 Doctor requests test",
+    "fallback_test": "Blood Test",
+    "doctor_recommends_test": "Doctor: Recommends {test_type} test",
+    "test_result": "Test result: {result}",
+    "test_cost_yuan": "Test cost: {cost} yuan",
+    "performed_test_result": "Performed {test_type} test, result: {result}",
+    "patient_suspicion_too_high": "Patient suspicion too high",
+    "budget_exhausted": "Budget exhausted",
+    "question_count_reached_limit": "Question count reached limit",
+    "end_evidence_sufficient": "Doctor thinks evidence is sufficient",
+    "unknown_reason": "Unknown reason",
+    "round_evaluation": "📊 Round Evaluation",
+    "patient_trust_lost": "Patient trust lost",
+    "question_count_exceeded_limit": "Question count exceeded limit",
+    "doctor_thinking_about_final": "🤔 Doctor thinking about final diagnosis...",
+    "doctor_diagnosis": "Doctor diagnosis: {diagnosis}",
+    "consultation_successful": "✅ Consultation successful!",
+    "consultation_failed": "❌ Consultation failed",
+    "failure_reasons": "Failure reasons: {failure_reasons}",
+    "diagnosis_incorrect": "Diagnosis incorrect",
+    "cost_exceeded_actual_yuan": "Cost exceeded (Actual: {total_cost} yuan, Ideal: {ideal_cost} yuan)",
+    "learning_progress": "\n📈 Learning progress: {learning_summary}",
+    "ai_doctor_patient_diagnosis": "🏥 AI Doctor-Patient Diagnosis Start",
+    "rules": "Rules:",
+    "doctor_must_diagnose_disease": "• Doctor must diagnose disease through questioning and tests",
+    "patient_descriptions_may_vague": "• Patient descriptions may be vague or inaccurate",
+    "tests_accurate_but_increase": "• Tests are accurate but increase cost and patient suspicion",
+    "need_balance_trust_cost": "• Need to balance trust, cost, and accuracy",
+    "llm_backends": "🔌 LLM backends: {routes}",
+    "metrics_http_metrics": "📊 Metrics: http://{metrics_host}:{server_port}/metrics",
+    "press_enter_next_patient": "\nPress Enter for next patient...",
+    "profile_saved": "🔬 Profile saved: {profile_file}",
+    "trace_saved_open_ui": "🧭 Trace saved: {trace_file} (open in ui.perfetto.dev or chrome://tracing)",
+    "complete_record_saved_id": "💾 Complete record saved, ID: {run_id}",
+    "final_report": "🎓 Final Report",
+    "total_rounds": "Total rounds: {total_rounds}",
+    "success_rate": "Success rate: {success_rate:.1%}",
+    "average_questions": "Average questions: {avg_questions:.1f}",
+    "average_tests": "Average tests: {avg_tests:.1f}",
+    "average_cost_yuan": "Average cost: {avg_cost:.1f} yuan",
+    "average_cost_ratio": "Average cost ratio: {avg_cost_ratio:.1f}",
+    "doctor_learning_summary": "\nDoctor learning summary: {learning_summary}",
+    "prompt_cache_hits_call": "\n🗄️  Prompt cache hits by call site:",
+    "calls_prompt_tokens_cached": "  {site} [{backend}]: {calls} calls, {cache_hit_tokens}/{prompt_tokens} prompt tokens cached ({cache_hit_rate:.1%})",
+    "hedged_requests_call_site": "\n🏇 Hedged requests by call site:",
+    "calls_hedged_hedge_won": "  {site}: {hedged}/{calls} calls hedged, hedge won {hedge_wins} ({hedge_win_rate:.1%}), {budget_skips} skipped by budget, {cancelled} losers cancelled, {wasted_tokens} wasted tokens",
+    "coalesced_requests_call_site": "\n🔗 Coalesced requests by call site:",
+    "calls_shared_flight_request": "  {site}: {coalesced}/{calls} calls shared an in-flight request",
+    "speculative_questions_used_discarded": "\n🔮 Speculative questions: {used}/{started} used, {discarded} discarded ({wasted_tokens} wasted tokens), saved {saved_seconds:.1f}s",
+    "top_functions_cumulative_time": "\n🔬 Top functions by cumulative time ({mode}):",
+    "profile_self_time": "{self_seconds:.3f}s self, {calls} calls",
+    "profile_samples": "{samples} samples",
+    "profile_function_line": "  {cumulative:8.3f}s  {function} ({detail})",
+    "time_span_top": "\n🧭 Time by span (top 8):",
+    "span_time_line": "  {name}: {count}× {total_ms:.2f}s",
+    "records_saved": "\n📁 Records saved to: {records_dirc}/",
+    "round_logs_saved": "📁 Round logs saved to: {round_logs_dir}/",
+    "doctor_memory_saved": "📁 Doctor memory saved to: {doctor_memory_dir}/",
+
+    # Main Program
+    "banner": """
+{cyan}╔══════════════════════════════════════════════════════════════╗
+{cyan}║                                                              ║
+{cyan}║              🏥 AI Doctor-Patient Learning                   ║
+{cyan}║                                                              ║
+{cyan}║         Doctor AI vs Patient AI - Multi-round Learning       ║
+{cyan}║                    with Complete Record System               ║
+{cyan}║                                                              ║
+{cyan}╚══════════════════════════════════════════════════════════════╝
+{reset_all}""",
+    "cli_description": "AI Doctor-Patient Diagnosis",
+    "auto_mode_no_interaction": "Auto mode (no interaction needed)",
+    "number_rounds": "Number of rounds",
+    "patient_backend_llm_deepseek": "Patient backend: llm (DeepSeek) or offline (rule-based, no API calls)",
+    "fully_offline_simulation_rule": "Fully offline simulation (rule-based patient and doctor, no network)",
+    "route_llm_call_site": "Route an LLM call site (or \"all\") to a backend from MedicalConfig.LLM_BACKENDS, e.g. patient=local; can be repeated",
+    "hedge_llm_calls_outlive": "Hedge LLM calls that outlive their call site's p95 latency",
+    "backend_hedged_duplicates_default": "Backend for hedged duplicates (default: same backend as the original call)",
+    "generate_next_question_while": "Generate the next question while the doctor assesses evidence",
+    "record_spans_each_round": "Record spans of each round and save a Chrome/Perfetto trace next to the record",
+    "trace_also_emit_spans": "With --trace, also emit spans through OpenTelemetry (requires opentelemetry-api)",
+    "serve_live_prometheus_metrics": "Serve live Prometheus metrics at http://127.0.0.1:<port>/metrics",
+    "port_metrics_endpoint_picks": "Port of the metrics endpoint (0 picks a free port)",
+    "profile_run_cprofile_default": "Profile the run (cprofile by default, or low-overhead sample) and save .pstats/.collapsed files next to the record",
+    "knowledge_base_file_help": "Knowledge base file (JSON, or YAML with PyYAML) with the tests, diseases, personalities and test-disease relevance to use",
+    "knowledge_base_loaded": "📚 Knowledge base: {path} ({tests} tests, {diseases} diseases)",
+    "seed_help": "Seed for reproducible rounds: each round draws its case, test results and patient behaviour from its own stream derived from the seed and round number",
+    "resume_run_help": "Continue an interrupted run from its checkpoint in medical_records (rounds, backends and knowledge base come from the checkpoint)",
+    "no_checkpoint_for_run": "no checkpoint for run {run_id} in {records_dirc} (finished runs remove their checkpoint)",
+    "resuming_run": "♻️ Resuming run {run_id}: {completed}/{total_rounds} rounds already finished",
+    "resume_hint": "{yellow}💾 {completed} finished rounds are checkpointed; continue with --resume {run_id}{reset_all}",
+    "batch_help": "Batch evaluation: queue every disease × personality scenario (see --batch-*) in a local SQLite job queue and run it with --workers; rerunning the same command resumes it",
+    "batch_repeats_help": "Consultations per disease × personality scenario",
+    "batch_diseases_help": "Comma-separated diseases to evaluate (default: all)",
+    "batch_personalities_help": "Comma-separated personalities to evaluate (default: all)",
+    "batch_name_help": "Batch ID (default: derived from the scenario matrix and settings)",
+    "workers_help": "Consultations run at once by --batch",
+    "batch_target_ci_help": "Adaptive batch: after the --batch-repeats pass, add consultations to the disease × personality scenarios whose success-rate 95%% interval is widest until every half-width is at most this (e.g. 0.1)",
+    "batch_max_rounds_help": "Most consultations an adaptive batch (--batch-target-ci) may run",
+    "batch_target_ci_range": "--batch-target-ci must be between 0 and 0.5",
+    "batch_unknown_names": "{option}: unknown names: {names}",
+    "batch_counts_positive": "--batch-repeats, --batch-max-rounds and --workers must be at least 1",
+    "batch_settings_differ": "Batch {batch_id} already exists with different settings; choose another --batch-name",
+    "batch_opened": "📦 Batch {batch_id}: {total} consultations, {done} done, {pending} to run with {workers} workers (queue: {queue_file})",
+    "batch_progress": "⏳ {done}/{total} done, {failed} failed, {rate:.2f} consultations/s",
+    "batch_job_failed": "❌ Consultation {round_number} ({disease}, {personality}) failed: {e}; {final}",
+    "round_llm_calls_failed": "{failed} LLM calls failed during the consultation",
+    "batch_will_retry": "will retry",
+    "batch_giving_up": "giving up",
+    "batch_paused": "\n⏸️ Batch paused with {done}/{total} done; run the same command again to continue",
+    "batch_failed_jobs": "⚠️ {failed} consultations failed after {attempts} attempts; run the same command again to retry them",
+    "batch_complete": "✅ Batch {batch_id} complete: {total} consultations, success rate {success_rate:.1%} ({seconds:.0f}s this run)",
+    "batch_allocation": "🎯 Adaptive allocation: {rounds} consultations over {cells} scenarios, widest interval ±{widest:.1%} ({widest_cell}), target ±{target:.1%}, {above} scenarios above target; a uniform matrix with the same worst-case precision needs {uniform}",
+    "batch_by_disease": "📊 By disease:",
+    "batch_by_personality": "📊 By personality:",
+    "batch_group_line": "  {name}: success {success_rate:.0%}, diagnosis accuracy {diagnosis_accuracy:.0%}, cost ratio {avg_cost_ratio:.2f} ({rounds} rounds)",
+    "serve_help": "Run as a local HTTP/JSON service: start consultations, post doctor/patient turns, order tests and fetch diagnoses over an API",
+    "serve_port_help": "Port of the consultation service (0 picks a free port)",
+    "service_listening": "🌐 Consultation service at http://{host}:{port}/consultations ({workers} workers), Ctrl-C to stop",
+    "service_stopped": "\n{yellow}Consultation service stopped{reset_all}",
+    "service_bad_request": "Malformed request or body too large",
+    "service_bad_json": "Request body must be a JSON object",
+    "service_no_route": "No such endpoint: {method} {path}",
+    "service_unknown_consultation": "Unknown consultation: {session_id}",
+    "service_too_many_sessions": "Too many open consultations (limit {max_sessions}), try again later",
+    "service_consultation_finished": "Consultation {session_id} is already finished",
+    "service_round_over": "Consultation is over ({reason}); only a diagnosis is accepted",
+    "service_unknown_test": "Unknown test: {test}",
+    "service_bad_role": "A turn needs role \"doctor\" or \"patient\"",
+    "service_expected_text": "Field \"{key}\" needs text",
+    "service_internal_error": "Internal error: {e}",
+    "llm_backend_expects_site": "--llm-backend expects SITE=NAME, got: {item}",
+    "program_interrupted_user": "\n\n{yellow}Program interrupted by user{reset_all}",
+    "program_error": "\n{red}❌ Program error: {e}{reset_all}",
+
+    # Fallback text
+    "no_specific_symptoms": "no specific symptoms",
+    "none": "None"
+}
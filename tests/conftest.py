@@ -0,0 +1,117 @@
+"""Shared fixtures: a fresh engine per test, with its data directory in tmp_path
+
+Every test gets its own engine module (own MedicalConfig), so settings changed by
+one test never leak into another, and records or doctor memory land in tmp_path
+instead of the edition folders.
+"""
+
+import itertools
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from medical_engine import load_engine  # noqa: E402
+
+_module_ids = itertools.count()
+
+
+def make_engine(edition: str, data_dir: str):
+    """Load a fresh copy of an edition's engine with its data directory at data_dir"""
+    module = load_engine(edition, str(data_dir), module_name=f"test_engine_{edition.lower()}_{next(_module_ids)}")
+    config = module.MedicalConfig
+    config.RECORDS_DIRC = os.path.join(data_dir, "medical_records")
+    config.DOCTOR_MEMORY_DIR = os.path.join(data_dir, "doctor_memory")
+    config.ROUND_LOGS_DIR = os.path.join(data_dir, "round_logs")
+    config.DEEPSEEK_API_KEY = ""
+    for directory in (config.RECORDS_DIRC, config.DOCTOR_MEMORY_DIR, config.ROUND_LOGS_DIR):
+        os.makedirs(directory, exist_ok=True)  # As MedicalConfig.validate() does at startup
+    return module
+
+
+@pytest.fixture(params=["EN", "CN"])
+def engine(request, tmp_path):
+    """The engine of each edition"""
+    module = make_engine(request.param, str(tmp_path))
+    yield module
+    sys.modules.pop(module.__name__, None)
+
+
+@pytest.fixture
+def en(tmp_path):
+    """The English engine, for tests that match English text"""
+    module = make_engine("EN", str(tmp_path))
+    yield module
+    sys.modules.pop(module.__name__, None)
+
+
+@pytest.fixture
+def cn(tmp_path):
+    """The Chinese engine, for tests that match Chinese text"""
+    module = make_engine("CN", str(tmp_path))
+    yield module
+    sys.modules.pop(module.__name__, None)
+
+
+class ScriptedClient:
+    """Stands in for DeepSeekClient: records every request and answers with a fixed reply
+
+    reply may be a string or a callable (site, messages) -> str.
+    """
+
+    def __init__(self, reply="OK", tokens: int = 0):
+        self.reply = reply
+        self.tokens = tokens  # Reported by last_call_tokens
+        self.calls = []  # (site, messages) per request
+
+    def chat(self, system_prompt: str, user_message: str, temperature: float = 0.7, site: str = "default") -> str:
+        return self.chat_messages([{"role": "system", "content": system_prompt},
+                                   {"role": "user", "content": user_message}], temperature, site)
+
+    def chat_messages(self, messages, temperature: float = 0.7, site: str = "default") -> str:
+        messages = [dict(message) for message in messages]
+        self.calls.append((site, messages))
+        return self.reply(site, messages) if callable(self.reply) else self.reply
+
+    def last_call_tokens(self) -> int:
+        return self.tokens
+
+    def failed_calls(self) -> int:
+        return 0
+
+    def add_failed_calls(self, count: int):
+        pass
+
+    def sites(self):
+        return [site for site, _ in self.calls]
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI below a real DeepSeekClient
+
+    Replies with reply (a string, or a callable messages -> str) and 10 + 5 tokens of usage;
+    raises ConnectionError while failing is set and for the next fail_next requests.
+    """
+
+    def __init__(self, reply="OK"):
+        self.reply = reply
+        self.failing = False
+        self.fail_next = 0
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def install(self, engine) -> "FakeOpenAI":
+        """Make every backend client the engine creates from now on this one"""
+        engine.OpenAI = lambda **kwargs: self
+        return self
+
+    def create(self, model, messages, temperature, max_tokens):
+        self.requests.append(messages)
+        if self.failing or self.fail_next > 0:
+            self.fail_next -= 1
+            raise ConnectionError("backend unavailable")
+        content = self.reply(messages) if callable(self.reply) else self.reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                               usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
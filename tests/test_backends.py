@@ -0,0 +1,39 @@
+"""BackendRegistry: each LLM call site is served by the backend it is routed to"""
+
+import pytest
+
+from conftest import FakeOpenAI
+
+
+def test_routes_override_the_default(engine):
+    registry = engine.BackendRegistry.from_config({"patient": "local"})
+
+    assert registry.resolve("patient").name == "local"
+    assert registry.resolve("diagnosis").name == "deepseek"
+    assert registry.uses("local") and registry.uses("deepseek")
+
+    registry.route("all", "local")
+    assert set(registry.describe().values()) == {"local"}
+
+
+def test_unknown_backend_or_site_is_refused(engine):
+    registry = engine.BackendRegistry.from_config()
+
+    with pytest.raises(ValueError):
+        registry.route("patient", "missing")
+    with pytest.raises(ValueError):
+        registry.route("nowhere", "local")
+    with pytest.raises(ValueError):
+        engine.BackendRegistry.from_config({"patient": "missing"})
+
+
+def test_client_sends_each_site_to_its_backend(engine):
+    engine.MedicalConfig.SHOW_AI_THINKING = False
+    clients = {}
+    engine.OpenAI = lambda **kwargs: clients.setdefault(kwargs["base_url"], FakeOpenAI(kwargs["base_url"]))
+    client = engine.DeepSeekClient(engine.BackendRegistry.from_config({"patient": "local"}))
+
+    assert client.chat("system", "user", site="patient") == engine.MedicalConfig.LLM_BACKENDS["local"]["base_url"]
+    assert client.chat("system", "user", site="diagnosis") == engine.MedicalConfig.DEEPSEEK_BASE_URL
+    report = client.get_cache_report()
+    assert (report["patient"]["backend"], report["diagnosis"]["backend"]) == ("local", "deepseek")
@@ -0,0 +1,114 @@
+"""Batch evaluation: the SQLite job queue and the worker pool (--batch)"""
+
+import json
+import os
+
+import pytest
+
+from conftest import FakeOpenAI
+
+
+@pytest.fixture
+def queue(engine, tmp_path):
+    queue = engine.BatchQueue(os.path.join(str(tmp_path), "queue.sqlite3"))
+    yield queue
+    queue.close()
+
+
+SCENARIOS = [("flu", "calm"), ("flu", "anxious"), ("cold", "calm")]
+
+
+def test_reopening_a_batch_adds_nothing(queue):
+    queue.open_batch("b", {"seed": 1}, SCENARIOS)
+    queue.open_batch("b", {"seed": 1}, SCENARIOS)
+    assert queue.counts("b") == {"pending": 3}
+
+
+def test_other_settings_under_the_same_id_are_refused(queue):
+    queue.open_batch("b", {"seed": 1}, SCENARIOS)
+    with pytest.raises(ValueError):
+        queue.open_batch("b", {"seed": 2}, SCENARIOS)
+
+
+def test_failed_job_is_retried_after_fresh_ones_then_given_up(queue):
+    queue.open_batch("b", {}, SCENARIOS)
+    assert queue.claim("b", "w") == (0, "flu", "calm")
+    assert queue.fail("b", 0, "boom", max_attempts=2) is False
+    assert queue.claim("b", "w")[0] == 1  # Fewest attempts first
+    queue.complete("b", 1, {"n": 1})
+    assert queue.claim("b", "w")[0] == 2
+    queue.complete("b", 2, {"n": 2})
+    assert queue.claim("b", "w")[0] == 0
+    assert queue.fail("b", 0, "boom", max_attempts=2) is True
+    assert queue.claim("b", "w") is None
+    assert queue.counts("b") == {"done": 2, "failed": 1}
+
+
+def test_reopening_makes_interrupted_and_failed_jobs_runnable(queue):
+    queue.open_batch("b", {}, SCENARIOS)
+    queue.claim("b", "w")  # Left running by a crash
+    queue.claim("b", "w")
+    queue.fail("b", 1, "boom", max_attempts=1)
+    queue.open_batch("b", {}, SCENARIOS)
+    assert queue.counts("b") == {"pending": 3}
+
+
+def test_results_in_job_order_and_appended_jobs(queue):
+    queue.open_batch("b", {}, SCENARIOS[:2])
+    queue.add_jobs("b", 2, [("cold", "calm")])
+    for _ in range(3):
+        index = queue.claim("b", "w")[0]
+        queue.complete("b", index, {"index": index})
+    assert [r["index"] for r in queue.results("b")] == [0, 1, 2]
+
+
+def make_runner(engine, workers=2, **kwargs):
+    config = engine.MedicalConfig
+    return engine.BatchRunner(config.DISEASE_LIBRARY[:2], list(config.PERSONALITY_TYPES)[:2], 2, workers,
+                              offline=kwargs.pop("offline", True), seed=kwargs.pop("seed", 4), **kwargs)
+
+
+def outcomes(engine, batch_id):
+    with open(os.path.join(engine.MedicalConfig.RECORDS_DIRC, f"program_{batch_id}.json"), encoding="utf-8") as f:
+        results = json.load(f)["program_results"]
+    return [(r["true_disease"], r["personality"], r["success"], r["total_cost"]) for r in results]
+
+
+def test_seeded_batch_is_independent_of_workers_and_idempotent(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+    runner = make_runner(engine, workers=1, name="one")
+    first = outcomes(engine, runner.run())
+    assert len(first) == 8
+    assert outcomes(engine, make_runner(engine, workers=3, name="three").run()) == first
+    rerun = make_runner(engine, workers=3, name="one")
+    assert rerun.run() == "one"
+    assert rerun.finished_now == 0  # Nothing left to play
+
+
+def test_llm_outage_is_retried_instead_of_stored(engine):
+    engine.MedicalConfig.DEEPSEEK_API_KEY = "test"
+    llm = FakeOpenAI("...").install(engine)
+    runner = make_runner(engine, workers=1, offline=False, patient_backend="offline")
+    llm.fail_next = 1  # The first consultation's first call fails
+    batch_id = runner.run()
+    assert batch_id and len(outcomes(engine, batch_id)) == 8
+    assert runner.failed_now == 0
+    queue = engine.BatchQueue(os.path.join(engine.MedicalConfig.RECORDS_DIRC, runner.QUEUE_FILE))
+    attempts = dict(queue.conn.execute("SELECT job_index, attempts FROM jobs WHERE batch_id = ?", (batch_id,)))
+    queue.close()
+    assert attempts == {0: 2, **{i: 1 for i in range(1, 8)}}
+
+    # Every memory entry names the batch job it came from
+    with open(os.path.join(engine.MedicalConfig.DOCTOR_MEMORY_DIR, "doctor_memory.json"), encoding="utf-8") as f:
+        run_ids = [entry["run_id"] for entry in json.load(f)]
+    assert sorted(run_ids) == sorted(f"{batch_id}/{i}" for i in range(1, 9))
+
+
+def test_llm_outage_that_persists_fails_the_batch(engine):
+    engine.MedicalConfig.DEEPSEEK_API_KEY = "test"
+    engine.MedicalConfig.BATCH_MAX_ATTEMPTS = 2
+    llm = FakeOpenAI("...").install(engine)
+    llm.failing = True
+    runner = make_runner(engine, workers=2, offline=False, patient_backend="offline")
+    assert runner.run() is None
+    assert runner.failed_now == 8
@@ -0,0 +1,54 @@
+"""Multi-turn chat sessions (CHAT_SESSION_SITES)"""
+
+from conftest import ScriptedClient
+
+
+def make_case(engine):
+    config = engine.MedicalConfig
+    return engine.OfflineCaseGenerator(None).generate_case(config.DISEASE_LIBRARY[0],
+                                                           next(iter(config.PERSONALITY_TYPES)))
+
+
+def test_default_sessions_only_for_doctor_questions(engine):
+    assert engine.MedicalConfig.CHAT_SESSION_SITES == ("question",)
+    client = ScriptedClient("...")
+    doctor = engine.DoctorAgent(client)
+    doctor.start_session()
+    patient = engine.PatientAgent(client, make_case(engine))
+    patient.get_initial_complaint()
+    patient.respond_to_question("?")
+    patient.respond_to_question("??")
+    assert patient.session is None
+    # Stateless patient prompts: one system and one user message each time
+    assert all(len(messages) == 2 for site, messages in client.calls if site == "patient")
+
+    history = [{"role": "patient", "content": "fever-first"}]
+    doctor.generate_question(history)
+    history += [{"role": "doctor", "content": "OK"}, {"role": "patient", "content": "cough-second"}]
+    doctor.generate_question(history)
+    site, messages = client.calls[-1]
+    assert site == "question"
+    # The second request extends the first one with only the new patient line
+    assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+    assert "cough-second" in messages[-1]["content"] and "fever-first" not in messages[-1]["content"]
+
+
+def test_patient_sessions_when_enabled(engine):
+    engine.MedicalConfig.CHAT_SESSION_SITES = ("question", "patient")
+    client = ScriptedClient("...")
+    patient = engine.PatientAgent(client, make_case(engine))
+    patient.get_initial_complaint()
+    for question in ("one", "two"):
+        patient.rng.random = lambda: 1.0  # Never misunderstand
+        patient.respond_to_question(question)
+    site, messages = client.calls[-1]
+    assert site == "patient"
+    assert [m["role"] for m in messages] == ["system", "user", "assistant", "user", "assistant", "user"]
+
+
+def test_session_window_drops_turns_in_one_chunk(engine):
+    session = engine.ChatSession("system", max_messages=4)
+    for i in range(5):
+        session.add("user" if i % 2 == 0 else "assistant", str(i))
+    assert [m["content"] for m in session.messages()] == ["system", "4"]
+    assert session.dropped_turns == 4
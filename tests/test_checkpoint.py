@@ -0,0 +1,82 @@
+"""Checkpointed runs and --resume"""
+
+import os
+import random
+
+import pytest
+
+
+def interrupted_run(engine, total_rounds: int, stop_before: int, **program_args):
+    """Run a program that is interrupted before round stop_before; returns the program"""
+    program = engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, **program_args)
+    play_round = program.play_round
+
+    def play_until_interrupted(*args, **kwargs):
+        if len(program.program_results) + 1 == stop_before:
+            raise KeyboardInterrupt
+        return play_round(*args, **kwargs)
+
+    program.play_round = play_until_interrupted
+    with pytest.raises(KeyboardInterrupt):
+        program.run_program(total_rounds)
+    return program
+
+
+def outcomes(results):
+    return [(r["true_disease"], r["personality"], r["success"], r["total_cost"]) for r in results]
+
+
+@pytest.fixture(autouse=True)
+def no_long_term_memory(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+
+
+@pytest.mark.parametrize("seed", [None, 11])
+def test_resume_matches_uninterrupted_run(engine, seed):
+    random.seed(5)
+    full = engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, seed=seed)
+    full.run_program(6)
+
+    random.seed(5)
+    stopped = interrupted_run(engine, 6, stop_before=4, seed=seed)
+    checkpoint = engine.CheckpointJournal(stopped.run_id).load()
+    assert len(checkpoint.entries) == 3
+
+    random.seed(999)  # The unseeded run's random state comes from the checkpoint
+    resumed = engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, seed=seed)
+    resumed.run_program(6, resume=checkpoint)
+    assert outcomes(resumed.program_results) == outcomes(full.program_results)
+    assert not os.path.exists(checkpoint.path)  # Removed once the complete record is saved
+
+
+def test_torn_last_line_is_ignored(engine):
+    stopped = interrupted_run(engine, 5, stop_before=3, seed=1)
+    journal = engine.CheckpointJournal(stopped.run_id)
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"result": {"tru')
+    assert len(journal.load().entries) == 2
+
+
+def test_checkpoint_keeps_backend_routes_and_flags(engine):
+    config = engine.MedicalConfig
+    config.ENABLE_HEDGING = True
+    config.HEDGE_BACKEND = "backup"
+    config.ENABLE_SPECULATIVE_QUESTIONS = True
+    stopped = interrupted_run(engine, 3, stop_before=2, seed=3, backend_routes={"patient": "local"})
+    settings = engine.CheckpointJournal(stopped.run_id).load().settings
+
+    args = engine.build_parser().parse_args(["--resume", stopped.run_id, "--rounds", "9"])
+    engine.apply_checkpoint_settings(args, settings)
+    assert args.rounds == 3 and args.seed == 3 and args.offline and args.auto
+    assert args.llm_backend == ["patient=local"]
+    assert args.hedge and args.hedge_backend == "backup"
+    assert args.speculate
+    assert not args.trace and not args.trace_otel
+
+
+def test_old_checkpoint_keeps_command_line_flags(engine):
+    args = engine.build_parser().parse_args(["--hedge", "--llm-backend", "question=local"])
+    engine.apply_checkpoint_settings(args, {"total_rounds": 4, "auto_mode": True, "offline": False,
+                                            "patient_backend": "llm", "seed": None,
+                                            "knowledge_base": engine.MedicalConfig.KNOWLEDGE_BASE})
+    assert args.hedge and args.llm_backend == ["question=local"]
@@ -0,0 +1,15 @@
+"""Command line of both editions"""
+
+
+def test_help_renders(engine):
+    # argparse %-formats help strings, so a bare "%" in a locale message breaks --help
+    help_text = engine.build_parser().format_help()
+    assert "--batch-target-ci" in help_text
+    assert "--resume" in help_text
+
+
+def test_defaults(engine):
+    args = engine.build_parser().parse_args([])
+    assert args.rounds == 5
+    assert args.workers == engine.MedicalConfig.BATCH_WORKERS
+    assert args.batch_target_ci is None
@@ -0,0 +1,42 @@
+"""ContextBudgetManager: diagnosis context is only reordered or trimmed over budget"""
+
+
+def make_manager(engine, token_budget: int, recent_turns: int = 6):
+    extractor = engine.SymptomExtractor(engine.MedicalConfig.SYMPTOM_SYNONYMS)
+    return engine.ContextBudgetManager(token_budget, recent_turns, extractor)
+
+
+def make_dialogue(turns: int):
+    return [{"role": "doctor" if turn % 2 == 0 else "patient", "content": f"turn {turn} " + "words " * 10}
+            for turn in range(turns)]
+
+
+TEST_LINES = ["Blood test: normal", "Chest X-ray: shadow in the left lung", "Blood test: normal", "ECG: normal"]
+PRIORITIES = {"Chest X-ray: shadow in the left lung": 2.0, "ECG: normal": 0.5}
+
+
+def test_under_budget_keeps_test_order_and_only_deduplicates(engine):
+    compressed = make_manager(engine, 10000).compress(make_dialogue(4), TEST_LINES, "", PRIORITIES)
+
+    assert compressed["test_text"].split("\n") == ["Blood test: normal", "Chest X-ray: shadow in the left lung",
+                                                   "ECG: normal"]
+    report = compressed["report"]
+    assert (report["summarized_turns"], report["duplicate_test_lines"], report["dropped_test_lines"]) == (0, 1, 0)
+
+
+def test_over_budget_ranks_tests_and_drops_the_least_relevant(engine):
+    compressed = make_manager(engine, 60, recent_turns=2).compress(make_dialogue(12), TEST_LINES, "", PRIORITIES)
+
+    assert compressed["test_text"] == "Chest X-ray: shadow in the left lung"
+    assert compressed["report"]["dropped_test_lines"] == 2
+    assert compressed["report"]["summarized_turns"] == 10
+
+
+def test_summarizing_older_turns_fits_the_budget(engine):
+    dialogue = make_dialogue(20)
+    compressed = make_manager(engine, 200).compress(dialogue, [], "")
+
+    report = compressed["report"]
+    assert report["summarized_turns"] > 0
+    assert report["compressed_tokens"] <= 200 < report["original_tokens"]
+    assert compressed["dialogue_text"].endswith(dialogue[-1]["content"])
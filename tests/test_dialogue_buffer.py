@@ -0,0 +1,30 @@
+"""DialogueBuffer: rendered lines and token estimates kept current as turns are appended"""
+
+
+def make_turns(count: int):
+    return [{"role": "doctor" if turn % 2 == 0 else "patient", "content": f"message {turn}"} for turn in range(count)]
+
+
+def test_render_and_tokens_match_a_full_rebuild(en):
+    buffer = en.DialogueBuffer()
+    turns = make_turns(7)
+    for count, turn in enumerate(turns, 1):
+        buffer.append(turn)
+        lines = [f"{message['role']}: {message['content']}" for message in turns[:count]]
+        assert buffer.render() == "\n".join(lines)
+        assert buffer.render(last=3) == "\n".join(lines[-3:])
+        assert buffer.tokens() == sum(en.DialogueBuffer.estimate_tokens(line) for line in lines)
+        assert buffer.tokens(last=2) == sum(en.DialogueBuffer.estimate_tokens(line) for line in lines[-2:])
+
+
+def test_buffer_is_still_a_list(en):
+    turns = make_turns(3)
+    buffer = en.DialogueBuffer(turns)
+
+    assert buffer == turns and buffer[-1]["content"] == "message 2"
+    assert en.DialogueBuffer.wrap(buffer) is buffer
+    assert isinstance(en.DialogueBuffer.wrap(turns), en.DialogueBuffer)
+
+
+def test_chinese_text_counts_more_tokens_per_character(en):
+    assert en.DialogueBuffer.estimate_tokens("头疼发烧三天了") > en.DialogueBuffer.estimate_tokens("abcdefg")
@@ -0,0 +1,141 @@
+"""Request hedging (--hedge): losers are cancelled and their tokens counted before the report"""
+
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+
+def warm_hedger(engine, site="question"):
+    """Hedger that has seen enough fast calls to hedge anything slower than 0.05s"""
+    hedger = engine.RequestHedger(0.95, min_samples=5, min_delay=0.05, max_extra_fraction=1.0)
+    for _ in range(5):
+        hedger.run(site, lambda cancel: "warm-up", None, None)
+    return hedger
+
+
+def test_loser_is_cancelled_and_counted_before_drain_returns(en):
+    hedger = warm_hedger(en)
+    closed = threading.Event()
+    finish = threading.Event()
+
+    def primary(cancel):
+        cancel.on_cancel(closed.set)
+        finish.wait(5)
+        return "primary"
+
+    def hedge(cancel):
+        return "hedge"
+
+    def on_discard(result):
+        hedger.record_wasted("question", 30, cancelled=True)
+
+    assert hedger.run("question", primary, hedge, on_discard) == "hedge"
+    assert closed.wait(1)  # The losing request was closed instead of left running
+
+    draining = threading.Thread(target=hedger.drain)
+    draining.start()
+    draining.join(0.2)
+    assert draining.is_alive()  # Still waiting for the loser to finish
+    finish.set()
+    draining.join(5)
+
+    stats = hedger.get_report()["question"]
+    assert (stats["hedged"], stats["hedge_wins"], stats["cancelled"], stats["wasted_tokens"]) == (1, 1, 1, 30)
+
+
+class StreamingOpenAI:
+    """Stands in for openai.OpenAI with streamed completions; the first request stalls"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.requests = 0
+        self.closed = []
+        self.lock = threading.Lock()
+
+    def create(self, **request):
+        assert request["stream"] and request["stream_options"] == {"include_usage": True}
+        with self.lock:
+            self.requests += 1
+            stalled = self.requests == 1
+        return FakeStream(self, stalled)
+
+
+class FakeStream:
+    def __init__(self, client, stalled: bool):
+        self.client = client
+        self.stalled = stalled
+        self.abort = threading.Event()
+
+    def __iter__(self):
+        for text in ("stream", "ed"):
+            if self.stalled and self.abort.wait(5):
+                raise ConnectionError("stream closed")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2))
+
+    def close(self):
+        self.client.closed.append(self.stalled)
+        self.abort.set()
+
+
+def test_client_closes_the_stalled_stream_and_counts_its_tokens(en):
+    config = en.MedicalConfig
+    config.ENABLE_HEDGING = True
+    config.SHOW_AI_THINKING = False
+    fake = StreamingOpenAI()
+    en.OpenAI = lambda **kw: fake
+    client = en.DeepSeekClient()
+    client.hedger = warm_hedger(en)
+
+    assert client.chat("system", "user", site="question") == "streamed"
+    client.hedger.drain()
+
+    stats = client.hedger.get_report()["question"]
+    assert (stats["hedge_wins"], stats["cancelled"]) == (1, 1)
+    assert stats["wasted_tokens"] > 0  # Estimated, since the stream ended before its usage chunk
+    assert True in fake.closed
+    assert client.get_cache_report()["question"]["prompt_tokens"] == 10  # Only the winner is billed as usage
+
+
+def test_saved_record_counts_losers_still_running_at_the_end(en):
+    en.MedicalConfig.SHOW_AI_THINKING = False
+    program = en.MedicalDiagnosisprogram(auto_mode=True, offline=True)
+    program.console = False
+    hedger = warm_hedger(en)
+    program.api_client = SimpleNamespace(hedger=hedger, single_flight=None, get_cache_report=dict,
+                                         failed_calls=lambda: 0, registry=SimpleNamespace(describe=dict))
+    finish = threading.Event()
+
+    def primary(cancel):
+        finish.wait(5)  # Ignores cancellation, like a client that cannot abort a request
+        return "primary"
+
+    hedger.run("question", primary, lambda cancel: "hedge", lambda result: hedger.record_wasted("question", 25))
+    threading.Timer(0.5, finish.set).start()
+    program.run_program(1)
+
+    with open(os.path.join(en.MedicalConfig.RECORDS_DIRC, f"program_{program.run_id}.json"), encoding="utf-8") as f:
+        record = json.load(f)
+    assert record["hedging"]["question"]["wasted_tokens"] == 25
+
+
+def test_concurrent_callers_beyond_the_pool_are_not_hedged(en):
+    hedger = en.RequestHedger(0.95, min_samples=5, min_delay=0.2, max_extra_fraction=1.0, max_workers=4)
+    for _ in range(5):
+        hedger.run("question", lambda cancel: "warm-up", None, None)
+
+    def primary(cancel):
+        time.sleep(0.1)  # Well under the hedge delay, but 16 callers share 4 threads
+        return "primary"
+
+    callers = [threading.Thread(target=hedger.run, args=("question", primary, lambda cancel: "hedge", None))
+               for _ in range(16)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join(10)
+
+    assert hedger.get_report()["question"]["hedged"] == 0
+    assert max(hedger.latencies["question"]) < 0.2  # Queueing for a thread is not counted as latency
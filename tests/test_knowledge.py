@@ -0,0 +1,103 @@
+"""Knowledge base files: validation, compiled cache, sparse relevance and the disease posterior"""
+
+import json
+import os
+
+import pytest
+
+from medical_engine import knowledge
+
+KNOWLEDGE_DIR = os.path.dirname(knowledge.__file__)
+
+TABLES = {
+    "tests": [{"name": "Blood Test", "cost": 50, "accuracy": 0.9}, {"name": "X-ray", "cost": 120, "accuracy": 0.8}],
+    "diseases": ["Cold", "Flu", "Pneumonia"],
+    "personalities": {"Calm": {"suspicion_gain": 0.1, "cost_sensitivity": 0.5, "ideal_cost_range": [100, 200]}},
+    "relevance": {"Blood Test": {"Flu": 0.6}, "X-ray": {"Pneumonia": 0.9, "Cold": 0.2}}
+}
+
+
+def write_tables(tmp_path, tables, name="kb.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(tables), encoding="utf-8")
+    return str(path)
+
+
+def test_bundled_knowledge_bases_load():
+    for name in ("en.json", "cn.json"):
+        kb = knowledge.load_knowledge_base(os.path.join(KNOWLEDGE_DIR, name), use_cache=False)
+        assert kb.tests and kb.diseases and kb.personality_types and kb.relevance.nnz
+
+
+def test_compiled_cache_is_reused_until_the_file_changes(tmp_path):
+    path = write_tables(tmp_path, TABLES)
+    knowledge.forget_loaded()  # Same content as other tests' files, so it may be memoized already
+    kb = knowledge.load_knowledge_base(path)
+    cached = knowledge.cache_path(path, kb.digest)
+    assert os.path.exists(cached)
+
+    knowledge.forget_loaded()
+    assert knowledge.load_knowledge_base(path).digest == kb.digest
+
+    changed = dict(TABLES, diseases=TABLES["diseases"] + ["Asthma"])
+    write_tables(tmp_path, changed)
+    knowledge.forget_loaded()
+    assert "Asthma" in knowledge.load_knowledge_base(path).diseases
+    assert not os.path.exists(cached)  # Stale compiled copies are cleaned up
+
+
+def test_cache_cleanup_keeps_other_files_with_dotted_names(tmp_path):
+    caches = []
+    for name, diseases in (("my.kb.json", ["Asthma"]), ("my.json", ["Gout"]), ("my.kb.extra.json", ["Mumps"])):
+        path = write_tables(tmp_path, dict(TABLES, diseases=TABLES["diseases"] + diseases), name)
+        knowledge.forget_loaded()
+        caches.append(knowledge.cache_path(path, knowledge.load_knowledge_base(path).digest))
+    assert all(os.path.exists(cached) for cached in caches)
+
+
+def test_every_problem_is_reported_at_once(tmp_path):
+    broken = dict(TABLES, tests=[{"name": "Blood Test", "cost": -1, "accuracy": 2}],
+                  relevance={"X-ray": {"Flu": 0.5}, "Blood Test": {"Measles": 0.5}})
+
+    with pytest.raises(knowledge.KnowledgeBaseError) as error:
+        knowledge.load_knowledge_base(write_tables(tmp_path, broken), use_cache=False)
+    message = str(error.value)
+    for problem in ("cost must be", "accuracy must be", "relevance.X-ray: unknown test", "unknown disease"):
+        assert problem in message
+
+
+def test_relevance_lookups(tmp_path):
+    kb = knowledge.load_knowledge_base(write_tables(tmp_path, TABLES), use_cache=False)
+
+    assert kb.relevance_of("X-ray", "Pneumonia") == 0.9
+    assert kb.relevance_of("X-ray", "Flu", default=0.1) == 0.1
+    assert kb.relevance_of("MRI", "Flu", default=0.1) == 0.1
+    assert kb.relevant_tests("Cold") == [("X-ray", 0.2)]
+    assert kb.test_costs == {"Blood Test": 50, "X-ray": 120}
+
+
+def dense_posterior(kb, observations, default_relevance):
+    """Bayes over every disease, without the sparse shortcuts"""
+    weights = {disease: 1.0 for disease in kb.diseases}
+    for test, positive in observations:
+        accuracy = kb.test_accuracy[test]
+        for disease in weights:
+            chance = accuracy * kb.relevance_of(test, disease, default_relevance)
+            weights[disease] *= chance if positive else 1 - chance
+    total = sum(weights.values())
+    return {disease: weight / total for disease, weight in weights.items()}
+
+
+def test_posterior_matches_dense_bayes(tmp_path):
+    kb = knowledge.load_knowledge_base(write_tables(tmp_path, TABLES), use_cache=False)
+    posterior = knowledge.DiseasePosterior(kb, default_relevance=0.1)
+    observations = [("X-ray", True), ("Blood Test", False), ("X-ray", True), ("MRI", True)]
+    for test, positive in observations:
+        posterior.observe(test, positive)
+
+    expected = dense_posterior(kb, observations[:3], 0.1)  # Unknown tests are ignored
+    for disease, probability in expected.items():
+        assert posterior.probability(disease) == pytest.approx(probability)
+    ranked = sorted(expected, key=expected.get, reverse=True)
+    assert [disease for disease, _ in posterior.top(2)] == ranked[:2]
+    assert posterior.observations == 3
@@ -0,0 +1,32 @@
+"""Metrics (--metrics-port): Prometheus text exposition"""
+
+import urllib.request
+
+
+def test_counters_and_histograms_render(en):
+    registry = en.MetricsRegistry()
+    registry.inc("doctor_questions_total")  # Ignored until enabled
+    registry.enabled = True
+    registry.inc("doctor_llm_calls_total", site="question", backend="local")
+    registry.inc("doctor_llm_calls_total", 2, site="question", backend="local")
+    registry.observe("doctor_llm_latency_seconds", 0.3, site="question")
+
+    lines = registry.render().splitlines()
+    assert 'doctor_llm_calls_total{backend="local",site="question"} 3' in lines
+    assert not any(line.startswith("doctor_questions_total") for line in lines)
+    assert 'doctor_llm_latency_seconds_bucket{site="question",le="0.25"} 0' in lines
+    assert 'doctor_llm_latency_seconds_bucket{site="question",le="0.5"} 1' in lines
+    assert 'doctor_llm_latency_seconds_count{site="question"} 1' in lines
+
+
+def test_metrics_server_serves_the_registry(en):
+    server = en.start_metrics_server("127.0.0.1", 0)
+    try:
+        en.metrics.inc("doctor_tests_total")
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert "doctor_tests_total 1" in body.splitlines()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,33 @@
+"""Offline backend: rule-based patient and doctor, no API calls"""
+
+
+def make_patient(engine, personality: str):
+    disease = next(iter(engine.MedicalConfig.DISEASE_SYMPTOM_FACTS))
+    case = {"true_disease": disease, "symptoms_description": "", "personality": personality, "ideal_cost": 200}
+    return engine.OfflinePatientAgent(None, case)
+
+
+def conversation(patient, questions):
+    return [patient.get_initial_complaint()] + [patient.respond_to_question(q) for q in questions]
+
+
+def test_same_case_gives_the_same_conversation(engine):
+    personality = next(iter(engine.MedicalConfig.PERSONALITY_TYPES))
+    questions = engine.L.OFFLINE_QUESTIONS[:4]
+
+    patient = make_patient(engine, personality)
+    first = conversation(patient, questions)
+
+    assert patient.symptom_facts[0] in first[0]  # The complaint opens with the case's facts
+    assert conversation(make_patient(engine, personality), questions) == first
+
+
+def test_offline_program_makes_no_api_calls(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+    program = engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, seed=2)
+    program.console = False
+
+    assert program.api_client is None
+    result = program.play_round()
+    assert result["true_disease"] in engine.MedicalConfig.DISEASE_LIBRARY
+    assert result["questions_asked"] + result["tests_ordered"] > 0
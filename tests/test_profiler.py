@@ -0,0 +1,53 @@
+"""Run profiling (--profile): output files and the top-functions report"""
+
+import glob
+import os
+import time
+
+import pytest
+
+
+def profiled_program(engine, mode: str):
+    config = engine.MedicalConfig
+    config.PROFILE_MODE = mode
+    config.PROFILE_SAMPLE_INTERVAL = 0.001
+    config.ENABLE_LONG_TERM_MEMORY = False
+    return engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, seed=3)
+
+
+def profile_files(engine, extension: str):
+    return glob.glob(os.path.join(engine.MedicalConfig.RECORDS_DIRC, f"profile_*.{extension}"))
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_offline_round_writes_the_profile_and_reports_top_functions(en, capsys, monkeypatch, mode):
+    program = profiled_program(en, mode)
+    play_round = program.play_round
+
+    def slow_round():
+        time.sleep(0.05)  # Offline rounds are too quick for the sampler to catch
+        return play_round()
+
+    monkeypatch.setattr(program, "play_round", slow_round)
+    program.run_program(1)
+
+    assert bool(profile_files(en, "pstats")) == (mode == "cprofile")
+    [collapsed] = profile_files(en, "collapsed")
+    with open(collapsed, encoding="utf-8") as f:
+        assert f.read().strip()
+    assert program.profiler.top_functions(5)
+    assert en.L.t("top_functions_cumulative_time", mode=mode).strip() in capsys.readouterr().out
+
+
+def test_profile_is_saved_when_the_run_fails(en, monkeypatch):
+    program = profiled_program(en, "cprofile")
+    program.console = False
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(program, "play_round", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        program.run_program(2)
+
+    assert profile_files(en, "pstats") and profile_files(en, "collapsed")
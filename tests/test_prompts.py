@@ -0,0 +1,30 @@
+"""Prompt templates: a byte-identical system prompt per call site, variable content last"""
+
+from collections import defaultdict
+
+from conftest import ScriptedClient
+
+
+def test_template_prefix_is_stable_per_memory(en):
+    template = en.PromptTemplate("diagnosis", "You are a doctor.", "Diagnose the patient.")
+
+    system, user = template.render("Dialogue: ...", memory="Past cases: ...")
+    assert system == "You are a doctor.\n\nDiagnose the patient.\n\nPast cases: ..." and user == "Dialogue: ..."
+    assert template.render("Other dialogue", memory="Past cases: ...")[0] is system
+    assert template.system_prompt() == "You are a doctor.\n\nDiagnose the patient."
+
+
+def test_round_reuses_each_sites_system_prompt(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+    client = ScriptedClient("Blood Test")
+    program = engine.MedicalDiagnosisprogram(auto_mode=True, api_client=client, seed=3)
+    program.console = False
+    program.play_round(1)
+
+    system_prompts, user_messages = defaultdict(set), defaultdict(set)
+    for site, messages in client.calls:
+        system_prompts[site].add(messages[0]["content"])
+        user_messages[site].add(messages[-1]["content"])
+    for site in ("question", "evidence"):
+        assert len(system_prompts[site]) == 1
+    assert len(user_messages["evidence"]) > 1  # What changes goes after the shared prefix
@@ -0,0 +1,41 @@
+"""Seeded runs (--seed): per-round random streams"""
+
+import random
+
+import pytest
+
+KEYS = ("true_disease", "personality", "diagnosis", "questions_asked", "tests_ordered", "total_cost", "success")
+
+
+@pytest.fixture(autouse=True)
+def no_long_term_memory(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+
+
+def play(engine, seed, round_numbers):
+    """Outcome per round number, played in the given order by one offline program"""
+    program = engine.MedicalDiagnosisprogram(auto_mode=True, offline=True, seed=seed)
+    program.console = False
+    return {number: tuple(program.play_round(number)[key] for key in KEYS) for number in round_numbers}
+
+
+def test_streams_depend_only_on_seed_round_and_purpose(engine):
+    first, again = engine.RoundStreams(7, 3), engine.RoundStreams(7, 3)
+
+    assert [first.tests.random() for _ in range(3)] == [again.tests.random() for _ in range(3)]
+    assert first.case.random() != first.patient.random()
+    assert engine.RoundStreams(7, 4).case.random() != engine.RoundStreams(7, 3).case.random()
+    assert engine.RoundStreams(None, 3).case is None
+
+
+def test_round_plays_the_same_in_any_order_or_program(engine):
+    in_order = play(engine, 5, [1, 2, 3])
+
+    assert play(engine, 5, [3, 1]) == {3: in_order[3], 1: in_order[1]}
+    assert play(engine, 6, [1, 2, 3]) != in_order
+
+
+def test_seeded_round_leaves_the_global_random_state_alone(engine):
+    state = random.getstate()
+    play(engine, 5, [1])
+    assert random.getstate() == state
@@ -0,0 +1,59 @@
+"""Adaptive batches: Wilson intervals and the scenario scheduler"""
+
+import json
+import os
+
+import pytest
+
+from test_batch import make_runner
+
+CELLS = [("Flu", "Calm"), ("Flu", "Anxious"), ("Cold", "Calm")]
+
+
+def results(cell, successes: int, rounds: int):
+    disease, personality = cell
+    return [{"true_disease": disease, "personality": personality, "success": i < successes} for i in range(rounds)]
+
+
+def test_wilson_interval(engine):
+    scheduler = engine.ScenarioScheduler(CELLS, 0.1, 100, z=1.96)
+
+    assert scheduler.interval(8, 10) == pytest.approx((0.4902, 0.9433), abs=1e-4)
+    assert scheduler.interval(0, 10) == pytest.approx((0.0, 0.2775), abs=1e-4)
+    assert scheduler.interval(0, 0) == (0.0, 1.0)
+    assert scheduler.half_width(50, 100) > scheduler.half_width(95, 100)
+
+
+def test_next_wave_goes_to_the_widest_cells(engine):
+    scheduler = engine.ScenarioScheduler(CELLS, 0.2, 100, z=1.96)
+    played = results(CELLS[0], 20, 20) + results(CELLS[1], 5, 10) + results(CELLS[2], 3, 6)
+
+    wave = scheduler.next_wave(played, 8, len(played))
+    assert set(wave) == {CELLS[1], CELLS[2]}  # The settled cell gets nothing
+    assert wave[0] == CELLS[2]  # Fewest rounds at an even rate: widest interval
+
+
+def test_next_wave_stops_at_the_target_or_the_round_cap(engine):
+    scheduler = engine.ScenarioScheduler(CELLS, 0.2, 40, z=1.96)
+    settled = [r for cell in CELLS for r in results(cell, 30, 30)]
+
+    assert scheduler.next_wave(settled, 10, len(settled)) == []
+    assert len(scheduler.next_wave([], 10, 35)) == 5  # Only 5 rounds left under the cap
+    assert scheduler.next_wave([], 10, 40) == []
+
+
+def test_adaptive_batch_is_deterministic_and_within_its_cap(engine):
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+    engine.MedicalConfig.SCHEDULER_WAVE_SIZE = 4
+
+    def allocation(name, workers):
+        batch_id = make_runner(engine, workers=workers, name=name, target_width=0.3, max_rounds=20).run()
+        with open(os.path.join(engine.MedicalConfig.RECORDS_DIRC, f"program_{batch_id}.json"),
+                  encoding="utf-8") as f:
+            record = json.load(f)
+        return record["performance_summary"]["allocation"], len(record["program_results"])
+
+    first, rounds = allocation("one", 1)
+    assert rounds <= 20 and first["rounds"] == rounds
+    assert (first["widest_half_width"] <= 0.3) == (first["cells_above_target"] == 0)
+    assert allocation("two", 2) == (first, rounds)
@@ -0,0 +1,117 @@
+"""Consultation service (--serve)"""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+
+from conftest import FakeOpenAI
+
+
+def call(service, method: str, path: str, body=None):
+    """(status, payload) of one request, dispatched on a fresh event loop"""
+    raw = json.dumps(body).encode("utf-8") if body is not None else b""
+    return asyncio.run(service.dispatch(method, path, raw))
+
+
+def start(service) -> str:
+    status, consultation = call(service, "POST", "/consultations")
+    assert status == 201
+    return consultation["id"]
+
+
+def test_consultation_flow(engine):
+    service = engine.ConsultationService(offline=True, seed=2)
+    session_id = start(service)
+    status, state = call(service, "GET", f"/consultations/{session_id}")
+    assert status == 200 and state["status"] == "open" and "true_disease" not in json.dumps(state)
+
+    status, reply = call(service, "POST", f"/consultations/{session_id}/turns", {"role": "doctor"})
+    assert status == 200 and reply["question"] and reply["answer"]
+    test = next(iter(engine.MedicalConfig.TEST_COSTS))
+    status, reply = call(service, "POST", f"/consultations/{session_id}/tests", {"test": test})
+    assert status == 200 and reply["test_type"] == test
+    status, reply = call(service, "POST", f"/consultations/{session_id}/diagnosis", {})
+    assert status == 200, reply
+    assert reply["consultation"]["status"] == "finished"
+    assert reply["result"]["true_disease"] in engine.MedicalConfig.DISEASE_LIBRARY
+    assert service.health()["rounds_finished"] == 1
+
+    status, _ = call(service, "POST", f"/consultations/{session_id}/diagnosis", {})
+    assert status == 409
+    assert call(service, "DELETE", f"/consultations/{session_id}")[0] == 200
+    assert call(service, "GET", f"/consultations/{session_id}")[0] == 404
+
+
+def test_bad_requests(engine):
+    service = engine.ConsultationService(offline=True)
+    session_id = start(service)
+    path = f"/consultations/{session_id}"
+    assert call(service, "POST", f"{path}/turns", {"role": "nurse"})[0] == 400
+    assert call(service, "POST", f"{path}/turns", {"role": "patient", "content": " "})[0] == 400
+    assert call(service, "POST", f"{path}/tests", {"test": "no such test"})[0] == 400
+    assert asyncio.run(service.dispatch("POST", f"{path}/turns", b"[1, 2"))[0] == 400
+    assert call(service, "GET", "/nowhere")[0] == 404
+
+
+def test_patient_statement_is_recorded_with_the_question_it_answers(engine):
+    service = engine.ConsultationService(offline=True, seed=1)
+    session_id = start(service)
+    path = f"/consultations/{session_id}/turns"
+    first = call(service, "POST", path, {"role": "patient", "content": "It started yesterday"})[1]["question"]
+    second = call(service, "POST", path, {"role": "patient", "content": "Mostly at night"})[1]["question"]
+    actions = service.sessions[session_id].state.actions_history
+    # The first statement follows the complaint, so only the answer to the first question is recorded
+    assert [action["details"] for action in actions] == [{"question": first, "response": "Mostly at night"}]
+    assert service.sessions[session_id].state.questions_asked == 2
+    assert second
+
+
+def test_online_sessions_are_quiet_and_attribute_memory(engine, capsys):
+    engine.MedicalConfig.DEEPSEEK_API_KEY = "test"
+    FakeOpenAI("...").install(engine)
+    service = engine.ConsultationService(patient_backend="offline")
+    session_id = start(service)
+    call(service, "POST", f"/consultations/{session_id}/diagnosis", {})
+    assert engine.L.t("doctor_loaded_long_term") not in capsys.readouterr().out
+
+    with open(os.path.join(engine.MedicalConfig.DOCTOR_MEMORY_DIR, "doctor_memory.json"), encoding="utf-8") as f:
+        assert [entry["run_id"] for entry in json.load(f)] == [f"consultation/{session_id}"]
+
+
+def test_http_keep_alive(engine):
+    service = engine.ConsultationService(offline=True)
+    ready = threading.Event()
+    bound = {}
+
+    def serve():
+        async def main():
+            server = await service.serve("127.0.0.1", 0)
+            bound["port"] = server.sockets[0].getsockname()[1]
+            bound["loop"], bound["server"] = asyncio.get_running_loop(), server
+            ready.set()
+            async with server:
+                try:
+                    await server.serve_forever()
+                except asyncio.CancelledError:
+                    pass
+        asyncio.run(main())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", bound["port"], timeout=10)
+        for _ in range(2):  # Same connection twice
+            conn.request("GET", "/health")
+            response = conn.getresponse()
+            assert response.status == 200
+            assert json.loads(response.read())["status"] == "ok"
+        conn.request("POST", "/consultations", body=b"")
+        response = conn.getresponse()
+        assert response.status == 201 and json.loads(response.read())["status"] == "open"
+        conn.close()
+    finally:
+        bound["loop"].call_soon_threadsafe(bound["server"].close)
+        thread.join(5)
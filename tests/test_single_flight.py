@@ -0,0 +1,54 @@
+"""SingleFlight: concurrent identical requests share one in-flight call"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def run_concurrently(flight, keys, fn):
+    """Call flight.do for each key while the leaders are held in fn, return (result, shared) per key"""
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        return [future.result(5) for future in [pool.submit(flight.do, "question", key, fn) for key in keys]]
+
+
+def test_followers_share_the_leaders_result(en):
+    flight = en.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    threading.Timer(0.2, release.set).start()
+    results = run_concurrently(flight, ["same"] * 4, fn)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False)] + [("answer", True)] * 3
+    assert flight.get_report() == {"question": {"calls": 4, "coalesced": 3}}
+    assert flight.in_flight == {}
+
+
+def test_different_keys_and_later_calls_are_not_shared(en):
+    flight = en.SingleFlight()
+
+    assert flight.do("question", "a", lambda: 1) == (1, False)
+    assert flight.do("question", "a", lambda: 2) == (2, False)  # Nothing is cached after the call
+    assert en.SingleFlight.make_key("deepseek", 0.2, [{"content": "x"}]) != \
+        en.SingleFlight.make_key("deepseek", 0.7, [{"content": "x"}])
+
+
+def test_leaders_error_reaches_the_followers(en):
+    flight = en.SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise ConnectionError("backend unavailable")
+
+    threading.Timer(0.2, release.set).start()
+    with pytest.raises(ConnectionError):
+        run_concurrently(flight, ["same"] * 3, fn)
+    assert flight.in_flight == {}
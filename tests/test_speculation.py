@@ -0,0 +1,62 @@
+"""Speculative questions (--speculate)"""
+
+import threading
+
+from conftest import ScriptedClient
+
+
+def make_program(engine, release: threading.Event):
+    """Online program whose doctor questions wait for release"""
+    def reply(site, messages):
+        if site == "question":
+            release.wait(5)
+            return "speculative question?"
+        return "..."
+
+    engine.MedicalConfig.ENABLE_SPECULATIVE_QUESTIONS = True
+    engine.MedicalConfig.ENABLE_LONG_TERM_MEMORY = False
+    program = engine.MedicalDiagnosisprogram(auto_mode=True, api_client=ScriptedClient(reply, tokens=40))
+    program.console = False
+    _, patient, state, _ = program._start_round(1)
+    return program, patient, state
+
+
+def test_discarded_question_neither_blocks_nor_enters_the_session(engine):
+    release = threading.Event()
+    program, patient, state = make_program(engine, release)
+    turns_before = list(program.doctor.question_session.turns)
+
+    future = program._start_speculative_question(state, patient)
+    assert future is not None
+    # Thrown away while the request is still in flight: returns at once
+    assert program._finish_speculation((future, 0.1), used=False) is None
+    assert not future.done()
+    release.set()
+    future.result(5)
+    program._speculation_pool.submit(lambda: None).result()
+
+    assert program.doctor.question_session.turns == turns_before
+    assert program.speculation_stats["discarded"] == 1
+    assert program.speculation_stats["wasted_tokens"] == 40
+
+
+def test_used_question_extends_the_session(engine):
+    release = threading.Event()
+    release.set()
+    program, patient, state = make_program(engine, release)
+    future = program._start_speculative_question(state, patient)
+    question = program._finish_speculation((future, 0.1), used=True)
+
+    assert question == "speculative question?"
+    turns = program.doctor.question_session.turns
+    assert turns[-1] == {"role": "assistant", "content": question}
+    assert program.speculation_stats["used"] == 1
+    assert program.speculation_stats["wasted_tokens"] == 0
+
+
+def test_session_copy_is_independent(engine):
+    session = engine.ChatSession("system")
+    session.add("user", "a")
+    copy = session.copy()
+    copy.add("assistant", "b")
+    assert len(session.turns) == 1 and len(copy.turns) == 2
@@ -0,0 +1,35 @@
+"""SymptomExtractor: synonyms, whole-word matching and negation"""
+
+import pytest
+
+
+@pytest.fixture
+def extract(request):
+    """extract(text) of the requested edition's SymptomExtractor"""
+    engine = request.getfixturevalue(request.param)
+    return engine.SymptomExtractor(engine.MedicalConfig.SYMPTOM_SYNONYMS).extract
+
+
+@pytest.mark.parametrize("extract", ["en"], indirect=True)
+@pytest.mark.parametrize("text, symptoms", [
+    ("My head hurts and I feel feverish", ["headache", "fever"]),
+    ("I'm coughing, coughing all night", ["cough"]),
+    ("Nosebleeds, and my nose running", ["runny nose"]),  # "nose" alone is no symptom
+    ("No fever, and I don't have a cough", []),
+    ("I have no appetite", ["appetite"]),
+    ("I'm not tired and not hungry", ["appetite"]),  # The first "not" only negates "tired"
+    ("No headache, but no energy at all", ["fatigue"])
+])
+def test_english_extraction(extract, text, symptoms):
+    assert extract(text) == symptoms
+
+
+@pytest.mark.parametrize("extract", ["cn"], indirect=True)
+@pytest.mark.parametrize("text, symptoms", [
+    ("头疼，还有点发烧", ["头痛", "发热"]),
+    ("没有发烧，也不咳嗽", []),
+    ("我没胃口", ["食欲"]),
+    ("最近没劲，也不想吃饭", ["乏力", "食欲"])
+])
+def test_chinese_extraction(extract, text, symptoms):
+    assert extract(text) == symptoms
@@ -0,0 +1,27 @@
+"""Tracing (--trace): spans exported in Chrome trace format"""
+
+import json
+
+
+def test_disabled_tracer_records_nothing(en):
+    tracer = en.Tracer()
+    with tracer.span("round") as span:
+        span.set(round=1)
+    assert tracer.events == []
+
+
+def test_nested_spans_export_as_chrome_trace(en, tmp_path):
+    tracer = en.Tracer()
+    tracer.enable()
+    with tracer.span("round", round=1):
+        with tracer.span("llm:question", "llm", site="question"):
+            tracer.annotate(tokens=15)
+
+    with open(tracer.export_chrome(str(tmp_path / "trace.json")), encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert [event["ph"] for event in events].count("M") == 1  # One thread named
+    inner, outer = spans["llm:question"], spans["round"]
+    assert inner["args"] == {"site": "question", "tokens": 15} and inner["cat"] == "llm"
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert tracer.summary()["round"]["count"] == 1
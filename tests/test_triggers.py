@@ -0,0 +1,20 @@
+"""Misunderstanding triggers matched in doctor questions"""
+
+
+def make_patient(engine):
+    case = {"true_disease": "Flu", "symptoms_description": "", "personality": "cooperative", "ideal_cost": 0}
+    return engine.PatientAgent(None, case)
+
+
+def test_triggers_match_whole_words_only(en):
+    patient = make_patient(en)
+
+    assert patient.match_triggers("Where is the Pain, and how is your sleep?") == ["pain", "sleep"]
+    assert patient.match_triggers("Are you sleepy? Was it painful? Have you been to Spain?") == []
+    assert patient.match_triggers("Any fever or cough? Any fever since?") == ["fever", "cough"]
+
+
+def test_chinese_triggers_match_anywhere(cn):
+    patient = make_patient(cn)
+
+    assert patient.match_triggers("最近睡眠怎么样？吃饭正常吗？") == ["睡眠", "吃饭"]